@@ -7,7 +7,10 @@ pip install --upgrade pip
 pip install -r requirements.txt
 
 python manage.py collectstatic --noinput
+python manage.py build_openapi  # hashed + precompressed schema for /swagger/ and /redoc/
 python manage.py migrate
+python manage.py rebuild_listings --missing  # products created before the projection existed
+python manage.py rebuild_facets --if-dirty  # e.g. flagged by migration 0010
 
 
 echo "Build completed successfully."
\ No newline at end of file
@@ -4,6 +4,8 @@ Dynamic settings for local development and Render deployment.
 """
 
 import os
+import tempfile
+from importlib.util import find_spec
 from pathlib import Path
 import dj_database_url
 from datetime import timedelta
@@ -59,12 +61,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "store.instrumentation.InstrumentationMiddleware",  # sampled request metrics, see STORE_METRICS
+    "store.hashing.PasswordHashingBusyMiddleware",  # 503 + Retry-After when sign-ins saturate hashing
     "whitenoise.middleware.WhiteNoiseMiddleware",  # static files
+    "store.compression.CompressionMiddleware",  # zstd / br / gzip, see STORE_COMPRESSION
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "store.routing.ReplicaRoutingMiddleware",  # catalog reads on replicas, see STORE_DB_ROUTING
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -79,8 +85,20 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ],
+    # orjson-backed JSON; MessagePack for internal services when msgpack is installed
+    "DEFAULT_RENDERER_CLASSES": [
+        "store.renderers.FastJSONRenderer",
+        *(["store.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+        *(["store.renderers.MessagePackParser"] if find_spec("msgpack") else []),
+    ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "store.authentication.CachedJWTAuthentication",  # users and flags from the shared cache
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -92,15 +110,41 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    # Access tokens get user claims that CachedJWTAuthentication trusts while fresh;
+    # a refresh re-reads them from the user row
+    "TOKEN_OBTAIN_SERIALIZER": "store.serializers.UserClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "store.serializers.UserClaimsTokenRefreshSerializer",
+}
+
+# Shared user cache / claim trust for CachedJWTAuthentication; user saves
+# invalidate it for every worker
+STORE_AUTH = {
+    "USER_CACHE_ALIAS": "catalog",
+    "USER_CACHE_TTL": int(os.environ.get("AUTH_USER_CACHE_TTL", "60")),  # seconds
+    "CLAIMS_MAX_AGE": int(os.environ.get("AUTH_CLAIMS_MAX_AGE", "300")),  # seconds
+    "CHECK_BLACKLIST": False,  # set when rest_framework_simplejwt.token_blacklist is installed
+}
+
+# Password hashes take one of a few host-wide slots (store/hashing.py); none free -> 503 + Retry-After
+AUTHENTICATION_BACKENDS = ["store.hashing.BoundedModelBackend"]
+
+STORE_PASSWORD_HASHING = {
+    "MAX_CONCURRENT": int(os.environ.get("PASSWORD_HASHING_CONCURRENCY", "2")),  # all workers on a host
+    "WAIT_TIMEOUT": 0.05,  # seconds
 }
 
 # ---------------------------------------------------
-# URLs + WSGI
+# URLs + WSGI / ASGI
 # ---------------------------------------------------
 
 ROOT_URLCONF = "config.urls"
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Native async GET handlers for /api/products/ and /api/categories/.
+# config/asgi.py turns this on; under WSGI each async view would need its
+# own event loop, so the sync viewsets stay in charge there.
+STORE_ASYNC_CATALOG = os.environ.get("ASYNC_CATALOG", "False").lower() == "true"
+
 # ---------------------------------------------------
 # DATABASE (AUTO-SWITCH: Local ↔ Render)
 # ---------------------------------------------------
@@ -109,7 +153,6 @@ if os.environ.get("RENDER"):
     # Production (Render)
     DATABASES = {
         "default": dj_database_url.config(
-            conn_max_age=600,
             ssl_require=True
         )
     }
@@ -126,6 +169,159 @@ else:
         }
     }
 
+# ---------------------------------------------------
+# READ REPLICAS
+# ---------------------------------------------------
+
+# Comma-separated database URLs; each becomes "replica1", "replica2", ...
+# Tests mirror them onto "default" instead of creating their own databases.
+for _index, _url in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(",")), start=1):
+    DATABASES[f"replica{_index}"] = {
+        **dj_database_url.parse(_url.strip(), ssl_require=bool(os.environ.get("RENDER"))),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["store.routing.ReplicaRouter"]
+
+# ---------------------------------------------------
+# CONNECTION POOLING (every alias, local and Render)
+# ---------------------------------------------------
+
+# With psycopg 3 + psycopg_pool installed, each PostgreSQL alias gets one
+# pool per worker process, shared by its threads; MAX_SIZE should cover the
+# worker's threads. Otherwise (or with DB_POOL=false) each thread keeps one
+# persistent connection for DB_CONN_MAX_AGE seconds. Both health-check a
+# connection before handing it out. Usage: /api/metrics/, `manage.py bench_db`.
+DB_POOL = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),  # seconds to wait for a free connection
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", "1800")),  # seconds
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "300")),  # seconds before shrinking to min_size
+}
+DB_POOLING = (
+    os.environ.get("DB_POOL", "True").lower() == "true"
+    and find_spec("psycopg") is not None
+    and find_spec("psycopg_pool") is not None
+)
+
+for _database in DATABASES.values():
+    _database["CONN_HEALTH_CHECKS"] = True
+    if DB_POOLING and _database.get("ENGINE") == "django.db.backends.postgresql":
+        _database["CONN_MAX_AGE"] = 0  # the pool owns reuse
+        _database.setdefault("OPTIONS", {})["pool"] = dict(DB_POOL)
+    else:
+        _database["CONN_MAX_AGE"] = int(os.environ.get("DB_CONN_MAX_AGE", "600"))
+
+# Product/category GETs go to a replica; writers are pinned to the primary
+# for PIN_SECONDS so they read their own writes. Pins live in the shared
+# "catalog" cache so every worker honours them.
+STORE_DB_ROUTING = {
+    "REPLICAS": [alias for alias in DATABASES if alias != "default"],
+    "STRATEGY": os.environ.get("REPLICA_STRATEGY", "round_robin"),  # or least_loaded
+    "PIN_SECONDS": int(os.environ.get("REPLICA_PIN_SECONDS", "5")),
+    "PIN_CACHE_ALIAS": "catalog",
+    "MAX_LAG": float(os.environ.get("REPLICA_MAX_LAG", "5")),  # seconds
+}
+
+# ---------------------------------------------------
+# SEARCH
+# ---------------------------------------------------
+
+# Dotted path to the product search backend. Empty picks by DB vendor:
+# PostgreSQL -> tsvector column + GIN index, otherwise in-process index.
+STORE_SEARCH_BACKEND = os.environ.get("STORE_SEARCH_BACKEND", "")
+
+# /api/autocomplete/: in-process prefix index of product titles and category
+# names, reloaded every MAX_AGE seconds to pick up other workers' writes
+STORE_AUTOCOMPLETE = {
+    "LIMIT": 5,
+    "MAX_LIMIT": 20,
+    "MAX_AGE": int(os.environ.get("AUTOCOMPLETE_MAX_AGE", "300")),  # seconds
+    "CACHE_SECONDS": 30,
+}
+
+# Product lists read flattened, prerendered rows from ProductListing, written
+# with every product/category change (store/listings.py). Fill or repair the
+# table with `manage.py rebuild_listings`.
+STORE_LISTINGS = {
+    "ENABLED": os.environ.get("LISTINGS_ENABLED", "True").lower() == "true",
+    "CHUNK_SIZE": 1000,
+}
+
+# ---------------------------------------------------
+# CACHES
+# ---------------------------------------------------
+
+# "catalog" is the shared tier of the product/category response cache and
+# holds its generations, so every worker must see the same storage: files
+# under the temp dir by default (one host), Redis for several hosts.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        "BACKEND": os.environ.get(
+            "CATALOG_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.environ.get(
+            "CATALOG_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "store-catalog-cache"),
+        ),
+    },
+}
+
+STORE_RESPONSE_CACHE = {
+    "ENABLED": os.environ.get("RESPONSE_CACHE_ENABLED", "True").lower() == "true",
+    "ALIAS": "catalog",
+    "TIMEOUT": int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "300")),
+    "LOCAL_MAX_ENTRIES": int(os.environ.get("RESPONSE_CACHE_LOCAL_ENTRIES", "1024")),
+    "LOCAL_TIMEOUT": int(os.environ.get("RESPONSE_CACHE_LOCAL_TIMEOUT", "5")),  # seconds
+}
+
+# Identical concurrent product GETs in a worker share one computation.
+# STALE_SECONDS > 0 lets them take the previous result instead of waiting
+# while it recomputes (never for users reading their own writes).
+STORE_COALESCING = {
+    "ENABLED": os.environ.get("COALESCING_ENABLED", "True").lower() == "true",
+    "WAIT_TIMEOUT": 10.0,  # seconds
+    "STALE_SECONDS": float(os.environ.get("COALESCING_STALE_SECONDS", "0")),
+}
+
+# ---------------------------------------------------
+# INVENTORY
+# ---------------------------------------------------
+
+STORE_INVENTORY = {
+    "RESERVATION_TTL": int(os.environ.get("RESERVATION_TTL", "600")),  # seconds
+    "MAX_ITEMS": 50,  # SKUs per reservation request
+}
+
+# ---------------------------------------------------
+# REQUEST METRICS
+# ---------------------------------------------------
+
+# Sampled per-route latency, query count/time, serializer/render time and
+# response size, served at /api/metrics/ (admin only) for Prometheus.
+STORE_METRICS = {
+    "ENABLED": os.environ.get("METRICS_ENABLED", "True").lower() == "true",
+    "SAMPLE_RATE": float(os.environ.get("METRICS_SAMPLE_RATE", "1.0" if DEBUG else "0.01")),
+    "N_PLUS_ONE_THRESHOLD": int(os.environ.get("METRICS_N_PLUS_ONE_THRESHOLD", "5")),
+    "SERVER_TIMING": DEBUG,  # Server-Timing header in the browser's devtools
+}
+
+# ---------------------------------------------------
+# RESPONSE COMPRESSION
+# ---------------------------------------------------
+
+# zstd / br need the optional zstandard / brotli packages; gzip always works
+STORE_COMPRESSION = {
+    "ENABLED": os.environ.get("COMPRESSION_ENABLED", "True").lower() == "true",
+    "MIN_SIZE": int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")),  # bytes
+    "STREAMING": True,  # compress streamed exports chunk by chunk
+}
+
 # ---------------------------------------------------
 # CUSTOM USER
 # ---------------------------------------------------
@@ -145,6 +341,10 @@ STATICFILES_DIRS = [
 
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Files named <name>.<12 hex>.<ext> (e.g. the OpenAPI schema from
+# `manage.py build_openapi`) change name when their content does: cache forever
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.\w+$"
+
 # ---------------------------------------------------
 # MEDIA
 # ---------------------------------------------------
@@ -152,6 +352,15 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Product uploads are processed on a background pool (store/images.py):
+# metadata stripped, content-hashed names (safe to cache as immutable) and
+# resized WebP/JPEG variants, exposed as `image_variants` on products.
+STORE_IMAGES = {
+    "ASYNC": os.environ.get("IMAGES_ASYNC", "True").lower() == "true",
+    "MAX_WORKERS": int(os.environ.get("IMAGES_MAX_WORKERS", "2")),
+    "VARIANTS": {"thumb": 320, "medium": 800, "large": 1600},  # longest side, px
+}
+
 # ---------------------------------------------------
 # MISC
 # ---------------------------------------------------
@@ -29,19 +29,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="E-commerce API",
-      default_version='v1',
-      description="API documentation for the ALX BACKEND ECOMMERCE project",
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from config import docs
 
 urlpatterns = [
     path('',api_root, name='api-root'),
@@ -50,8 +38,10 @@ urlpatterns = [
       # JWT auth endpoints
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),  #  app URLs
-     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    # Docs read the schema prebuilt by `manage.py build_openapi`; see config/docs.py
+    path('swagger/', docs.swagger_ui, name='schema-swagger-ui'),
+    path('redoc/', docs.redoc_ui, name='schema-redoc'),
+    path('openapi.json', docs.openapi_schema, name='openapi-schema'),
 ]
 
 
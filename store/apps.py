@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        # Register search index, autocomplete index, response cache, facet summary, listing
+        # projection, image pipeline, user cache and query instrumentation receivers,
+        # plus the system checks
+        from . import authentication, autocomplete, cache, checks, facets, images, instrumentation, listings, search  # noqa: F401
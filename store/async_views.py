@@ -0,0 +1,96 @@
+from asgiref.sync import sync_to_async
+from django.urls import re_path
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from .views import CategoryViewSet, ProductViewSet
+
+# Read actions with an ``a``-prefixed async twin on the viewset
+ASYNC_ACTIONS = {"list", "retrieve"}
+
+
+# ======================
+# 🟩 Async viewset view
+# ======================
+def async_viewset_view(viewset_class, actions, **initkwargs):
+    """
+    ``viewset_class.as_view(actions)`` as a native async view.
+
+    GET/HEAD for ``list``/``retrieve`` run the viewset's ``alist`` /
+    ``aretrieve`` on the event loop with the async ORM; every other method
+    goes to the regular sync view in a thread. Filters, search, ordering,
+    pagination, caching and conditional GET behave exactly as on the sync
+    path, since the same viewset code builds the queryset and the response.
+    """
+    sync_view = sync_to_async(viewset_class.as_view(actions, **initkwargs))
+    if "get" in actions and "head" not in actions:
+        actions = {**actions, "head": actions["get"]}
+
+    async def view(request, *args, **kwargs):
+        action = actions.get(request.method.lower())
+        if action not in ASYNC_ACTIONS:
+            return await sync_view(request, *args, **kwargs)
+
+        self = viewset_class(**initkwargs)
+        self.action_map = actions
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if "HTTP_AUTHORIZATION" in request.META:
+                # Token auth may look the user up
+                await sync_to_async(self.initial)(request, *args, **kwargs)
+            else:
+                self.initial(request, *args, **kwargs)
+            response = await getattr(self, f"a{self.action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        # JSON renders here; the browsable API builds forms from querysets,
+        # so Django renders it in a thread
+        if hasattr(self.response, "render") and not isinstance(
+            getattr(self.response, "accepted_renderer", None), BrowsableAPIRenderer
+        ):
+            self.response.render()
+        return self.response
+
+    view.cls = viewset_class
+    view.initkwargs = initkwargs
+    view.actions = actions
+    return csrf_exempt(view)
+
+
+# ======================
+# 🟩 URLs
+# ======================
+def catalog_urlpatterns():
+    """Routes shadowing the router's product/category list + detail URLs (same names)."""
+    patterns = []
+    for prefix, viewset_class, basename in (
+        ("products", ProductViewSet, "product"),
+        ("categories", CategoryViewSet, "category"),
+    ):
+        patterns += [
+            re_path(
+                rf"^{prefix}/$",
+                async_viewset_view(
+                    viewset_class, {"get": "list", "post": "create"}, basename=basename, detail=False
+                ),
+                name=f"{basename}-list",
+            ),
+            re_path(
+                rf"^{prefix}/(?P<pk>[^/.]+)/$",
+                async_viewset_view(
+                    viewset_class,
+                    {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"},
+                    basename=basename,
+                    detail=True,
+                ),
+                name=f"{basename}-detail",
+            ),
+        ]
+    return patterns
@@ -0,0 +1,271 @@
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULTS = {
+    "USER_CACHE_ALIAS": "catalog",  # shared by every worker, see CACHES
+    "USER_CACHE_TTL": 60,  # seconds; saves and deletes invalidate at once
+    "TRUST_CLAIMS": True,  # build request.user from token claims, no query
+    "CLAIMS_MAX_AGE": 300,  # seconds after issue that claims are trusted
+    "CHECK_BLACKLIST": False,  # needs rest_framework_simplejwt.token_blacklist
+    "BLACKLIST_REFRESH": 30,  # seconds between reloads of the blacklisted jti set
+}
+
+# User fields copied into access tokens when they are minted (see UserClaimsRefreshToken)
+USER_CLAIMS = ("username", "email", "first_name", "last_name")
+
+# Permission flags: always read from the user row, never taken from a token
+USER_FLAGS = ("is_staff", "is_superuser", "is_active")
+
+
+def auth_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_AUTH", {})}
+
+
+# ======================
+# 🟩 User cache
+# ======================
+class UserCache:
+    """
+    Users and their permission flags by id, in a cache every worker shares
+    (``USER_CACHE_ALIAS``).
+
+    Saving or deleting a user drops its entries for all workers, right away
+    and again once the write commits; writes that skip signals
+    (``queryset.update()``) must call ``invalidate()``. ``invalidated_at``
+    also stops tokens issued before a change from being trusted for their
+    claims.
+    """
+
+    key_prefix = "store:auth"
+
+    @property
+    def cache(self):
+        return caches[auth_settings()["USER_CACHE_ALIAS"]]
+
+    def key(self, kind, user_id):
+        return f"{self.key_prefix}:{kind}:{user_id}"
+
+    def get(self, user_id):
+        return self.cache.get(self.key("user", user_id))  # unpickled, so views may mutate it
+
+    def set(self, user_id, user):
+        self.cache.set(self.key("user", user_id), user, auth_settings()["USER_CACHE_TTL"])
+
+    def claim_state(self, user_id):
+        """``(invalidated_at, flags or None)`` in one round trip."""
+        found = self.cache.get_many([self.key("changed", user_id), self.key("flags", user_id)])
+        return found.get(self.key("changed", user_id), 0), found.get(self.key("flags", user_id))
+
+    def set_flags(self, user_id, flags):
+        self.cache.set(self.key("flags", user_id), tuple(flags), auth_settings()["USER_CACHE_TTL"])
+
+    def invalidate(self, user_id):
+        config = auth_settings()
+        # Tokens older than CLAIMS_MAX_AGE aren't trusted for claims anyway
+        self.cache.set(self.key("changed", user_id), time.time(), config["CLAIMS_MAX_AGE"])
+        self.cache.delete_many([self.key("user", user_id), self.key("flags", user_id)])
+
+    def invalidated_at(self, user_id):
+        return self.cache.get(self.key("changed", user_id), 0)
+
+
+user_cache = UserCache()
+
+
+# ======================
+# 🟩 Token blacklist
+# ======================
+class TokenDenylist:
+    """
+    In-memory set of blacklisted ``jti`` values.
+
+    Reloaded with one query every ``BLACKLIST_REFRESH`` seconds (and right
+    after a token is blacklisted in this process), so checking a request
+    is a set lookup instead of simplejwt's per-request ``EXISTS`` query.
+    """
+
+    def __init__(self):
+        self._jtis = frozenset()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if not apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+            return frozenset()
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        return frozenset(
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list(
+                "token__jti", flat=True
+            )
+        )
+
+    def contains(self, jti):
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at > auth_settings()["BLACKLIST_REFRESH"]:
+            with self._lock:
+                if self._loaded_at is None or now - self._loaded_at > auth_settings()["BLACKLIST_REFRESH"]:
+                    self._jtis = self.load()
+                    self._loaded_at = now
+        return jti in self._jtis
+
+    def expire(self):
+        self._loaded_at = None
+
+
+token_denylist = TokenDenylist()
+
+
+# ======================
+# 🟩 Tokens
+# ======================
+class UserClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry ``USER_CLAIMS`` from the user row
+    as it is when each access token is minted (login or refresh). The claims
+    are never copied from the refresh token, so a refresh can't replay what
+    was true at login; flags an older refresh token may carry are dropped.
+    """
+
+    no_copy_claims = (*RefreshToken.no_copy_claims, *USER_CLAIMS, *USER_FLAGS)
+    user = None  # set by for_user(), saves a query at login
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.user = user
+        return token
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = self.user
+        if user is None:
+            user = (
+                get_user_model()
+                ._default_manager.filter(**{jwt_settings.USER_ID_FIELD: self[jwt_settings.USER_ID_CLAIM]})
+                .only(*USER_CLAIMS)
+                .first()
+            )
+        if user is not None:
+            for claim in USER_CLAIMS:
+                access[claim] = getattr(user, claim)
+        return access
+
+
+# ======================
+# 🟩 Authentication
+# ======================
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` without a user query on every request.
+
+    Fresh tokens carrying ``USER_CLAIMS`` give a ``User`` built from the
+    signed claims plus ``USER_FLAGS``; the flags come from ``user_cache``
+    (one narrow query on a miss), which every worker drops when the user is
+    saved, so a demoted or deactivated user loses access on the next
+    request. The remaining fields are deferred, so touching e.g.
+    ``password`` loads it and ``save()`` only writes the loaded fields.
+    Older tokens fall back to the full row, also through ``user_cache``.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[jwt_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        config = auth_settings()
+        if config["CHECK_BLACKLIST"] and token_denylist.contains(validated_token.get(jwt_settings.JTI_CLAIM)):
+            raise AuthenticationFailed(_("Token is blacklisted"), code="token_not_valid")
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = self.user_from_claims(validated_token, user_id, config)
+        if user is None:
+            user = self.fetch_user(user_id)
+            user_cache.set(user_id, user)
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+    def user_from_claims(self, validated_token, user_id, config):
+        # Password-revocation checks need the stored hash, so always hit the DB
+        if not config["TRUST_CLAIMS"] or jwt_settings.CHECK_REVOKE_TOKEN:
+            return None
+        if jwt_settings.USER_ID_FIELD != self.user_model._meta.pk.attname:
+            return None
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return None
+        issued_at = validated_token.get("iat", 0)
+        if time.time() - issued_at > config["CLAIMS_MAX_AGE"]:
+            return None
+        invalidated_at, flags = user_cache.claim_state(user_id)
+        if issued_at <= invalidated_at:
+            return None
+
+        pk = self.user_model._meta.pk.to_python(user_id)
+        if flags is None:
+            flags = self.user_model._default_manager.filter(pk=pk).values_list(*USER_FLAGS).first()
+            if flags is None:
+                return None  # deleted: fetch_user reports it
+            user_cache.set_flags(user_id, flags)
+
+        values = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        values.update(zip(USER_FLAGS, flags))
+        values[jwt_settings.USER_ID_FIELD] = pk
+        fields = [f for f in self.user_model._meta.concrete_fields if f.attname in values]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model),
+            [f.attname for f in fields],
+            [values[f.attname] for f in fields],
+        )
+
+    def fetch_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+
+# ======================
+# 🟦 INVALIDATION
+# ======================
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, using=None, **kwargs):
+    user_id = getattr(instance, jwt_settings.USER_ID_FIELD)
+    user_cache.invalidate(user_id)
+    # Again after commit: a request in between may have cached the old row
+    transaction.on_commit(lambda: user_cache.invalidate(user_id), using=using)
+
+
+def _blacklist_changed(sender, **kwargs):
+    token_denylist.expire()
+
+
+if apps.is_installed("rest_framework_simplejwt.token_blacklist"):
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    post_save.connect(_blacklist_changed, sender=BlacklistedToken)
+    post_delete.connect(_blacklist_changed, sender=BlacklistedToken)
@@ -0,0 +1,335 @@
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Product, Reservation, ReservationItem
+from .search import tokenize
+
+DEFAULTS = {
+    "LIMIT": 5,  # suggestions returned by default
+    "MAX_LIMIT": 20,
+    "MAX_AGE": 300,  # seconds; then rebuilt in the background to pick up other workers' writes
+    "CACHE_SECONDS": 30,  # Cache-Control max-age on responses
+    "MAX_QUERY_LENGTH": 100,
+}
+
+# Past the last code point: (prefix + END,) sorts after every key starting with prefix
+END = "\U0010ffff"
+
+
+def autocomplete_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_AUTOCOMPLETE", {})}
+
+
+def normalize(text):
+    """Lowercase, accents folded, words joined by single spaces: "Crème Brûlée!" -> "creme brulee"."""
+    folded = unicodedata.normalize("NFKD", text or "")
+    return " ".join(tokenize("".join(c for c in folded if not unicodedata.combining(c))))
+
+
+def phrase_keys(text):
+    # "red running shoe" -> itself, "running shoe", "shoe": any word can start the match
+    words = normalize(text).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+# ======================
+# 🟩 Prefix index
+# ======================
+class Suggestion:
+    __slots__ = ("kind", "pk", "text", "slug", "category_id", "weight", "keys")
+
+    def __init__(self, kind, pk, text, slug, category_id=None, weight=0):
+        self.kind = kind
+        self.pk = pk
+        self.text = text
+        self.slug = slug
+        self.category_id = category_id
+        self.weight = weight
+        self.keys = phrase_keys(text)
+
+    def rank(self):
+        # Most popular first; a category beats a product of equal weight, then shorter text, older
+        return (self.weight, self.kind == "category", -len(self.text), -self.pk)
+
+    def as_dict(self):
+        return {"type": self.kind, "id": self.pk, "text": self.text, "slug": self.slug}
+
+
+class AutocompleteIndex:
+    """
+    Product titles and category names in one sorted array of
+    ``(normalized phrase, ref)`` pairs, so a prefix is a ``bisect`` range.
+    Every word of a title starts a phrase, so "sho" finds "Running Shoes".
+
+    Suggestions rank by popularity: units in committed reservations for a
+    product, the sum over its products for a category. The index loads from
+    the database on first use and is then kept current by model signals and
+    reservation commits; each worker process holds its own copy and reloads
+    it in the background every ``MAX_AGE`` seconds to pick up writes made
+    elsewhere.
+
+    Prefixes matching many phrases ("s", "pro") would cost a scan per
+    keystroke, so their top ``top_k`` results are memoized. New items and
+    popularity gains are merged into the memo; only removing an item that is
+    in a memoized list drops that list.
+    """
+
+    top_k = 20  # results memoized per prefix; larger limits skip the memo
+    warm_length = 2  # prefixes up to this length are memoized at load, the first keystrokes
+    memo_min_range = 64  # memoize prefixes spanning more entries than this
+    memo_max_prefixes = 20000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = None
+        self._items = {}
+        self._popularity = {}
+        self._top = {}
+        self._loaded_at = 0.0
+        self._reloading = None  # mutations to replay after a background reload
+
+    @property
+    def loaded(self):
+        return self._entries is not None
+
+    # ----------------------
+    # Loading
+    # ----------------------
+    def rebuild(self):
+        items, popularity = self._read()
+        entries = sorted((key, ref) for ref, item in items.items() for key in item.keys)
+        top = self._warm(entries, items)
+        with self._lock:
+            self._entries, self._items, self._popularity, self._top = entries, items, popularity, top
+            self._loaded_at = time.monotonic()
+            replay, self._reloading = self._reloading, None
+            for method, args in replay or ():
+                method(*args)
+        return len(items)
+
+    def _read(self):
+        popularity = dict(
+            ReservationItem.objects.filter(reservation__status=Reservation.COMMITTED)
+            .values("product_id")
+            .annotate(units=Sum("quantity"))
+            .values_list("product_id", "units")
+        )
+        items = {}
+        for category in Category.objects.only("pk", "name", "slug").iterator():
+            items["c", category.pk] = Suggestion("category", category.pk, category.name, category.slug)
+        products = Product.objects.filter(is_active=True).only("pk", "title", "slug", "category_id")
+        for product in products.iterator(chunk_size=2000):
+            weight = popularity.get(product.pk, 0)
+            items["p", product.pk] = Suggestion(
+                "product", product.pk, product.title, product.slug, product.category_id, weight
+            )
+            category = items.get(("c", product.category_id))
+            if category is not None:
+                category.weight += weight
+        return items, popularity
+
+    def _warm(self, entries, items):
+        groups = {}
+        for key, ref in entries:
+            for end in range(1, min(len(key), self.warm_length) + 1):
+                groups.setdefault(key[:end], []).append(ref)
+        return {
+            prefix: heapq.nlargest(self.top_k, (items[ref] for ref in set(refs)), key=Suggestion.rank)
+            for prefix, refs in groups.items()
+            if len(refs) > self.memo_min_range
+        }
+
+    def _ensure_loaded(self, max_age):
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.rebuild()
+            return
+        if max_age and time.monotonic() - self._loaded_at > max_age:
+            with self._lock:
+                if self._reloading is not None:
+                    return
+                self._reloading = []
+            threading.Thread(target=self._reload, name="autocomplete-reload", daemon=True).start()
+
+    def _reload(self):
+        try:
+            self.rebuild()
+        except Exception:
+            with self._lock:
+                self._reloading = None
+                self._loaded_at = time.monotonic()  # retry after another MAX_AGE
+            raise
+        finally:
+            connections.close_all()
+
+    # ----------------------
+    # Lookup
+    # ----------------------
+    def suggest(self, query, limit=5, max_age=0):
+        """Top ``limit`` suggestions whose title or name has a word starting with ``query``."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        self._ensure_loaded(max_age)
+        with self._lock:
+            best = self._top.get(prefix) if limit <= self.top_k else None
+            if best is None:
+                start = bisect_left(self._entries, (prefix,))
+                stop = bisect_left(self._entries, (prefix + END,), start)
+                refs = {ref for _, ref in self._entries[start:stop]}
+                best = heapq.nlargest(max(limit, self.top_k), (self._items[ref] for ref in refs), key=Suggestion.rank)
+                if stop - start > self.memo_min_range and limit <= self.top_k:
+                    if len(self._top) >= self.memo_max_prefixes:
+                        self._top.clear()
+                    self._top[prefix] = best
+            return [item.as_dict() for item in best[:limit]]
+
+    # ----------------------
+    # Maintenance
+    # ----------------------
+    def _mutate(self, method, *args):
+        with self._lock:
+            if not self.loaded:
+                return
+            if self._reloading is not None:
+                self._reloading.append((method, args))
+            method(*args)
+
+    def index_product(self, product):
+        self._mutate(
+            self._index_product, product.pk, product.title, product.slug, product.category_id, product.is_active
+        )
+
+    def remove_product(self, pk):
+        self._mutate(self._remove, ("p", pk))
+
+    def index_category(self, category):
+        self._mutate(self._index_category, category.pk, category.name, category.slug)
+
+    def remove_category(self, pk):
+        self._mutate(self._remove, ("c", pk))
+
+    def add_sales(self, quantities):
+        """``{product_id: units}`` just committed: raise their (and their categories') weight."""
+        self._mutate(self._add_sales, dict(quantities))
+
+    def _index_product(self, pk, title, slug, category_id, is_active):
+        self._remove(("p", pk))
+        if is_active:
+            weight = self._popularity.get(pk, 0)
+            self._insert(("p", pk), Suggestion("product", pk, title, slug, category_id, weight))
+            self._add_category_weight(category_id, weight)
+
+    def _index_category(self, pk, name, slug):
+        previous = self._items.get(("c", pk))
+        self._remove(("c", pk))
+        item = Suggestion("category", pk, name, slug)
+        if previous is not None:
+            item.weight = previous.weight
+        self._insert(("c", pk), item)
+
+    def _add_sales(self, quantities):
+        for pk, units in quantities.items():
+            self._popularity[pk] = self._popularity.get(pk, 0) + units
+            item = self._items.get(("p", pk))
+            if item is not None:
+                item.weight += units
+                self._refresh_memo(item)
+                self._add_category_weight(item.category_id, units)
+
+    def _add_category_weight(self, category_id, weight):
+        category = self._items.get(("c", category_id))
+        if category is not None and weight:
+            category.weight += weight
+            self._refresh_memo(category, removed=weight < 0)
+
+    def _insert(self, ref, item):
+        self._items[ref] = item
+        for key in item.keys:
+            insort(self._entries, (key, ref))
+        self._refresh_memo(item)
+
+    def _remove(self, ref):
+        item = self._items.pop(ref, None)
+        if item is None:
+            return
+        for key in item.keys:
+            position = bisect_left(self._entries, (key, ref))
+            if position < len(self._entries) and self._entries[position] == (key, ref):
+                del self._entries[position]
+        self._refresh_memo(item, removed=True)
+        if ref[0] == "p":
+            self._add_category_weight(item.category_id, -item.weight)
+
+    def _refresh_memo(self, item, removed=False):
+        # Only memoized prefixes of the item's own phrases can be affected
+        if not self._top:
+            return
+        rank = item.rank()
+        for key in item.keys:
+            for end in range(1, len(key) + 1):
+                best = self._top.get(key[:end])
+                if best is None:
+                    continue
+                if item in best:
+                    if removed:  # a runner-up may move in: recompute on next use
+                        del self._top[key[:end]]
+                    else:
+                        best.sort(key=Suggestion.rank, reverse=True)
+                elif not removed and (len(best) < self.top_k or rank > best[-1].rank()):
+                    best.append(item)
+                    best.sort(key=Suggestion.rank, reverse=True)
+                    del best[self.top_k :]
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def record_sales(reservation_id):
+    """Count a committed reservation towards popularity once the transaction commits."""
+    quantities = {}
+    for product_id, quantity in ReservationItem.objects.filter(reservation_id=reservation_id).values_list(
+        "product_id", "quantity"
+    ):
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    transaction.on_commit(lambda: autocomplete_index.add_sales(quantities))
+
+
+# ======================
+# 🟦 KEEP INDEX IN SYNC
+# ======================
+AUTOCOMPLETE_SOURCE_FIELDS = {"title", "slug", "category", "is_active"}
+
+
+@receiver(post_save, sender=Product)
+def index_autocomplete_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not AUTOCOMPLETE_SOURCE_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(lambda: autocomplete_index.index_product(instance))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_autocomplete_product(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove_product(pk))
+
+
+@receiver(post_save, sender=Category)
+def index_autocomplete_category(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete_index.index_category(instance))
+
+
+@receiver(post_delete, sender=Category)
+def unindex_autocomplete_category(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove_category(pk))
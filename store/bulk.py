@@ -0,0 +1,336 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from .cache import bump_on_commit
+from .facets import mark_dirty as mark_facets_dirty
+from .listings import refresh_listings
+from .models import Category, Product
+from .search import get_search_backend
+from .slugs import allocate_slugs
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n", ""}
+
+REQUIRED_FOR_INSERT = ("title", "price")
+
+
+# ======================
+# 🟩 Row parsing
+# ======================
+def read_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield {"__error__": f"line {number}: invalid JSON"}
+
+
+def read_csv(lines):
+    decoded = (line.decode("utf-8") if isinstance(line, bytes) else line for line in lines)
+    yield from csv.DictReader(decoded)
+
+
+class NDJSONParser(BaseParser):
+    """Lazily yields rows, so large uploads are never held in memory at once."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            raise ParseError("Empty request body.")
+        return read_ndjson(stream)
+
+
+class CSVParser(BaseParser):
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            raise ParseError("Empty request body.")
+        return read_csv(stream)
+
+
+# ======================
+# 🟩 Validation
+# ======================
+class CategoryLookup:
+    """
+    Resolve ``category_id`` by primary key and ``category`` by slug or name,
+    from one query. The two are keyed apart, so a category named "5" is
+    never mistaken for the one with pk 5.
+    """
+
+    def __init__(self):
+        self.by_id, self.by_slug, self.by_name = set(), {}, {}
+        for pk, slug, name in Category.objects.values_list("id", "slug", "name"):
+            self.by_id.add(pk)
+            self.by_slug[slug] = pk
+            self.by_name[name.lower()] = pk
+
+    def resolve_id(self, value):
+        if value in (None, ""):
+            return None
+        try:
+            pk = int(str(value).strip())
+        except ValueError:
+            return None
+        return pk if pk in self.by_id else None
+
+    def resolve(self, value):
+        if value in (None, ""):
+            return None
+        text = str(value).strip()
+        return self.by_slug.get(text, self.by_name.get(text.lower()))
+
+
+def _clean_price(value):
+    price = Decimal(str(value).strip())
+    if not price.is_finite():
+        raise InvalidOperation
+    if price.as_tuple().exponent < -2 or abs(price) >= Decimal("1e8"):
+        raise ValueError("must have at most 8 digits before and 2 after the decimal point")
+    return price
+
+
+def _clean_inventory(value):
+    inventory = int(str(value).strip())
+    if inventory < 0:
+        raise ValueError("must be zero or positive")
+    return inventory
+
+
+def _clean_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError("must be a boolean")
+
+
+def clean_row(raw, categories):
+    """
+    Coerce one feed row into model field values.
+
+    Returns ``(slug, values, errors)``; ``values`` only holds fields present in
+    the row so partial updates (e.g. price + inventory) stay partial.
+    """
+    if not isinstance(raw, dict):
+        return None, {}, {"row": "must be an object"}
+    if "__error__" in raw:
+        return None, {}, {"row": raw["__error__"]}
+
+    values, errors = {}, {}
+    slug = (raw.get("slug") or "").strip() or None
+
+    if "title" in raw:
+        title = str(raw["title"] or "").strip()
+        if not title or len(title) > 255:
+            errors["title"] = "must be 1-255 characters"
+        values["title"] = title
+    if "description" in raw:
+        values["description"] = str(raw["description"] or "")
+    if "price" in raw:
+        try:
+            values["price"] = _clean_price(raw["price"])
+        except InvalidOperation:
+            errors["price"] = "must be a decimal number"
+        except ValueError as exc:
+            errors["price"] = str(exc)
+    if "inventory" in raw:
+        try:
+            values["inventory"] = _clean_inventory(raw["inventory"])
+        except ValueError as exc:
+            errors["inventory"] = str(exc) if "must" in str(exc) else "must be an integer"
+    if "is_active" in raw:
+        try:
+            values["is_active"] = _clean_bool(raw["is_active"])
+        except ValueError as exc:
+            errors["is_active"] = str(exc)
+
+    category_key = "category_id" if "category_id" in raw else "category" if "category" in raw else None
+    if category_key:
+        resolve = categories.resolve_id if category_key == "category_id" else categories.resolve
+        category_id = resolve(raw[category_key])
+        if category_id is None and raw[category_key] not in (None, ""):
+            errors[category_key] = "unknown category"
+        values["category_id"] = category_id
+
+    return slug, values, errors
+
+
+# ======================
+# 🟩 Importer
+# ======================
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    merged: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def reject(self, number, errors):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "merged": self.merged,
+            "rejected": self.rejected,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+class ProductImporter:
+    """
+    Batch upsert of product feed rows keyed on ``slug``.
+
+    Each chunk is validated in Python, matched against existing slugs with
+    one query, then written with ``bulk_update`` (grouped by the set of
+    fields present) and ``bulk_create(update_conflicts=True)`` inside one
+    transaction. Rows without a slug are new products; their slugs are
+    allocated for the whole chunk at once. Rows repeating a slug within a
+    chunk are merged in file order (later fields win) before either path,
+    so each slug is written once.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+
+    def run(self, rows):
+        report = ImportReport()
+        started = time.perf_counter()
+        categories = CategoryLookup()
+        touched = False
+
+        chunk = []
+        for number, raw in enumerate(rows, start=1):
+            chunk.append((number, raw))
+            if len(chunk) >= self.chunk_size:
+                touched |= self.import_chunk(chunk, categories, report)
+                chunk = []
+        if chunk:
+            touched |= self.import_chunk(chunk, categories, report)
+
+        if touched:
+            # Signals don't fire for bulk writes: invalidate cached responses once
+            bump_on_commit(Product)
+            mark_facets_dirty()
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def import_chunk(self, chunk, categories, report):
+        report.rows += len(chunk)
+
+        cleaned, by_slug = [], {}
+        for number, raw in chunk:
+            slug, values, errors = clean_row(raw, categories)
+            if errors:
+                report.reject(number, errors)
+            elif slug in by_slug:
+                merged = by_slug[slug]
+                merged[0] = number
+                merged[2] = {**merged[2], **values}
+                report.merged += 1
+            else:
+                row = [number, slug, values]
+                cleaned.append(row)
+                if slug:
+                    by_slug[slug] = row
+
+        slugs = [slug for _, slug, _ in cleaned if slug]
+        existing = dict(Product.objects.filter(slug__in=slugs).values_list("slug", "id"))
+
+        updates, inserts, anonymous = {}, {}, []
+        for number, slug, values in cleaned:
+            if slug in existing:
+                updates.setdefault(frozenset(values), []).append((existing[slug], values))
+                continue
+            missing = [name for name in REQUIRED_FOR_INSERT if name not in values]
+            if missing:
+                report.reject(number, {name: "required for new products" for name in missing})
+                continue
+            if slug:
+                inserts[slug] = values
+            else:
+                anonymous.append(values)
+
+        if self.dry_run:
+            report.updated += sum(len(rows) for rows in updates.values())
+            report.created += len(inserts) + len(anonymous)
+            return False
+
+        now = timezone.now()
+        with transaction.atomic():
+            changed_ids = []
+            for fields, rows in updates.items():
+                if not fields:
+                    continue
+                objs = [Product(id=pk, updated_at=now, **values) for pk, values in rows]
+                Product.objects.bulk_update(objs, [*fields, "updated_at"])
+                changed_ids.extend(pk for pk, _ in rows)
+                report.updated += len(rows)
+
+            # Explicit slugs of this chunk aren't in the table yet: keep
+            # generated ones off them, or two rows would upsert into one
+            generated = allocate_slugs(
+                Product, [values["title"] for values in anonymous], fallback="product", exclude=inserts
+            )
+            rows = [*inserts.items(), *zip(generated, anonymous)]
+            if rows:
+                objs = [Product(slug=slug, **values) for slug, values in rows]
+                update_fields = sorted({name for _, values in rows for name in values})
+                Product.objects.bulk_create(
+                    objs,
+                    update_conflicts=True,
+                    unique_fields=["slug"],
+                    update_fields=[*update_fields, "updated_at"],
+                )
+                # A slug inserted concurrently since the lookup above was
+                # updated instead: its row kept its own created_at
+                stamped = {obj.slug: obj.created_at for obj in objs}
+                for pk, slug, created_at in Product.objects.filter(slug__in=list(stamped)).values_list(
+                    "id", "slug", "created_at"
+                ):
+                    if created_at == stamped[slug]:
+                        report.created += 1
+                    else:
+                        report.updated += 1
+                    changed_ids.append(pk)
+
+            if changed_ids:
+                get_search_backend().reindex(Product.objects.filter(pk__in=changed_ids))
+                refresh_listings(changed_ids)
+        return bool(changed_ids)
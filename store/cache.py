@@ -0,0 +1,329 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .models import Category, Product
+from .routing import replica_window
+
+DEFAULTS = {
+    "ENABLED": True,
+    "ALIAS": "catalog",  # shared tier, see CACHES
+    "TIMEOUT": 300,
+    "LOCAL_MAX_ENTRIES": 1024,
+    "LOCAL_TIMEOUT": 5,  # seconds an entry is served from a worker's memory
+    "KEY_PREFIX": "store:response",
+}
+
+# Gunicorn's worker count (its default is 1); LocMemCache isn't shared between them
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+
+def shared_across_workers(alias):
+    """Whether cache ``alias`` is seen by every worker process."""
+    return WORKERS <= 1 or not isinstance(caches[alias], LocMemCache)
+
+
+def cache_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_RESPONSE_CACHE", {})}
+
+
+# ======================
+# 🟩 In-process LRU tier
+# ======================
+class LRUCache:
+    """
+    Small thread-safe LRU used as the first cache tier inside a worker.
+    With ``timeout``, entries expire that many seconds after they were set.
+    """
+
+    def __init__(self, max_entries, timeout=None):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.timeout if self.timeout is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# ======================
+# 🟩 Versioned response cache
+# ======================
+class ResponseCache:
+    """
+    Two-tier cache of serialized response data.
+
+    Keys embed a per-model generation counter kept in the shared backend,
+    read on every lookup (local hits included), so bumping a generation on
+    save/delete makes every older entry unreachable at once in every worker;
+    stale entries are never served and simply age out. Local entries live
+    ``LOCAL_TIMEOUT`` seconds. The cache stays off when the shared alias is
+    per-process while several workers run (see ``shared_across_workers``).
+    """
+
+    MISSING = object()
+
+    def __init__(self):
+        self._local = None
+        self._lock = threading.Lock()
+        self.counters = {"local_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0}
+
+    @property
+    def config(self):
+        return cache_settings()
+
+    @property
+    def enabled(self):
+        config = self.config
+        return config["ENABLED"] and shared_across_workers(config["ALIAS"])
+
+    @property
+    def shared(self):
+        return caches[self.config["ALIAS"]]
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LRUCache(self.config["LOCAL_MAX_ENTRIES"], timeout=self.config["LOCAL_TIMEOUT"])
+        return self._local
+
+    # ----------------------
+    # Generations
+    # ----------------------
+    def generation_key(self, model):
+        return f"{self.config['KEY_PREFIX']}:gen:{model._meta.label_lower}"
+
+    def generations(self, models):
+        keys = [self.generation_key(model) for model in models]
+        found = self.shared.get_many(keys)
+        return [found.get(key, 0) for key in keys]
+
+    async def agenerations(self, models):
+        keys = [self.generation_key(model) for model in models]
+        found = await self.shared.aget_many(keys)
+        return [found.get(key, 0) for key in keys]
+
+    def bump(self, model):
+        key = self.generation_key(model)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            # First write since the shared tier was cleared
+            if not self.shared.add(key, 1, timeout=None):
+                self.shared.incr(key)
+        self.shared.set(f"{key}:at", time.time(), timeout=None)
+
+    def changed_within(self, models, seconds):
+        """Whether any of ``models`` was written in the last ``seconds``."""
+        if seconds <= 0:
+            return False
+        found = self.shared.get_many([f"{self.generation_key(model)}:at" for model in models])
+        return any(at > time.time() - seconds for at in found.values())
+
+    async def achanged_within(self, models, seconds):
+        if seconds <= 0:
+            return False
+        found = await self.shared.aget_many([f"{self.generation_key(model)}:at" for model in models])
+        return any(at > time.time() - seconds for at in found.values())
+
+    # ----------------------
+    # Entries
+    # ----------------------
+    def build_key(self, namespace, models, request):
+        return self._key(namespace, self.generations(models), request)
+
+    async def abuild_key(self, namespace, models, request):
+        return self._key(namespace, await self.agenerations(models), request)
+
+    def _key(self, namespace, generations, request):
+        params = sorted(
+            (key, sorted(values)) for key, values in request.query_params.lists()
+        )
+        raw = repr((request.get_host(), request.path, params)).encode()
+        generations = ":".join(str(g) for g in generations)
+        digest = hashlib.sha1(raw).hexdigest()
+        return f"{self.config['KEY_PREFIX']}:{namespace}:{generations}:{digest}"
+
+    def get(self, key):
+        value = self._get_local(key)
+        if value is not self.MISSING:
+            return value
+        return self._found_shared(key, self.shared.get(key, self.MISSING))
+
+    async def aget(self, key):
+        value = self._get_local(key)
+        if value is not self.MISSING:
+            return value
+        return self._found_shared(key, await self.shared.aget(key, self.MISSING))
+
+    def _get_local(self, key):
+        value = self.local.get(key, self.MISSING)
+        if value is not self.MISSING:
+            self._count("local_hits")
+        return value
+
+    def _found_shared(self, key, value):
+        if value is not self.MISSING:
+            self._count("shared_hits")
+            self.local.set(key, value)
+            return value
+        self._count("misses")
+        return self.MISSING
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        self.shared.set(key, value, timeout=self.config["TIMEOUT"])
+        self._count("stores")
+
+    async def aset(self, key, value):
+        self.local.set(key, value)
+        await self.shared.aset(key, value, timeout=self.config["TIMEOUT"])
+        self._count("stores")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        hits = counters["local_hits"] + counters["shared_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_ratio"] = hits / lookups if lookups else 0.0
+        counters["local_entries"] = len(self.local)
+        return counters
+
+    def reset(self):
+        self.local.clear()
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+
+
+response_cache = ResponseCache()
+
+
+# ======================
+# 🟩 ViewSet mixin
+# ======================
+class CachedResponseMixin:
+    """
+    Cache ``list``/``retrieve`` data for safe requests.
+
+    ``cache_models`` lists every model whose rows end up in the response, so a
+    write to any of them invalidates the cached pages.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response("list", super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response("retrieve", super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, action, handler, request, *args, **kwargs):
+        if not response_cache.enabled or request.method != "GET":
+            return handler(request, *args, **kwargs)
+
+        namespace = f"{self.basename}:{action}"
+        key = response_cache.build_key(namespace, self.cache_models, request)
+        data = response_cache.get(key)
+        if data is not ResponseCache.MISSING:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        # A lagging replica may not have the latest write yet: don't cache
+        # its answer under the new generation
+        if response.status_code == 200 and not response_cache.changed_within(self.cache_models, replica_window()):
+            response_cache.set(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response("list", super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response("retrieve", super().aretrieve, request, *args, **kwargs)
+
+    async def acached_response(self, action, handler, request, *args, **kwargs):
+        if not response_cache.enabled or request.method != "GET":
+            return await handler(request, *args, **kwargs)
+
+        namespace = f"{self.basename}:{action}"
+        key = await response_cache.abuild_key(namespace, self.cache_models, request)
+        data = await response_cache.aget(key)
+        if data is not ResponseCache.MISSING:
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = await handler(request, *args, **kwargs)
+        if response.status_code == 200 and not await response_cache.achanged_within(
+            self.cache_models, replica_window()
+        ):
+            await response_cache.aset(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+# ======================
+# 🟦 INVALIDATION
+# ======================
+def bump_on_commit(model, using=None):
+    # Bump after commit so a concurrent reader can't re-cache pre-commit rows
+    # under the new generation.
+    transaction.on_commit(lambda: response_cache.bump(model), using=using)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_responses(sender, using=None, **kwargs):
+    bump_on_commit(Product, using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_responses(sender, using=None, **kwargs):
+    bump_on_commit(Category, using)
@@ -0,0 +1,47 @@
+from django.core.checks import Warning, register
+
+from .cache import WORKERS, cache_settings, shared_across_workers
+from .authentication import auth_settings
+from .routing import replica_pool, routing_settings
+
+
+# ======================
+# 🟩 Shared state across workers
+# ======================
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """Features whose state must be shared by every worker need a cross-process cache."""
+    messages = []
+    config = cache_settings()
+    if config["ENABLED"] and not shared_across_workers(config["ALIAS"]):
+        messages.append(
+            Warning(
+                f"The response cache alias {config['ALIAS']!r} is a per-process LocMemCache "
+                f"and {WORKERS} workers run (WEB_CONCURRENCY): the response cache stays off.",
+                hint="Point CATALOG_CACHE_BACKEND at file-based or Redis storage.",
+                id="store.W001",
+            )
+        )
+    config = routing_settings()
+    if replica_pool.replicas() and not shared_across_workers(config["PIN_CACHE_ALIAS"]):
+        messages.append(
+            Warning(
+                f"The replica pin cache alias {config['PIN_CACHE_ALIAS']!r} is a per-process LocMemCache "
+                f"and {WORKERS} workers run (WEB_CONCURRENCY): a writer may read a stale replica "
+                f"from another worker.",
+                hint="Set STORE_DB_ROUTING['PIN_CACHE_ALIAS'] to a file-based or Redis cache.",
+                id="store.W002",
+            )
+        )
+    alias = auth_settings()["USER_CACHE_ALIAS"]
+    if not shared_across_workers(alias):
+        messages.append(
+            Warning(
+                f"The user cache alias {alias!r} is a per-process LocMemCache and {WORKERS} workers "
+                f"run (WEB_CONCURRENCY): other workers keep a saved user's old flags until "
+                f"USER_CACHE_TTL expires.",
+                hint="Set STORE_AUTH['USER_CACHE_ALIAS'] to a file-based or Redis cache.",
+                id="store.W003",
+            )
+        )
+    return messages
@@ -0,0 +1,193 @@
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from rest_framework.response import Response
+
+from .cache import LRUCache
+from .routing import current_state
+
+DEFAULTS = {
+    "ENABLED": True,
+    "WAIT_TIMEOUT": 10.0,  # seconds a follower waits before computing on its own
+    "STALE_SECONDS": 0,  # > 0: while a key recomputes, serve its last result up to this old
+    "STALE_MAX_ENTRIES": 1024,
+}
+
+# Request headers that change the response: content negotiation and conditional GET
+VARY_META = ("HTTP_ACCEPT", "HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+
+
+def coalescing_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_COALESCING", {})}
+
+
+# ======================
+# 🟩 Single flight
+# ======================
+class Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    At most one computation per key at a time inside a worker: the first
+    caller (leader) runs it, callers arriving meanwhile (followers) wait and
+    get the same result or exception. With ``stale_seconds`` followers get the
+    key's previous result instead of waiting, if it is recent enough.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._recent = None
+        self.counters = {"leaders": 0, "followers": 0, "stale": 0, "timeouts": 0}
+
+    @property
+    def recent(self):
+        if self._recent is None:
+            self._recent = LRUCache(coalescing_settings()["STALE_MAX_ENTRIES"])
+        return self._recent
+
+    def do(self, key, compute, timeout=10.0, stale_seconds=0):
+        """Return ``(result, role)``, role being "leader", "follower", "stale" or "timeout"."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+
+        if leader:
+            self._count("leaders")
+            try:
+                flight.result = compute()
+            except Exception as error:
+                flight.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+            if stale_seconds:
+                self.recent.set(key, (time.monotonic(), flight.result))
+            return flight.result, "leader"
+
+        if stale_seconds:
+            recent = self.recent.get(key)
+            if recent is not None and time.monotonic() - recent[0] <= stale_seconds:
+                self._count("stale")
+                return recent[1], "stale"
+        if not flight.done.wait(timeout):
+            # Leader stuck (slow query, lock wait): don't hold this thread hostage
+            self._count("timeouts")
+            return compute(), "timeout"
+        self._count("followers")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result, "follower"
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters["in_flight"] = len(self._flights)
+        return counters
+
+    def reset(self):
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+        if self._recent is not None:
+            self._recent.clear()
+
+
+single_flight = SingleFlight()
+
+
+# ======================
+# 🟩 Shareable responses
+# ======================
+def snapshot(response):
+    """The parts of an un-rendered response another request can rebuild it from, or None."""
+    headers = [(name, value) for name, value in response.items() if name.lower() != "content-type"]
+    if isinstance(response, HttpResponseNotModified):
+        return None, response.status_code, headers
+    if type(response) is Response and not response.exception:
+        return response.data, response.status_code, headers
+    return None
+
+
+def restore(shared):
+    data, status, headers = shared
+    response = HttpResponseNotModified() if status == 304 else Response(data, status=status)
+    for name, value in headers:
+        response[name] = value
+    return response
+
+
+# ======================
+# 🟩 ViewSet mixin
+# ======================
+class SingleFlightMixin:
+    """
+    Coalesce identical concurrent ``list``/``retrieve`` GETs in a worker:
+    one request runs the view (queries, serializer), the others reuse its
+    data and status and are rendered for their own request. Identical means
+    same path, query string, ``Accept`` and conditional headers.
+
+    Requests that must read their own writes (the user is pinned to the
+    primary, see ``ReplicaReadMixin``) always run on their own. Place this
+    mixin before ``ConditionalGetMixin`` so validator queries coalesce too.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.coalesced_response("list", super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.coalesced_response("retrieve", super().retrieve, request, *args, **kwargs)
+
+    def coalesced_response(self, action, handler, request, *args, **kwargs):
+        config = coalescing_settings()
+        state = current_state()
+        if (
+            not config["ENABLED"]
+            or request.method not in ("GET", "HEAD")
+            or (state is not None and not state.replica_reads)
+        ):
+            return handler(request, *args, **kwargs)
+
+        key = (
+            self.basename,
+            action,
+            request.method,
+            request.get_host(),
+            request.get_full_path(),
+            *(request.META.get(name, "") for name in VARY_META),
+        )
+
+        own = []
+
+        def compute():
+            own.append(handler(request, *args, **kwargs))
+            return snapshot(own[0])
+
+        shared, role = single_flight.do(
+            key, compute, timeout=config["WAIT_TIMEOUT"], stale_seconds=config["STALE_SECONDS"]
+        )
+        if own:  # this request ran the view itself (leader, or gave up waiting)
+            return own[0]
+        if shared is None:
+            # The leader's response can't be rebuilt (streaming, exception): run our own
+            return handler(request, *args, **kwargs)
+        response = restore(shared)
+        response["X-Coalesced"] = role
+        return response
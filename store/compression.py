@@ -0,0 +1,215 @@
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # optional, see requirements
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional, see requirements
+    zstandard = None
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MIN_SIZE": 1024,  # bytes; smaller bodies cost more to compress than they save
+    "STREAMING": True,  # compress StreamingHttpResponse chunk by chunk
+    "ENCODINGS": ["zstd", "br", "gzip"],  # server preference when q-values tie
+    "LEVELS": {"zstd": 3, "br": 4, "gzip": 6},
+    "CONTENT_TYPES": [
+        "application/json",
+        "application/x-ndjson",
+        "application/msgpack",
+        "application/javascript",
+        "application/xml",
+        "text/",
+    ],
+}
+
+
+def compression_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_COMPRESSION", {})}
+
+
+# ======================
+# 🟩 Encoders
+# ======================
+# ``compress`` encodes a whole body; ``open`` returns ``(feed, finish)`` for
+# streamed bodies, where ``feed`` flushes after every chunk so clients can
+# decode rows as they arrive.
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+
+    def _compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+
+    def compress(self, data):
+        compressor = self._compressor()
+        return compressor.compress(data) + compressor.flush()
+
+    def open(self):
+        compressor = self._compressor()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def open(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def open(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+def compress_stream(encoder, chunks):
+    feed, finish = encoder.open()
+    for chunk in chunks:
+        data = feed(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(encoder, chunks):
+    feed, finish = encoder.open()
+    async for chunk in chunks:
+        data = feed(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def available_encodings():
+    return [name for name in compression_settings()["ENCODINGS"] if name in ENCODERS]
+
+
+def get_encoder(name):
+    return ENCODERS[name](compression_settings()["LEVELS"].get(name, 6))
+
+
+_CODING = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*")
+
+
+def negotiate(accept_encoding, available=None):
+    """
+    Pick an encoding from an ``Accept-Encoding`` header.
+
+    Highest q-value wins, ties go to the order of ``available``; ``q=0``
+    refuses an encoding and ``*`` covers any not listed. ``None`` means
+    send the body uncompressed.
+    """
+    available = available_encodings() if available is None else available
+    weights = {}
+    for part in (accept_encoding or "").split(","):
+        match = _CODING.fullmatch(part)
+        if not match:
+            continue
+        try:
+            weights[match.group(1).lower()] = float(match.group(2) or 1)
+        except ValueError:
+            continue
+    wildcard = weights.get("*", 0)
+
+    best, best_q = None, 0
+    for name in available:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+# ======================
+# 🟩 Middleware
+# ======================
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Negotiated zstd / brotli / gzip compression for API responses.
+
+    Like Django's ``GZipMiddleware`` but with more codecs, a size threshold
+    and per-chunk flushing for streamed exports. zstd and brotli are used
+    only when their packages are installed. Strong ETags become weak, since
+    the encoded bytes differ from the identity representation.
+    """
+
+    def compressible(self, response, config):
+        if response.has_header("Content-Encoding") or response.status_code in (204, 206, 304):
+            return False
+        if "no-transform" in response.get("Cache-Control", ""):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return any(content_type.startswith(prefix) for prefix in config["CONTENT_TYPES"])
+
+    def process_response(self, request, response):
+        config = compression_settings()
+        if not config["ENABLED"] or not self.compressible(response, config):
+            return response
+        if response.streaming:
+            if not config["STREAMING"]:
+                return response
+        elif len(response.content) < config["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+        encoder = get_encoder(encoding)
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoder, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoder, response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
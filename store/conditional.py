@@ -0,0 +1,157 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import response_cache
+
+
+# ======================
+# 🟩 Conditional GET (ETag / Last-Modified)
+# ======================
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` before any serializer runs.
+
+    List validators come from one aggregate (``MAX(updated_at)``, ``COUNT``)
+    over the filtered queryset, detail validators from the row's
+    ``updated_at``. Keyset pages skip the ``COUNT`` (see ``counts_rows``).
+    Both are mixed with the request's query string, the negotiated media
+    type and the generations of ``cache_models`` (so a category rename
+    changes the ETag of products embedding it).
+    """
+
+    modified_field = "updated_at"
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        state = queryset.aggregate(**self.list_aggregates(request))
+        return self.conditional_response(
+            request,
+            [state["last_modified"], state.get("count")],
+            state["last_modified"],
+            super().list,
+            *args,
+            **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        try:
+            last_modified = (
+                queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+                .values_list(self.modified_field, flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError) as e:
+            raise Http404 from e  # malformed lookup value, e.g. /products/abc/
+        if last_modified is None:
+            # Unknown row: let the regular path raise the 404
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request,
+            [kwargs[lookup_url_kwarg], last_modified],
+            last_modified,
+            super().retrieve,
+            *args,
+            **kwargs,
+        )
+
+    def counts_rows(self, request):
+        # Keyset pages exist to avoid COUNT(*); soft deletes still move
+        # MAX(updated_at), hard deletes bump the cache generations
+        keyset_class = getattr(self.paginator, "keyset_class", None)
+        return keyset_class is None or keyset_class.cursor_query_param not in request.query_params
+
+    def list_aggregates(self, request):
+        aggregates = {"last_modified": Max(self.modified_field)}
+        if self.counts_rows(request):
+            aggregates["count"] = Count("pk")
+        return aggregates
+
+    def conditional_response(self, request, state, last_modified, handler, *args, **kwargs):
+        etag = self.compute_etag(request, state)
+        not_modified, timestamp = self.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.tag_response(handler(request, *args, **kwargs), etag, timestamp)
+
+    def not_modified(self, request, etag, last_modified):
+        # HTTP dates have whole-second precision
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        not_modified = get_conditional_response(
+            request._request, etag=etag, last_modified=timestamp
+        )
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            if timestamp is not None:
+                not_modified["Last-Modified"] = http_date(timestamp)
+        return not_modified, timestamp
+
+    def tag_response(self, response, etag, timestamp):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def compute_etag(self, request, state, generations=None):
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        if generations is None:
+            generations = response_cache.generations(self.cache_models) if self.cache_models else []
+        media_type = getattr(request, "accepted_media_type", "")
+        raw = repr((self.basename, request.path, params, media_type, generations, state))
+        return quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+    # ----------------------
+    # Async twins (store.async_views)
+    # ----------------------
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        state = await queryset.order_by().aaggregate(**self.list_aggregates(request))
+        return await self.aconditional_response(
+            request,
+            [state["last_modified"], state.get("count")],
+            state["last_modified"],
+            super().alist,
+            *args,
+            **kwargs,
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        try:
+            last_modified = await (
+                queryset.order_by()
+                .filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+                .values_list(self.modified_field, flat=True)
+                .afirst()
+            )
+        except (TypeError, ValueError, ValidationError) as e:
+            raise Http404 from e
+        if last_modified is None:
+            return await super().aretrieve(request, *args, **kwargs)
+        return await self.aconditional_response(
+            request,
+            [kwargs[lookup_url_kwarg], last_modified],
+            last_modified,
+            super().aretrieve,
+            *args,
+            **kwargs,
+        )
+
+    async def aconditional_response(self, request, state, last_modified, handler, *args, **kwargs):
+        generations = await response_cache.agenerations(self.cache_models) if self.cache_models else []
+        etag = self.compute_etag(request, state, generations)
+        not_modified, timestamp = self.not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self.tag_response(await handler(request, *args, **kwargs), etag, timestamp)
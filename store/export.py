@@ -0,0 +1,116 @@
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from rest_framework import renderers
+
+# Output column -> values_list() path. Flat rows straight from the cursor,
+# no model instances and no ProductSerializer per row.
+EXPORT_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "slug": "slug",
+    "description": "description",
+    "price": "price",
+    "inventory": "inventory",
+    "is_active": "is_active",
+    "image": "image",
+    "category_id": "category_id",
+    "category_name": "category__name",
+    "category_slug": "category__slug",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def _flat(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_product_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield one flat dict per product using a server-side cursor
+    (``iterator(chunk_size=...)``), so memory stays flat for any catalog size.
+    """
+    columns = list(EXPORT_COLUMNS)
+    paths = list(EXPORT_COLUMNS.values())
+    for values in queryset.order_by("id").values_list(*paths).iterator(chunk_size=chunk_size):
+        row = {column: _flat(value) for column, value in zip(columns, values)}
+        row["stock_status"] = "In Stock" if row["inventory"] > 0 else "Out of Stock"
+        yield row
+
+
+def _batched(lines, batch_size):
+    # Fewer, larger writes: one chunk per batch instead of one per row
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def ndjson_lines(rows, batch_size=500):
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    return _batched((encode(row) + "\n" for row in rows), batch_size)
+
+
+class _Echo:
+    # csv.writer target that hands back each formatted line
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, batch_size=500):
+    header = list(EXPORT_COLUMNS) + ["stock_status"]
+    writer = csv.DictWriter(_Echo(), fieldnames=header)
+
+    def lines():
+        yield writer.writerow(dict(zip(header, header)))
+        for row in rows:
+            yield writer.writerow(row)
+
+    return _batched(lines(), batch_size)
+
+
+def export_lines(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = iter_product_rows(queryset, chunk_size=chunk_size)
+    if export_format == "csv":
+        return csv_lines(rows)
+    return ndjson_lines(rows)
+
+
+# ======================
+# 🟩 Renderers
+# ======================
+# Exports stream their own body; these renderers let content negotiation
+# (Accept header or ?format=csv) pick the format and render error bodies.
+class NDJSONRenderer(renderers.BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return (json.dumps(data) + "\n").encode(self.charset)
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset)
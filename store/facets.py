@@ -0,0 +1,224 @@
+from bisect import bisect_right
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, FacetCount, FacetSummaryState, Product
+
+# Lower edges of the price buckets; the last bucket is open-ended
+DEFAULT_PRICE_EDGES = (
+    Decimal("0"), Decimal("10"), Decimal("25"), Decimal("50"),
+    Decimal("100"), Decimal("250"), Decimal("500"), Decimal("1000"),
+)
+MAX_PRICE_EDGES = 50
+
+STATE_PK = 1  # the FacetSummaryState row
+
+# Product fields that decide a product's summary row
+FACET_FIELDS = ("category_id", "price", "inventory", "is_active")
+
+
+def parse_price_edges(value):
+    """``?price_buckets=0,20,100`` -> sorted Decimal edges, or defaults."""
+    if not value:
+        return DEFAULT_PRICE_EDGES
+    try:
+        edges = sorted({Decimal(part.strip()) for part in value.split(",") if part.strip()})
+    except InvalidOperation:
+        return DEFAULT_PRICE_EDGES
+    if not edges or len(edges) > MAX_PRICE_EDGES:
+        return DEFAULT_PRICE_EDGES
+    return tuple(edges)
+
+
+def bucket_of(price, edges=DEFAULT_PRICE_EDGES):
+    # Prices below the first edge fall into the first bucket
+    return max(bisect_right(edges, price) - 1, 0)
+
+
+def bucket_expression(edges):
+    whens = [When(price__lt=edge, then=Value(index)) for index, edge in enumerate(edges[1:])]
+    return Case(*whens, default=Value(len(edges) - 1), output_field=IntegerField())
+
+
+def stock_expression():
+    # Mirrors Product.stock_status
+    return Case(When(inventory__gt=0, then=Value(True)), default=Value(False))
+
+
+# ======================
+# 🟩 Facet building
+# ======================
+def grouped_rows(queryset, edges=DEFAULT_PRICE_EDGES):
+    """One GROUP BY over (category, price bucket, in stock) for any filtered queryset."""
+    return (
+        queryset.order_by()
+        .annotate(bucket=bucket_expression(edges), in_stock=stock_expression())
+        .values("category_id", "category__name", "category__slug", "bucket", "in_stock")
+        .annotate(count=Count("pk"))
+    )
+
+
+def summary_rows():
+    return FacetCount.objects.filter(count__gt=0).values(
+        "category_id", "category__name", "category__slug", "bucket", "in_stock", "count"
+    )
+
+
+def build_facets(rows, edges=DEFAULT_PRICE_EDGES):
+    categories = {}
+    histogram = [0] * len(edges)
+    stock = {"in_stock": 0, "out_of_stock": 0}
+    total = 0
+
+    for row in rows:
+        count = row["count"]
+        total += count
+        histogram[row["bucket"]] += count
+        stock["in_stock" if row["in_stock"] else "out_of_stock"] += count
+        entry = categories.setdefault(
+            row["category_id"],
+            {
+                "id": row["category_id"],
+                "name": row["category__name"],
+                "slug": row["category__slug"],
+                "count": 0,
+            },
+        )
+        entry["count"] += count
+
+    return {
+        "total": total,
+        "categories": sorted(categories.values(), key=lambda c: (-c["count"], c["name"] or "")),
+        "price_histogram": [
+            {
+                "min": str(edge),
+                "max": str(edges[i + 1]) if i + 1 < len(edges) else None,
+                "count": histogram[i],
+            }
+            for i, edge in enumerate(edges)
+        ],
+        "stock": stock,
+    }
+
+
+# ======================
+# 🟩 Summary table
+# ======================
+def mark_dirty():
+    """
+    Flag the summary for a rebuild. Called by bulk paths (imports, inventory
+    reservations) whose ``queryset.update()`` writes don't fire signals.
+
+    The flag is written in the caller's transaction, so it commits with the
+    writes it covers. Rebuilds only hold the state row while claiming the
+    flag, so this never waits for one to finish.
+    """
+    if not FacetSummaryState.objects.filter(pk=STATE_PK).update(dirty=True):
+        FacetSummaryState.objects.update_or_create(pk=STATE_PK, defaults={"dirty": True})
+
+
+def is_dirty():
+    return bool(FacetSummaryState.objects.filter(pk=STATE_PK).values_list("dirty", flat=True).first())
+
+
+def rebuild_summary(if_dirty=False):
+    """
+    Recompute the whole table from one GROUP BY over active products
+    (``manage.py rebuild_facets``). ``if_dirty`` returns ``None`` at once
+    when the table is clean or another rebuild already claimed the flag.
+
+    The flag is cleared in its own short transaction before the GROUP BY
+    reads anything: writes that commit later set it again for the next
+    rebuild, and a failed rebuild puts it back.
+    """
+    with transaction.atomic():
+        claimed = FacetSummaryState.objects.filter(pk=STATE_PK, dirty=True).update(dirty=False)
+    if if_dirty and not claimed:
+        return None
+    try:
+        with transaction.atomic():
+            FacetCount.objects.all().delete()
+            FacetCount.objects.bulk_create(
+                FacetCount(
+                    category_id=row["category_id"],
+                    bucket=row["bucket"],
+                    in_stock=row["in_stock"],
+                    count=row["count"],
+                )
+                for row in grouped_rows(Product.objects.filter(is_active=True))
+            )
+            FacetSummaryState.objects.update_or_create(pk=STATE_PK, defaults={"rebuilt_at": timezone.now()})
+    except Exception:
+        mark_dirty()
+        raise
+    return FacetCount.objects.count()
+
+
+def _adjust(key, delta):
+    category_id, bucket, in_stock = key
+    lookup = {"category_id": category_id, "bucket": bucket, "in_stock": in_stock}
+    if FacetCount.objects.filter(**lookup).update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            FacetCount.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Another worker created the row first
+        FacetCount.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def facet_key(category_id, price, inventory, is_active):
+    if not is_active or price is None:
+        return None
+    return (category_id, bucket_of(Decimal(price)), inventory > 0)
+
+
+# ======================
+# 🟦 KEEP SUMMARY IN SYNC
+# ======================
+@receiver(pre_save, sender=Product)
+def remember_facet_key(sender, instance, **kwargs):
+    instance._facet_key_before = None
+    if instance.pk is None:
+        return
+    loaded = getattr(instance, "_loaded_values", {})
+    if all(name in loaded for name in FACET_FIELDS):
+        old = [loaded[name] for name in FACET_FIELDS]  # as read by Product.from_db, no query
+    else:
+        # Built by hand or loaded with some of the fields deferred
+        old = Product.objects.filter(pk=instance.pk).values_list(*FACET_FIELDS).first()
+    if old is not None:
+        instance._facet_key_before = facet_key(*old)
+
+
+@receiver(post_save, sender=Product)
+def update_facet_summary(sender, instance, **kwargs):
+    before = getattr(instance, "_facet_key_before", None)
+    after = facet_key(instance.category_id, instance.price, instance.inventory, instance.is_active)
+    # The next save of this instance compares against what was just written
+    loaded = getattr(instance, "_loaded_values", {})
+    instance._loaded_values = {**loaded, **{name: getattr(instance, name) for name in FACET_FIELDS}}
+    if before == after:
+        return
+    if before is not None:
+        _adjust(before, -1)
+    if after is not None:
+        _adjust(after, 1)
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_facet_summary(sender, instance, **kwargs):
+    key = facet_key(instance.category_id, instance.price, instance.inventory, instance.is_active)
+    if key is not None:
+        _adjust(key, -1)
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_after_category_delete(sender, instance, **kwargs):
+    # Products are moved to "no category" by SET_NULL without signals
+    mark_dirty()
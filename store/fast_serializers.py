@@ -0,0 +1,353 @@
+import decimal
+import operator
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.http import Http404
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import timed
+from .serializers import CategorySerializer, ProductSerializer
+
+
+# ======================
+# 🟩 Field converters
+# ======================
+# Each factory takes the DRF field and returns ``make(context) -> convert``,
+# or None when only DRF's own ``to_representation`` is exact for that setup.
+# ``convert`` is only called for non-None values, like Serializer.to_representation
+# does, and must return exactly what ``field.to_representation`` would.
+def _typed(expected, field):
+    # Identity for values of the type the DB hands back, DRF's method otherwise
+    fallback = field.to_representation
+
+    def make(context):
+        return lambda value: value if type(value) is expected else fallback(value)
+
+    return make
+
+
+def _passthrough(field):
+    def make(context):
+        return lambda value: value
+
+    return make
+
+
+def _decimal(field):
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return None
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    quantize_context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        quantize_context.prec = field.max_digits
+    rounding = field.rounding
+    Decimal = decimal.Decimal
+
+    def make(context):
+        def convert(value):
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value).strip())
+            return f"{value.quantize(exponent, rounding=rounding, context=quantize_context):f}"
+
+        return convert
+
+    return make
+
+
+def _datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    fallback = field.to_representation
+
+    def make(context):
+        # Resolved per call: the active timezone can change between requests
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if field_timezone is None:
+            return fallback
+
+        def convert(value):
+            if isinstance(value, str) or value.tzinfo is None:
+                return fallback(value)
+            text = value.astimezone(field_timezone).isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+        return convert
+
+    return make
+
+
+def _file(field, model_field):
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+    storage = getattr(model_field, "storage", None)
+    exposes = getattr(field, "exposes", None)  # images.ProcessedImageField
+
+    def make(context):
+        request = context.get("request")
+
+        def convert(value):
+            if not value:
+                return None
+            if exposes is not None and not exposes(value if isinstance(value, str) else value.name):
+                return None
+            if isinstance(value, str):
+                # .values() rows carry the stored name, not a FieldFile
+                if not use_url:
+                    return value
+                url = storage.url(value)
+            elif not use_url:
+                return value.name
+            else:
+                try:
+                    url = value.url
+                except AttributeError:
+                    return None
+            return request.build_absolute_uri(url) if request is not None else url
+
+        return convert
+
+    return make
+
+
+CONVERTERS = [
+    (serializers.DecimalField, _decimal),
+    (serializers.DateTimeField, _datetime),
+    (serializers.BooleanField, lambda field: _typed(bool, field)),
+    (serializers.IntegerField, lambda field: _typed(int, field)),
+    (serializers.CharField, lambda field: _typed(str, field)),
+    (serializers.ReadOnlyField, _passthrough),
+]
+
+
+# ======================
+# 🟩 Compiled serializer
+# ======================
+class _Row:
+    """Attribute view of a ``.values()`` row, used to evaluate model properties."""
+
+    __slots__ = ("_row", "_prefix")
+
+    def __init__(self, row, prefix):
+        self._row = row
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        try:
+            return self._row[self._prefix + name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class CompiledSerializer:
+    """
+    Read-only twin of a ``ModelSerializer`` for hot list/retrieve paths.
+
+    Field order, sources and output formats are taken from the DRF serializer
+    once; each field then becomes a plain getter + converter pair, so a row
+    costs a handful of function calls instead of DRF's per-field
+    ``get_attribute`` / ``to_representation`` machinery. Works on model
+    instances and on ``.values()`` rows (see ``value_paths()``). Nested
+    serializers are compiled too and their dicts are cached per call, so a
+    page of 100 products in 5 categories builds 5 category dicts.
+
+    Fields without a fast converter fall back to DRF's own
+    ``to_representation``, so the output always matches the serializer.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self._plan = None
+
+    @property
+    def plan(self):
+        # Compiled lazily: building serializer fields needs the app registry
+        if self._plan is None:
+            self._plan = self.compile()
+        return self._plan
+
+    def compile(self):
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*":
+                raise ValueError(f"{self.serializer_class.__name__}.{name}: source='*' is not supported")
+            attrs = field.source_attrs
+            getter = operator.attrgetter(".".join(attrs))
+            row_key = "__".join(attrs)
+            prop = getattr(self.model, attrs[0], None) if len(attrs) == 1 else None
+            row_property = prop.fget if isinstance(prop, property) else None
+
+            if isinstance(field, serializers.ListSerializer):
+                plan.append((name, getter, row_key, row_property, None, None))
+            elif isinstance(field, serializers.BaseSerializer):
+                plan.append((name, getter, row_key, row_property, None, CompiledSerializer(type(field))))
+            else:
+                plan.append((name, getter, row_key, row_property, self._converter(field), None))
+        return plan
+
+    def _converter(self, field):
+        model_field = None
+        if len(field.source_attrs) == 1:
+            try:
+                model_field = self.model._meta.get_field(field.source_attrs[0])
+            except FieldDoesNotExist:
+                pass
+        if isinstance(field, serializers.FileField) and model_field is not None:
+            return _file(field, model_field)
+        for field_class, factory in CONVERTERS:
+            # Subclasses that customise to_representation keep DRF's path
+            if isinstance(field, field_class) and type(field).to_representation is field_class.to_representation:
+                return factory(field)
+        return None  # bound to DRF's to_representation per call, see _Pass
+
+    def value_paths(self, prefix=""):
+        """``.values()`` paths needed by ``serialize_rows``, nested ones included."""
+        paths = [f"{prefix}{self.model._meta.pk.attname}"]
+        for name, getter, row_key, row_property, make, child in self.plan:
+            if child is not None:
+                paths.extend(child.value_paths(f"{prefix}{row_key}__"))
+            elif row_property is None and f"{prefix}{row_key}" not in paths:
+                paths.append(f"{prefix}{row_key}")
+        return paths
+
+    def bind(self, context=None):
+        return _Pass(self, context or {})
+
+    def serialize(self, instance, context=None, many=False):
+        with timed("serializer"):
+            bound = self.bind(context)
+            if many:
+                return [bound.instance(obj) for obj in instance]
+            return bound.instance(instance)
+
+    def serialize_rows(self, rows, context=None):
+        with timed("serializer"):
+            bound = self.bind(context)
+            return [bound.row(row) for row in rows]
+
+
+class _Pass:
+    """Converters bound to one request's context, with a fresh nested cache."""
+
+    def __init__(self, compiled, context):
+        drf_fields = None
+        self.pk_name = compiled.model._meta.pk.attname
+        self.fields = []
+        for name, getter, row_key, row_property, make, child in compiled.plan:
+            if child is not None:
+                convert, child = None, child.bind(context)
+            elif make is None:
+                if drf_fields is None:
+                    drf_fields = compiled.serializer_class(context=context).fields
+                convert = drf_fields[name].to_representation
+            else:
+                convert = make(context)
+            self.fields.append((name, getter, row_key, row_property, convert, child))
+        self.cache = {}
+
+    def instance(self, obj):
+        data = {}
+        for name, getter, row_key, row_property, convert, child in self.fields:
+            value = getter(obj)
+            if value is None:
+                data[name] = None
+            elif child is not None:
+                data[name] = child.cached_instance(value)
+            else:
+                data[name] = convert(value)
+        return data
+
+    def cached_instance(self, obj):
+        key = obj.pk
+        try:
+            return self.cache[key]
+        except KeyError:
+            data = self.cache[key] = self.instance(obj)
+            return data
+
+    def row(self, row, prefix=""):
+        data = {}
+        for name, getter, row_key, row_property, convert, child in self.fields:
+            if child is not None:
+                nested = f"{prefix}{row_key}__"
+                key = row[nested + child.pk_name]
+                if key is None:
+                    data[name] = None
+                elif key in child.cache:
+                    data[name] = child.cache[key]
+                else:
+                    data[name] = child.cache[key] = child.row(row, nested)
+                continue
+            if row_property is not None:
+                value = row_property(_Row(row, prefix))
+            else:
+                value = row[prefix + row_key]
+            data[name] = None if value is None else convert(value)
+        return data
+
+
+# Shared, compiled on first use
+product_serializer = CompiledSerializer(ProductSerializer)
+category_serializer = CompiledSerializer(CategorySerializer)
+
+
+# ======================
+# 🟩 ViewSet mixin
+# ======================
+class CompiledReadMixin:
+    """
+    Serve list/retrieve through a ``CompiledSerializer``; writes and the
+    browsable API forms keep using ``serializer_class``.
+    """
+
+    compiled_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.compiled_serializer.serialize(page, context, many=True))
+        return Response(self.compiled_serializer.serialize(queryset, context, many=True))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return Response(self.compiled_serializer.serialize(instance, self.get_serializer_context()))
+
+    # ----------------------
+    # Async twins (store.async_views)
+    # ----------------------
+    async def alist(self, request, *args, **kwargs):
+        # Filter backends may validate against the DB (ModelChoiceFilter) or
+        # search in memory, so they keep running in sync code
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        context = self.get_serializer_context()
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(self.compiled_serializer.serialize(page, context, many=True))
+        rows = [obj async for obj in queryset]
+        return Response(self.compiled_serializer.serialize(rows, context, many=True))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(self.compiled_serializer.serialize(instance, self.get_serializer_context()))
+
+    async def aget_object(self):
+        """``get_object`` with the row fetched through the async ORM."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404("No %s matches the given query." % queryset.model._meta.object_name)
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,178 @@
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth import hashers
+from django.contrib.auth.backends import ModelBackend
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+try:
+    import fcntl
+except ImportError:  # Windows: slots only count this process
+    fcntl = None
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_CONCURRENT": 2,  # hashes running at once on this host, all workers together
+    "WAIT_TIMEOUT": 0.05,  # seconds to wait for a free slot before refusing
+    "RETRY_AFTER": 1,  # seconds, sent with the 503
+    "LOCK_DIR": os.path.join(tempfile.gettempdir(), "store-password-hashing"),
+}
+
+
+def hashing_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_PASSWORD_HASHING", {})}
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins right now, please retry shortly."
+    default_code = "password_hashing_busy"
+
+    def __init__(self, retry_after):
+        super().__init__()
+        self.wait = retry_after  # DRF turns this into a Retry-After header
+
+
+# ======================
+# 🟩 Host-wide slots
+# ======================
+class HashingSlots:
+    """
+    Let at most ``MAX_CONCURRENT`` password hashes run at once on this host,
+    across every worker process and thread.
+
+    Each slot is an exclusive ``flock`` on a file under ``LOCK_DIR`` (the
+    kernel releases it if a worker dies). A caller that gets no slot within
+    ``WAIT_TIMEOUT`` raises ``PasswordHashingBusy`` (503 + Retry-After)
+    instead of piling up behind an auth spike. The hash itself runs on the
+    caller's thread; a sync worker has nothing else to do meanwhile.
+    """
+
+    poll_interval = 0.005  # seconds between rounds of non-blocking tries
+
+    def __init__(self):
+        self._local_slots = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        config = hashing_settings()
+        if fcntl is None:
+            with self._local_slot(config):
+                yield
+            return
+        fd = self._acquire(config)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _acquire(self, config):
+        os.makedirs(config["LOCK_DIR"], exist_ok=True)
+        count = max(config["MAX_CONCURRENT"], 1)
+        deadline = time.monotonic() + config["WAIT_TIMEOUT"]
+        while True:
+            start = random.randrange(count)  # spread callers over the slots
+            for offset in range(count):
+                path = os.path.join(config["LOCK_DIR"], f"slot-{(start + offset) % count}")
+                fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            if time.monotonic() >= deadline:
+                raise PasswordHashingBusy(config["RETRY_AFTER"])
+            time.sleep(self.poll_interval)
+
+    @contextmanager
+    def _local_slot(self, config):
+        with self._lock:
+            if self._local_slots is None:
+                self._local_slots = threading.BoundedSemaphore(max(config["MAX_CONCURRENT"], 1))
+        if not self._local_slots.acquire(timeout=config["WAIT_TIMEOUT"]):
+            raise PasswordHashingBusy(config["RETRY_AFTER"])
+        try:
+            yield
+        finally:
+            self._local_slots.release()
+
+    def run(self, fn, *args):
+        if not hashing_settings()["ENABLED"]:
+            return fn(*args)
+        with self.slot():
+            return fn(*args)
+
+
+hashing_slots = HashingSlots()
+
+
+def make_password(raw_password):
+    return hashing_slots.run(hashers.make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """``(is_correct, must_update)``, computed in a hashing slot."""
+    return hashing_slots.run(hashers.verify_password, raw_password, encoded)
+
+
+# ======================
+# 🟩 Middleware
+# ======================
+class PasswordHashingBusyMiddleware(MiddlewareMixin):
+    """
+    Answer ``PasswordHashingBusy`` raised outside DRF views (admin login,
+    ``authenticate()`` in plain Django views) with the same 503 + Retry-After
+    instead of a 500.
+    """
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, PasswordHashingBusy):
+            return None
+        response = HttpResponse(
+            str(exception.detail), status=exception.status_code, content_type="text/plain; charset=utf-8"
+        )
+        response["Retry-After"] = str(exception.wait)
+        return response
+
+
+# ======================
+# 🟩 Auth backend
+# ======================
+class BoundedModelBackend(ModelBackend):
+    """
+    ``ModelBackend`` with every hash taken in a ``hashing_slots`` slot.
+
+    Used by the token endpoint and admin login; when no slot frees up in
+    time they answer 503 (DRF, or ``PasswordHashingBusyMiddleware``).
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as known ones (#20760)
+            make_password(password)
+            return
+
+        is_correct, must_update = verify_password(password, user.password)
+        if is_correct and must_update:
+            user.password = make_password(password)
+            user.save(update_fields=["password"])
+        if is_correct and self.user_can_authenticate(user):
+            return user
@@ -0,0 +1,330 @@
+import hashlib
+import io
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ASYNC": True,  # False: process in the request, after commit
+    "MAX_WORKERS": 2,  # images processed at once in this process
+    "MAX_PENDING": 16,  # queued + running; past this the request processes its own upload
+    "VARIANTS": {"thumb": 320, "medium": 800, "large": 1600},  # name -> longest side (px)
+    "FORMATS": {"webp": 80, "jpeg": 82},  # variant format -> quality
+    "ORIGINAL_QUALITY": 90,  # re-encoded (metadata-free) lossy originals
+    "PENDING_TIMEOUT": 3600,  # seconds; process_images clears older image_pending (job lost at a restart)
+}
+
+# Pillow format -> (stored format, extension) for the stripped original
+ORIGINAL_FORMATS = {"JPEG": ("JPEG", "jpg"), "MPO": ("JPEG", "jpg"), "PNG": ("PNG", "png"), "WEBP": ("WEBP", "webp")}
+VARIANT_FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+
+# products/<2 hex>/<18 hex>.<ext>: named after the file's own SHA-256
+PROCESSED_NAME = re.compile(r"^products/[0-9a-f]{2}/[0-9a-f]{18}\.\w+$")
+
+
+def image_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_IMAGES", {})}
+
+
+def storage():
+    return Product._meta.get_field("image").storage
+
+
+def is_processed(name):
+    return bool(name) and PROCESSED_NAME.match(name) is not None
+
+
+# ======================
+# 🟩 Processing
+# ======================
+def _encode(image, image_format, quality):
+    buffer = io.BytesIO()
+    options = {"quality": quality} if image_format in ("JPEG", "WEBP") else {"optimize": True}
+    if image_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    # No exif=/pnginfo=: EXIF (GPS, camera serials), XMP and text chunks are dropped.
+    # The ICC profile stays so colours render the same.
+    icc_profile = image.info.get("icc_profile")
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _for_format(image, image_format):
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    if image_format == "JPEG":
+        if not has_alpha:
+            return image if image.mode == "RGB" else image.convert("RGB")
+        rgba = image.convert("RGBA")
+        flat = Image.new("RGB", rgba.size, (255, 255, 255))
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        flat.info = image.info
+        return flat
+    if has_alpha:
+        return image if image.mode == "RGBA" else image.convert("RGBA")
+    return image if image.mode in ("RGB", "L") else image.convert("RGB")
+
+
+def _put(data, extension):
+    """Store ``data`` under its own content hash; identical bytes are stored once."""
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"products/{digest[:2]}/{digest[2:20]}.{extension}"
+    files = storage()
+    if not files.exists(name):
+        saved = files.save(name, ContentFile(data))
+        if saved != name:
+            files.delete(saved)  # lost a race with an identical upload
+    return name
+
+
+def render_variants(data):
+    """
+    Decode an upload, apply its EXIF orientation and store a metadata-free
+    original plus each ``VARIANTS`` size in each ``FORMATS`` format.
+    Returns ``(original name, variants)``.
+    """
+    config = image_settings()
+    with Image.open(io.BytesIO(data)) as source:
+        source_format = source.format
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    # Encoders copy XMP / comments from info; keep only what affects the pixels
+    image.info = {key: image.info[key] for key in ("icc_profile", "transparency") if key in image.info}
+
+    image_format, extension = ORIGINAL_FORMATS.get(source_format, ("PNG", "png"))
+    original = _put(_encode(_for_format(image, image_format), image_format, config["ORIGINAL_QUALITY"]), extension)
+
+    variants = {}
+    for label, size in config["VARIANTS"].items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)  # never upscales
+        variant = {"width": resized.width, "height": resized.height}
+        for key, quality in config["FORMATS"].items():
+            image_format, extension = VARIANT_FORMATS[key]
+            variant[key] = _put(_encode(_for_format(resized, image_format), image_format, quality), extension)
+        variants[label] = variant
+    return original, variants
+
+
+def processed_fields(digest):
+    """Fields of an already-processed copy of the upload hashing to ``digest``, if any."""
+    duplicate = (
+        Product.objects.filter(image_hash=digest)
+        .exclude(image="")
+        .exclude(image__isnull=True)
+        .values("image", "image_variants")
+        .first()
+    )
+    if duplicate is None:
+        return None
+    return {"image": duplicate["image"], "image_hash": digest, "image_variants": duplicate["image_variants"]}
+
+
+def _finish(product_id, fields, **match):
+    product = Product.objects.filter(pk=product_id, **match).first()
+    if product is None:
+        return False  # deleted, or a newer upload replaced this one
+    for name, value in fields.items():
+        setattr(product, name, value)
+    product.image_pending = ""
+    # A regular save: response cache, facets and conditional GET see the change
+    product.save(update_fields=[*fields, "image_pending", "updated_at"])
+    return True
+
+
+def process_upload(product_id, data, digest):
+    """Worker job for an API upload; ``image_pending`` marks the newest one."""
+    fields = processed_fields(digest)
+    if fields is None:
+        try:
+            original, variants = render_variants(data)
+        except Exception:
+            # The product keeps its previous image; nothing is left waiting
+            Product.objects.filter(pk=product_id, image_pending=digest).update(image_pending="")
+            raise
+        fields = {"image": original, "image_hash": digest, "image_variants": variants}
+    _finish(product_id, fields, image_pending=digest)
+
+
+def process_stored(product_id, name):
+    """Worker job for a file saved straight to storage (admin, scripts, older rows)."""
+    files = storage()
+    if not files.exists(name):
+        logger.warning("Product %s image %s is missing from storage", product_id, name)
+        return
+    with files.open(name, "rb") as handle:
+        data = handle.read()
+    digest = hashlib.sha256(data).hexdigest()
+    fields = processed_fields(digest)
+    if fields is None:
+        original, variants = render_variants(data)
+        fields = {"image": original, "image_hash": digest, "image_variants": variants}
+    if _finish(product_id, fields, image=name, image_pending="") and not Product.objects.filter(image=name).exists():
+        files.delete(name)  # the raw upload, metadata and all
+
+
+# ======================
+# 🟩 Worker pool
+# ======================
+class ImagePool:
+    """
+    Run image jobs on a few background threads.
+
+    Pillow releases the GIL while decoding, resizing and encoding, so jobs
+    overlap with request threads while ``MAX_WORKERS`` caps the CPU they
+    take. Past ``MAX_PENDING`` queued jobs the caller runs its own job, which
+    slows uploads down instead of letting queued image bytes pile up.
+    Jobs are in-memory: an upload still queued at a restart is lost (the
+    product keeps its previous image, and ``manage.py process_images``
+    clears its ``image_pending`` after ``PENDING_TIMEOUT``); the same
+    command catches up on files that reached storage unprocessed.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _start(self, config):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=config["MAX_WORKERS"], thread_name_prefix="product-images"
+                )
+
+    def submit(self, fn, *args):
+        config = image_settings()
+        if not config["ASYNC"]:
+            return run_job(fn, *args)
+        if self._executor is None:
+            self._start(config)
+        with self._lock:
+            admitted = self._pending < config["MAX_PENDING"]
+            if admitted:
+                self._pending += 1
+        if not admitted:
+            return run_job(fn, *args)
+        self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        try:
+            close_old_connections()
+            run_job(fn, *args)
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        # Wait outside the lock: finishing jobs take it to count themselves out
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def run_job(fn, *args):
+    try:
+        fn(*args)
+    except Exception:
+        logger.exception("Image job %s%r failed", fn.__name__, args[:1])
+
+
+image_pool = ImagePool()
+
+
+def schedule(fn, *args):
+    transaction.on_commit(lambda: image_pool.submit(fn, *args))
+
+
+# ======================
+# 🟩 Uploads
+# ======================
+def accept_upload(upload):
+    """
+    Model fields for a validated upload plus the job that finishes it.
+
+    Identical bytes that were processed before are reused on the spot (job
+    is None). Otherwise nothing is written in the request: the product keeps
+    its current image and ``image_pending`` names the upload the worker
+    should apply.
+    """
+    upload.seek(0)
+    data = upload.read()
+    digest = hashlib.sha256(data).hexdigest()
+    fields = processed_fields(digest)
+    if fields is not None:
+        return {**fields, "image_pending": ""}, None
+    return {"image_pending": digest}, (data, digest)
+
+
+class ProcessedImageField(serializers.ImageField):
+    """
+    ``image`` as null until the pipeline has replaced the file with its
+    metadata-free copy: files saved straight to storage (admin) still carry
+    the uploader's EXIF/GPS data until then, or for good if processing failed.
+    """
+
+    def exposes(self, name):
+        return is_processed(name)
+
+    def to_representation(self, value):
+        if not self.exposes(getattr(value, "name", value)):
+            return None
+        return super().to_representation(value)
+
+
+class ImageVariantsField(serializers.Field):
+    """``image_variants`` with storage names turned into URLs, absolute with a request."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        files = storage()
+
+        def url(name):
+            location = files.url(name)
+            return request.build_absolute_uri(location) if request is not None else location
+
+        return {
+            label: {key: item if key in ("width", "height") else url(item) for key, item in variant.items()}
+            for label, variant in value.items()
+        }
+
+
+# ======================
+# 🟦 KEEP VARIANTS IN SYNC
+# ======================
+@receiver(pre_save, sender=Product)
+def clear_removed_image(sender, instance, **kwargs):
+    if not instance.image:
+        instance.image_hash = ""
+        instance.image_variants = {}
+    elif not instance.image._committed:
+        instance.image_pending = ""  # a file assigned directly supersedes queued uploads
+
+
+@receiver(post_save, sender=Product)
+def process_saved_image(sender, instance, update_fields=None, **kwargs):
+    # Files saved through ImageField.upload_to (admin, shell) get processed after the fact
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if instance.image and not instance.image_pending and not is_processed(instance.image.name):
+        schedule(process_stored, instance.pk, instance.image.name)
@@ -0,0 +1,347 @@
+import contextvars
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.renderers import BrowsableAPIRenderer
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 0.01,  # fraction of requests measured
+    "WINDOW": 1024,  # latest samples kept per route for percentiles
+    "N_PLUS_ONE_THRESHOLD": 5,  # same-shape SELECTs in one request
+    "SERVER_TIMING": False,  # add a Server-Timing header to sampled responses
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_METRICS", {})}
+
+
+# ======================
+# 🟩 Per-request sample
+# ======================
+# Bulk IN (...) / VALUES (...) lists collapse, so only the statement shape counts
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+
+def query_shape(sql):
+    return _PLACEHOLDER_LIST.sub("(%s, ...)", sql)
+
+
+class RequestSample:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.times = {"db": 0.0, "serializer": 0.0, "render": 0.0}
+        self.shapes = Counter()
+
+    def add_query(self, sql, elapsed):
+        self.queries += 1
+        self.times["db"] += elapsed
+        if sql.lstrip()[:6].upper() == "SELECT":
+            self.shapes[query_shape(sql)] += 1
+
+    def add_time(self, name, elapsed):
+        self.times[name] += elapsed
+
+    def n_plus_one_suspects(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.items() if count >= threshold]
+
+
+_sample = contextvars.ContextVar("store_request_sample", default=None)
+
+
+@contextmanager
+def measure():
+    """Record queries and timings inside the block on a fresh ``RequestSample``."""
+    sample = RequestSample()
+    token = _sample.set(sample)
+    try:
+        yield sample
+    finally:
+        _sample.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """Add the block's duration to ``name`` on the current sample, if any."""
+    sample = _sample.get()
+    if sample is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.add_time(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    sample = _sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.add_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Installed once per connection: async views query from executor threads,
+    # where a per-request execute_wrapper() on this thread wouldn't apply
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+# ======================
+# 🟩 Aggregation
+# ======================
+# name -> (help, unit suffix)
+SERIES = {
+    "duration": ("Request latency.", "seconds"),
+    "queries": ("Database queries per request.", ""),
+    "db": ("Time spent in database queries per request.", "seconds"),
+    "serializer": ("Time spent serializing per request.", "seconds"),
+    "render": ("Time spent rendering the response per request.", "seconds"),
+    "response": ("Response body size.", "bytes"),
+}
+
+
+class RouteStats:
+    def __init__(self, window):
+        self.count = 0
+        self.sums = dict.fromkeys(SERIES, 0.0)
+        self.recent = {name: deque(maxlen=window) for name in SERIES}
+        self.n_plus_one = 0
+
+
+class MetricsRegistry:
+    """Sampled per-route series, rendered as Prometheus summaries."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, key, values, suspects):
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats(metrics_settings()["WINDOW"])
+            stats.count += 1
+            for name, value in values.items():
+                stats.sums[name] += value
+                stats.recent[name].append(value)
+            stats.n_plus_one += bool(suspects)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: (stats.count, dict(stats.sums), {n: sorted(v) for n, v in stats.recent.items()}, stats.n_plus_one)
+                for key, stats in self._routes.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+        for name, (help_text, unit) in SERIES.items():
+            metric = f"store_request_{name}_{unit}" if unit else f"store_request_{name}"
+            lines += [f"# HELP {metric} {help_text} Sampled.", f"# TYPE {metric} summary"]
+            for (method, route), (count, sums, recent, _) in snapshot:
+                labels = f'method="{_escape(method)}",route="{_escape(route)}"'
+                for quantile in QUANTILES:
+                    lines.append(f'{metric}{{{labels},quantile="{quantile}"}} {percentile(recent[name], quantile):.6g}')
+                lines.append(f"{metric}_sum{{{labels}}} {sums[name]:.6g}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+
+        metric = "store_request_n_plus_one_suspects_total"
+        lines += [f"# HELP {metric} Sampled requests with repeated same-shape queries.", f"# TYPE {metric} counter"]
+        for (method, route), (_, _, _, n_plus_one) in snapshot:
+            lines.append(f'{metric}{{method="{_escape(method)}",route="{_escape(route)}"}} {n_plus_one}')
+        return "\n".join(lines) + "\n"
+
+
+def percentile(values, quantile):
+    if not values:
+        return 0
+    return values[min(int(quantile * len(values)), len(values) - 1)]
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+# ======================
+# 🟩 Connections
+# ======================
+# psycopg_pool stat -> (metric, type, help, scale)
+POOL_STATS = {
+    "pool_min": ("store_db_pool_min_size", "gauge", "Configured minimum pool size.", 1),
+    "pool_max": ("store_db_pool_max_size", "gauge", "Configured maximum pool size.", 1),
+    "pool_size": ("store_db_pool_size", "gauge", "Connections owned by the pool, idle or in use.", 1),
+    "pool_available": ("store_db_pool_available", "gauge", "Idle connections ready to hand out.", 1),
+    "requests_waiting": ("store_db_pool_requests_waiting", "gauge", "Threads waiting for a connection now.", 1),
+    "requests_num": ("store_db_pool_requests_total", "counter", "Connections asked of the pool.", 1),
+    "requests_queued": ("store_db_pool_requests_queued_total", "counter", "Requests that had to wait.", 1),
+    "requests_wait_ms": ("store_db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.", 0.001),
+    "requests_errors": ("store_db_pool_timeouts_total", "counter", "Requests that gave up waiting.", 1),
+    "connections_num": ("store_db_pool_connections_opened_total", "counter", "Connections opened by the pool.", 1),
+    "connections_ms": ("store_db_pool_connect_seconds_total", "counter", "Time spent opening connections.", 0.001),
+    "connections_lost": ("store_db_pool_connections_lost_total", "counter", "Connections that failed a check.", 1),
+}
+
+_connects = Counter()
+_connects_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    with _connects_lock:
+        _connects[connection.alias] += 1
+
+
+def pool_stats():
+    """alias -> psycopg_pool stats for every pooled database in this process."""
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
+
+
+def render_connections():
+    with _connects_lock:
+        connects = sorted(_connects.items())
+    metric = "store_db_connects_total"
+    lines = [
+        f"# HELP {metric} Connections set up by Django (new, or checked out of a pool).",
+        f"# TYPE {metric} counter",
+        *(f'{metric}{{alias="{_escape(alias)}"}} {count}' for alias, count in connects),
+    ]
+    pools = sorted(pool_stats().items())
+    if not pools:
+        return "\n".join(lines) + "\n"
+    for key, (metric, kind, help_text, scale) in POOL_STATS.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{alias="{_escape(alias)}"}} {stats.get(key, 0) * scale:.6g}' for alias, stats in pools]
+    return "\n".join(lines) + "\n"
+
+
+# ======================
+# 🟩 Middleware
+# ======================
+class InstrumentationMiddleware:
+    """
+    Measure a ``SAMPLE_RATE`` fraction of requests: latency, queries and DB
+    time (through a connection wrapper), serializer and render time (from
+    ``InstrumentedViewMixin`` / ``timed()``) and response bytes as sent.
+    Requests repeating one SELECT shape ``N_PLUS_ONE_THRESHOLD`` times are
+    logged as N+1 suspects. Unsampled requests cost one ``random()`` call.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = metrics_settings()
+        if not self.sampled(config):
+            return self.get_response(request)
+        with measure() as sample:
+            response = self.get_response(request)
+        return self.finish(request, response, sample, config)
+
+    async def __acall__(self, request):
+        config = metrics_settings()
+        if not self.sampled(config):
+            return await self.get_response(request)
+        with measure() as sample:
+            response = await self.get_response(request)
+        return self.finish(request, response, sample, config)
+
+    def sampled(self, config):
+        return config["ENABLED"] and random.random() < config["SAMPLE_RATE"]
+
+    def finish(self, request, response, sample, config):
+        elapsed = time.perf_counter() - sample.started
+        match = request.resolver_match
+        route = match.view_name if match is not None else "unmatched"
+        suspects = sample.n_plus_one_suspects(config["N_PLUS_ONE_THRESHOLD"])
+        for shape, count in suspects:
+            logger.warning("Possible N+1 on %s %s: %d x %s", request.method, route, count, shape)
+
+        metrics.record(
+            (request.method, route),
+            {
+                "duration": elapsed,
+                "queries": sample.queries,
+                "response": 0 if response.streaming else len(response.content),
+                **sample.times,
+            },
+            suspects,
+        )
+        if config["SERVER_TIMING"]:
+            response["Server-Timing"] = ", ".join(
+                f"{name};dur={value * 1000:.1f}" for name, value in (("total", elapsed), *sample.times.items())
+            )
+        return response
+
+
+# ======================
+# 🟩 ViewSet mixin
+# ======================
+class InstrumentedViewMixin:
+    """Time DRF serializers and rendering for sampled requests."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if _sample.get() is not None:
+            to_representation = serializer.to_representation
+
+            def timed_representation(instance):
+                with timed("serializer"):
+                    return to_representation(instance)
+
+            serializer.to_representation = timed_representation
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Render now to time it; the browsable API may query, so it renders later
+        if (
+            _sample.get() is not None
+            and hasattr(response, "render")
+            and not isinstance(getattr(response, "accepted_renderer", None), BrowsableAPIRenderer)
+        ):
+            with timed("render"):
+                response.render()
+        return response
@@ -0,0 +1,303 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .autocomplete import record_sales
+from .cache import bump_on_commit
+from .facets import mark_dirty as mark_facets_dirty
+from .listings import refresh_listings, refresh_listings_on_commit
+from .models import InventoryShard, Product, Reservation, ReservationItem
+
+DEFAULTS = {
+    "RESERVATION_TTL": 600,  # seconds a hold lasts before the sweeper returns it
+    "MAX_ITEMS": 50,
+}
+
+
+def inventory_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_INVENTORY", {})}
+
+
+# ======================
+# 🟩 Errors
+# ======================
+class InsufficientInventory(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Not enough inventory."
+    default_code = "insufficient_inventory"
+
+    def __init__(self, shortages):
+        super().__init__()
+        self.shortages = shortages
+        # Keep numbers as numbers; APIException would coerce them to strings
+        self.detail = {"detail": self.default_detail, "unavailable": shortages}
+
+
+class ReservationStateError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Reservation is not held."
+    default_code = "reservation_not_held"
+
+
+# ======================
+# 🟩 Stock updates
+# ======================
+def _quantity_case(quantities):
+    return Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _take_products(quantities):
+    """
+    Decrement every product in one conditional UPDATE.
+
+    ``inventory >= quantity`` is part of the WHERE clause, so the row lock
+    plus the re-checked predicate make overselling impossible; the caller
+    compares the row count and rolls back on any shortfall.
+    """
+    needed = _quantity_case(quantities)
+    updated = Product.objects.filter(
+        pk__in=list(quantities), is_active=True, inventory__gte=needed
+    ).update(inventory=F("inventory") - needed, updated_at=timezone.now())
+    if updated != len(quantities):
+        return False  # the caller rolls back
+    if Product.objects.filter(pk__in=list(quantities), inventory=0).exists():
+        # A SKU just sold out; other counts may stay in cached responses up to their TIMEOUT
+        mark_facets_dirty()
+        bump_on_commit(Product)
+    refresh_listings_on_commit(quantities)  # stock and stock status are part of the listing row
+    return True
+
+
+def _return_products(quantities):
+    returned = _quantity_case(quantities)
+    Product.objects.filter(pk__in=list(quantities)).update(
+        inventory=F("inventory") + returned, updated_at=timezone.now()
+    )
+    if Product.objects.filter(pk__in=list(quantities), inventory=returned).exists():
+        mark_facets_dirty()  # a SKU is back in stock
+        bump_on_commit(Product)
+    refresh_listings_on_commit(quantities)
+
+
+def _take_shards(product_id, quantity):
+    """
+    Take ``quantity`` from a sharded SKU; returns ``[(shard_index, taken)]``.
+
+    Starting from a random shard spreads buyers over different rows. Only
+    when no single shard can cover the request are all shards locked and
+    drained in index order.
+    """
+    indexes = list(
+        InventoryShard.objects.filter(product_id=product_id, product__is_active=True).values_list("index", flat=True)
+    )
+    if not indexes:
+        return None  # inactive products can't be reserved, as in _take_products
+    start = random.randrange(len(indexes))
+    for index in indexes[start:] + indexes[:start]:
+        taken = InventoryShard.objects.filter(
+            product_id=product_id, index=index, quantity__gte=quantity
+        ).update(quantity=F("quantity") - quantity)
+        if taken:
+            return [(index, quantity)]
+
+    shards = list(
+        InventoryShard.objects.select_for_update().filter(product_id=product_id).order_by("index")
+    )
+    if sum(shard.quantity for shard in shards) < quantity:
+        return None
+    parts, remaining = [], quantity
+    for shard in shards:
+        take = min(shard.quantity, remaining)
+        if take:
+            shard.quantity -= take
+            remaining -= take
+            parts.append((shard.index, take))
+        if not remaining:
+            break
+    InventoryShard.objects.bulk_update(shards, ["quantity"])
+    return parts
+
+
+def _return_items(items):
+    plain = Counter()
+    for item in items:
+        if item.shard is None:
+            plain[item.product_id] += item.quantity
+        else:
+            InventoryShard.objects.filter(product_id=item.product_id, index=item.shard).update(
+                quantity=F("quantity") + item.quantity
+            )
+    if plain:
+        _return_products(plain)
+
+
+def _shortages(quantities):
+    available = dict(
+        Product.objects.filter(pk__in=list(quantities), is_active=True).values_list("pk", "inventory")
+    )
+    sharded = dict(
+        InventoryShard.objects.filter(product_id__in=list(quantities))
+        .values("product_id")
+        .annotate(total=Sum("quantity"))
+        .values_list("product_id", "total")
+    )
+    shortages = []
+    for pk, quantity in quantities.items():
+        have = sharded.get(pk, available.get(pk, 0))
+        if pk not in available or have < quantity:
+            shortages.append({"product_id": pk, "requested": quantity, "available": have})
+    return shortages
+
+
+# ======================
+# 🟩 Reservations
+# ======================
+def reserve(items, user=None, ttl=None):
+    """
+    Hold stock for several SKUs at once: all items are reserved or none.
+
+    ``items`` is an iterable of ``(product_id, quantity)``.
+    """
+    quantities = Counter()
+    for product_id, quantity in items:
+        quantities[product_id] += quantity
+    ttl = inventory_settings()["RESERVATION_TTL"] if ttl is None else ttl
+
+    try:
+        with transaction.atomic():
+            sharded = set(
+                InventoryShard.objects.filter(product_id__in=list(quantities))
+                .values_list("product_id", flat=True)
+                .distinct()
+            )
+            plain = {pk: qty for pk, qty in quantities.items() if pk not in sharded}
+            if plain and not _take_products(plain):
+                raise InsufficientInventory([])
+
+            item_rows = [(pk, qty, None) for pk, qty in plain.items()]
+            for pk in sharded:
+                parts = _take_shards(pk, quantities[pk])
+                if parts is None:
+                    raise InsufficientInventory([])
+                item_rows.extend((pk, taken, index) for index, taken in parts)
+
+            reservation = Reservation.objects.create(
+                user=user, expires_at=timezone.now() + timedelta(seconds=ttl)
+            )
+            ReservationItem.objects.bulk_create(
+                ReservationItem(reservation=reservation, product_id=pk, quantity=qty, shard=shard)
+                for pk, qty, shard in item_rows
+            )
+    except InsufficientInventory:
+        # Report shortfalls from committed state, after the rollback
+        raise InsufficientInventory(_shortages(quantities)) from None
+    return reservation
+
+
+def _transition(token, to_status, **filters):
+    with transaction.atomic():
+        # Guarded status flip: of two concurrent release/commit calls only one wins
+        updated = Reservation.objects.filter(
+            pk=token, status=Reservation.HELD, **filters
+        ).update(status=to_status)
+        if not updated:
+            raise ReservationStateError()
+        if to_status in (Reservation.RELEASED, Reservation.EXPIRED):
+            _return_items(list(ReservationItem.objects.filter(reservation_id=token)))
+    return Reservation.objects.get(pk=token)
+
+
+def commit(token):
+    """Make a hold permanent (checkout succeeded). Expired holds can't be committed."""
+    reservation = _transition(token, Reservation.COMMITTED, expires_at__gt=timezone.now())
+    record_sales(token)  # autocomplete popularity
+    return reservation
+
+
+def release(token):
+    """Give held stock back (cart abandoned, payment failed)."""
+    return _transition(token, Reservation.RELEASED)
+
+
+def release_expired(batch_size=500):
+    """Return stock for holds past their TTL; returns how many were expired."""
+    expired = 0
+    tokens = Reservation.objects.filter(
+        status=Reservation.HELD, expires_at__lte=timezone.now()
+    ).values_list("pk", flat=True)[:batch_size]
+    for token in list(tokens):
+        try:
+            _transition(token, Reservation.EXPIRED)
+        except ReservationStateError:
+            continue  # committed or released meanwhile
+        expired += 1
+    return expired
+
+
+# ======================
+# 🟩 Sharded counters
+# ======================
+def shard_inventory(product, shards):
+    """Spread a hot SKU's stock over ``shards`` rows."""
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product.pk)
+        # Already sharded: the shards hold the stock, Product.inventory only mirrors it
+        total = InventoryShard.objects.filter(product=product).aggregate(total=Sum("quantity"))["total"]
+        if total is None:
+            total = product.inventory
+        InventoryShard.objects.filter(product=product).delete()
+        per_shard, extra = divmod(total, shards)
+        InventoryShard.objects.bulk_create(
+            InventoryShard(product=product, index=i, quantity=per_shard + (1 if i < extra else 0))
+            for i in range(shards)
+        )
+        Product.objects.filter(pk=product.pk).update(inventory=total, updated_at=timezone.now())
+        refresh_listings([product.pk])
+        mark_facets_dirty()
+    bump_on_commit(Product)
+
+
+def unshard_inventory(product):
+    """Fold shards back into ``Product.inventory``."""
+    with transaction.atomic():
+        total = InventoryShard.objects.filter(product=product).aggregate(total=Sum("quantity"))["total"]
+        if total is None:
+            return
+        InventoryShard.objects.filter(product=product).delete()
+        Product.objects.filter(pk=product.pk).update(inventory=total, updated_at=timezone.now())
+        refresh_listings([product.pk])
+        mark_facets_dirty()
+    bump_on_commit(Product)
+
+
+def sync_sharded_totals():
+    """Refresh ``Product.inventory`` of sharded SKUs from their shard sums."""
+    total = Subquery(
+        InventoryShard.objects.filter(product=OuterRef("pk"))
+        .values("product")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    with transaction.atomic():
+        updated = (
+            Product.objects.filter(pk__in=InventoryShard.objects.values("product_id"))
+            .exclude(inventory=total)
+            .update(inventory=total, updated_at=timezone.now())
+        )
+        if updated:
+            # Only hot SKUs are sharded: re-projecting all of them is cheap
+            refresh_listings(InventoryShard.objects.values_list("product_id", flat=True).distinct())
+    if updated:
+        bump_on_commit(Product)
+        mark_facets_dirty()
+    return updated
@@ -0,0 +1,288 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from .fast_serializers import product_serializer
+from .instrumentation import timed
+from .models import Category, Product, ProductListing
+from .search import ProductSearchFilter
+
+DEFAULTS = {
+    "ENABLED": True,  # serve product lists from ProductListing
+    "CHUNK_SIZE": 1000,  # products re-projected per query on category changes and rebuilds
+}
+
+# Columns copied from the product (everything but the primary key)
+LISTING_FIELDS = [
+    "category",
+    "category_name",
+    "category_slug",
+    "title",
+    "slug",
+    "price",
+    "stock_status",
+    "is_active",
+    "created_at",
+    "updated_at",
+    "document",
+]
+
+# Product fields that end up in a listing row; other update_fields saves skip it
+LISTING_SOURCE_FIELDS = {
+    "title", "slug", "description", "price", "category", "image", "image_variants",
+    "inventory", "is_active", "created_at", "updated_at",
+}
+
+
+def listing_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_LISTINGS", {})}
+
+
+# ======================
+# 🟩 Projection
+# ======================
+def listing_for(product):
+    """The ``ProductListing`` row for ``product`` (its category should be loaded)."""
+    category = product.category if product.category_id else None
+    return ProductListing(
+        id=product.pk,
+        category_id=product.category_id,
+        category_name=category.name if category else "",
+        category_slug=category.slug if category else "",
+        title=product.title,
+        slug=product.slug,
+        price=product.price,
+        stock_status=product.stock_status,
+        is_active=product.is_active,
+        created_at=product.created_at,
+        updated_at=product.updated_at,
+        # No request in the context: file URLs stay relative, see documents()
+        document=product_serializer.serialize(product, {}),
+    )
+
+
+def save_listings(products):
+    """Upsert the listing rows of ``products`` in one statement."""
+    rows = [listing_for(product) for product in products]
+    if rows:
+        ProductListing.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["id"], update_fields=LISTING_FIELDS
+        )
+    return len(rows)
+
+
+def refresh_listings(product_ids):
+    """
+    Re-project products changed by bulk writes (``queryset.update()``,
+    ``bulk_update``) that don't send signals. Call it inside the writing
+    transaction; ids of deleted products drop their rows.
+    """
+    ids = set(product_ids)
+    chunk_size = listing_settings()["CHUNK_SIZE"]
+    ordered = sorted(ids)
+    found = set()
+    for start in range(0, len(ordered), chunk_size):
+        products = list(Product.objects.filter(pk__in=ordered[start : start + chunk_size]).select_related("category"))
+        save_listings(products)
+        found.update(product.pk for product in products)
+    if ids - found:
+        ProductListing.objects.filter(pk__in=ids - found).delete()
+    return len(found)
+
+
+def refresh_listings_on_commit(product_ids):
+    """
+    ``refresh_listings`` once the current transaction commits, for writers
+    that shouldn't hold hot row locks while documents are rendered
+    (reservations). The products are locked again briefly so concurrent
+    refreshes land in commit order; a crash in between leaves rows that
+    ``rebuild_listings --check`` reports.
+    """
+    ids = sorted(set(product_ids))
+
+    def refresh():
+        with transaction.atomic():
+            list(Product.objects.select_for_update().filter(pk__in=ids).order_by("pk").values_list("pk", flat=True))
+            refresh_listings(ids)
+
+    transaction.on_commit(refresh)
+
+
+def _project(queryset, chunk_size):
+    count = 0
+    chunk = []
+    for product in queryset.select_related("category").order_by("pk").iterator(chunk_size=chunk_size):
+        chunk.append(product)
+        if len(chunk) >= chunk_size:
+            count += save_listings(chunk)
+            chunk = []
+    return count + save_listings(chunk)
+
+
+def rebuild_listings(missing_only=False):
+    """
+    Recompute every row in one transaction (readers keep the old rows until it
+    commits). ``missing_only`` projects products without a row, e.g. right
+    after the table was created.
+    """
+    chunk_size = listing_settings()["CHUNK_SIZE"]
+    with transaction.atomic():
+        if missing_only:
+            return _project(Product.objects.exclude(pk__in=ProductListing.objects.values("pk")), chunk_size)
+        ProductListing.objects.all().delete()
+        return _project(Product.objects.all(), chunk_size)
+
+
+def stale_listings():
+    """``(missing, stale, orphaned)`` product ids: rows that differ from a fresh projection."""
+    chunk_size = listing_settings()["CHUNK_SIZE"]
+    compared = ["category_id", *LISTING_FIELDS[1:]]
+    missing, stale = [], []
+    ids = list(Product.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), chunk_size):
+        batch = ids[start : start + chunk_size]
+        rows = ProductListing.objects.in_bulk(batch)
+        for product in Product.objects.filter(pk__in=batch).select_related("category").order_by("pk"):
+            row, fresh = rows.get(product.pk), listing_for(product)
+            if row is None:
+                missing.append(product.pk)
+            elif any(getattr(row, name) != getattr(fresh, name) for name in compared):
+                stale.append(product.pk)
+    orphaned = list(
+        ProductListing.objects.exclude(pk__in=Product.objects.values("pk")).order_by("pk").values_list("pk", flat=True)
+    )
+    return missing, stale, orphaned
+
+
+# ======================
+# 🟩 Reading
+# ======================
+_filled = False
+
+
+def listings_filled():
+    """
+    Whether every product has a listing row: products created before the
+    table existed only get one from ``rebuild_listings --missing``, and
+    would be missing from lists until then. Checked until true, then
+    remembered, since every later write projects its products.
+    """
+    global _filled
+    if not _filled:
+        _filled = not Product.objects.exclude(pk__in=ProductListing.objects.values("pk")).exists()
+    return _filled
+
+
+def documents(rows, request):
+    """The stored JSON of each row, with file URLs made absolute for ``request``."""
+    with timed("serializer"):
+        results = []
+        for row in rows:
+            data = row.document
+            if data["image"] or data["image_variants"]:
+                data = {
+                    **data,
+                    "image": data["image"] and request.build_absolute_uri(data["image"]),
+                    "image_variants": {
+                        label: {
+                            key: value if key in ("width", "height") else request.build_absolute_uri(value)
+                            for key, value in variant.items()
+                        }
+                        for label, variant in data["image_variants"].items()
+                    },
+                }
+            results.append(data)
+        return results
+
+
+class ListingReadMixin:
+    """
+    Serve ``list`` from ``ProductListing``: the same filters, ordering and
+    pagination run against the projection, and each row's stored document
+    is returned as is, so a page costs one single-table query and no
+    serializer. ``?search=`` keeps the regular path, where the search index
+    ranks results, and so do lists while the projection is still empty
+    (see ``listings_filled``). Place it right before ``CompiledReadMixin``.
+    """
+
+    # Only the columns that order/paginate, plus the document
+    listing_columns = ("id", "price", "created_at", "updated_at", "document")
+
+    def get_listing_queryset(self):
+        return ProductListing.objects.filter(is_active=True).only(*self.listing_columns)
+
+    def uses_listings(self, request):
+        return listing_settings()["ENABLED"] and not request.query_params.get(ProductSearchFilter.search_param)
+
+    def list(self, request, *args, **kwargs):
+        if not (self.uses_listings(request) and listings_filled()):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_listing_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(documents(page, request))
+        return Response(documents(queryset, request))
+
+    async def alist(self, request, *args, **kwargs):
+        if not (self.uses_listings(request) and (_filled or await sync_to_async(listings_filled)())):
+            return await super().alist(request, *args, **kwargs)
+        queryset = await sync_to_async(self.filter_queryset)(self.get_listing_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(documents(page, request))
+        return Response(documents([row async for row in queryset], request))
+
+
+class AtomicWritesMixin:
+    """
+    Run ``perform_create`` / ``perform_update`` / ``perform_destroy`` in a
+    transaction, so the projection receivers commit (or roll back) with the
+    write they follow.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
+
+
+# ======================
+# 🟦 KEEP PROJECTION IN SYNC
+# ======================
+# Receivers run in the writer's transaction: the API wraps product and
+# category writes in atomic() (AtomicWritesMixin), the admin does so itself.
+@receiver(post_save, sender=Product)
+def project_saved_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not LISTING_SOURCE_FIELDS & set(update_fields):
+        return
+    save_listings([instance])
+
+
+@receiver(post_delete, sender=Product)
+def remove_deleted_product(sender, instance, **kwargs):
+    ProductListing.objects.filter(pk=instance.pk).delete()
+
+
+@receiver(post_save, sender=Category)
+def project_category_products(sender, instance, created, **kwargs):
+    # Name, slug and the nested category JSON are copied into every product row
+    if created:
+        return
+    _project(Product.objects.filter(category=instance), listing_settings()["CHUNK_SIZE"])
+
+
+@receiver(post_delete, sender=Category)
+def project_uncategorized_products(sender, instance, **kwargs):
+    # SET_NULL moved the products without signals; their rows still name the category
+    refresh_listings(ProductListing.objects.filter(category_id=instance.pk).values_list("pk", flat=True))
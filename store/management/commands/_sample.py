@@ -0,0 +1,59 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from store.listings import refresh_listings
+from store.models import Category, Product
+
+
+def sample_products(rows=100, categories=5, seed=42):
+    """Unsaved products with realistic field values, for in-memory benchmarks."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    category_objs = [
+        Category(id=i, name=f"Category {i}", slug=f"category-{i}", description="Benchmark category")
+        for i in range(1, categories + 1)
+    ]
+    return [
+        Product(
+            id=i,
+            title=f"Product {i}",
+            slug=f"product-{i}",
+            description="Lorem ipsum dolor sit amet " * 4,
+            price=Decimal(rng.randrange(100, 100000)) / 100,
+            category=rng.choice(category_objs) if i % 10 else None,
+            image=f"products/product-{i}/photo.jpg" if i % 3 else None,
+            inventory=rng.randrange(0, 50),
+            is_active=True,
+            created_at=now - timedelta(days=i, microseconds=i),
+            updated_at=now - timedelta(hours=i),
+        )
+        for i in range(1, rows + 1)
+    ]
+
+
+def seed_catalog(prefix, rows=500, categories=5, seed=42):
+    """Save ``sample_products`` with slugs under ``prefix``; undo with ``delete_catalog``."""
+    products = sample_products(rows, categories, seed)
+    category_objs = {p.category.pk: p.category for p in products if p.category is not None}
+    for category in category_objs.values():
+        category.pk = None
+        category.name = f"{prefix} {category.name}"
+        category.slug = f"{prefix}-{category.slug}"
+    Category.objects.bulk_create(category_objs.values())
+    for product in products:
+        product.pk = None
+        product.slug = f"{prefix}-{product.slug}"
+        product.image = None
+        product.category = product.category  # picks up the pk bulk_create just set
+    Product.objects.bulk_create(products)
+    saved = list(Product.objects.filter(slug__startswith=prefix))
+    refresh_listings(product.pk for product in saved)  # bulk_create sends no signals
+    return list(Category.objects.filter(slug__startswith=prefix)), saved
+
+
+def delete_catalog(prefix):
+    Product.objects.filter(slug__startswith=prefix).delete()
+    Category.objects.filter(slug__startswith=prefix).delete()
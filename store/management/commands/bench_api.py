@@ -0,0 +1,248 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory, override_settings
+
+from store.instrumentation import QUANTILES, measure, percentile
+from store.serializers import UserClaimsTokenObtainPairSerializer
+
+from ._sample import delete_catalog, seed_catalog
+
+PREFIX = "bench-api"
+
+# label -> weight in the generated mix
+DEFAULT_MIX = {
+    "list": 25,
+    "filter": 15,
+    "search": 15,
+    "order-price": 10,
+    "order-created": 5,
+    "cursor": 5,
+    "detail": 20,
+    "create": 2,
+    "update": 3,
+}
+
+SEARCH_TERMS = ["lorem", "ipsum dolor", "product", "amet", "product 1"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog, replay a request mix through the WSGI app "
+        "in-process and report throughput, p50/p95/p99 latency and queries per "
+        "request. --baseline fails on regressions against a saved run. "
+        "Writes to the configured database: run it against a local one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1000, help="Products to seed.")
+        parser.add_argument("--categories", type=int, default=10, help="Categories to seed.")
+        parser.add_argument("--requests", type=int, default=2000, help="Measured requests.")
+        parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests first.")
+        parser.add_argument("--concurrency", type=int, default=1, help="Client threads.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed for data and request mix.")
+        parser.add_argument(
+            "--replay",
+            help="JSON lines of {method, path, body?, label?} to replay instead of the generated "
+            "mix; {product_id} and {category_id} in paths are filled from the seeded catalog.",
+        )
+        parser.add_argument("--cache", action="store_true", help="Keep the response cache on.")
+        parser.add_argument("--save-baseline", help="Write this run's results to a JSON file.")
+        parser.add_argument("--baseline", help="Compare against a saved run; fail on regressions.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25, help="Allowed latency/throughput regression (0.25 = 25%%)."
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        User = get_user_model()
+        categories, products = seed_catalog(
+            PREFIX, options["products"], options["categories"], options["seed"]
+        )
+        user = User.objects.create_user(f"{PREFIX}-user")
+        token = str(UserClaimsTokenObtainPairSerializer.get_token(user).access_token)
+        try:
+            plan = self.plan(options, rng, categories, products)
+            with override_settings(
+                STORE_RESPONSE_CACHE={"ENABLED": options["cache"]},
+                STORE_METRICS={"ENABLED": False},  # measured here instead
+            ):
+                results, elapsed = self.run(plan, token, options)
+        finally:
+            delete_catalog(PREFIX)
+            User.objects.filter(pk=user.pk).delete()
+
+        report = self.summarize(results, elapsed, options)
+        self.print_report(report)
+        if options["save_baseline"]:
+            Path(options["save_baseline"]).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+        if options["baseline"]:
+            self.compare(report, json.loads(Path(options["baseline"]).read_text()), options["tolerance"])
+
+    # ----------------------
+    # Request mix
+    # ----------------------
+    def plan(self, options, rng, categories, products):
+        total = options["warmup"] + options["requests"]
+        if options["replay"]:
+            lines = [
+                json.loads(line) for line in Path(options["replay"]).read_text().splitlines() if line.strip()
+            ]
+            if not lines:
+                raise CommandError(f"{options['replay']} has no requests.")
+            return [self.replayed(lines[i % len(lines)], rng, categories, products) for i in range(total)]
+
+        labels, weights = zip(*DEFAULT_MIX.items())
+        return [
+            self.generated(label, number, rng, categories, products)
+            for number, label in enumerate(rng.choices(labels, weights, k=total))
+        ]
+
+    def generated(self, label, number, rng, categories, products):
+        category = rng.choice(categories).pk
+        product = rng.choice(products).pk
+        if label == "list":
+            return label, "GET", f"/api/products/?page={rng.randint(1, 5)}", None
+        if label == "filter":
+            return label, "GET", f"/api/products/?category={category}", None
+        if label == "search":
+            return label, "GET", f"/api/products/?search={rng.choice(SEARCH_TERMS)}", None
+        if label == "order-price":
+            return label, "GET", f"/api/products/?ordering={rng.choice(['price', '-price'])}", None
+        if label == "order-created":
+            return label, "GET", "/api/products/?ordering=created_at", None
+        if label == "cursor":
+            return label, "GET", "/api/products/?cursor=&page_size=20", None
+        if label == "detail":
+            return label, "GET", f"/api/products/{product}/", None
+        if label == "create":
+            body = {"title": f"{PREFIX} new {number}", "price": "9.99", "category_id": category, "inventory": 5}
+            return label, "POST", "/api/products/", body
+        body = {"price": f"{rng.randint(100, 9999) / 100:.2f}"}
+        return label, "PATCH", f"/api/products/{product}/", body
+
+    def replayed(self, entry, rng, categories, products):
+        path = entry["path"].format(
+            product_id=rng.choice(products).pk, category_id=rng.choice(categories).pk
+        )
+        method = entry.get("method", "GET").upper()
+        return entry.get("label") or f"{method} {entry['path'].split('?')[0]}", method, path, entry.get("body")
+
+    # ----------------------
+    # Run
+    # ----------------------
+    def run(self, plan, token, options):
+        app = WSGIHandler()
+        factory = RequestFactory(HTTP_HOST="localhost")
+        results = []
+        lock = threading.Lock()
+
+        def send(label, method, path, body):
+            extra = {}
+            if method not in ("GET", "HEAD"):
+                extra = {"data": json.dumps(body or {}), "content_type": "application/json"}
+            environ = factory.generic(method, path, HTTP_AUTHORIZATION=f"Bearer {token}", **extra).environ
+            status = []
+            with measure() as sample:
+                started = time.perf_counter()
+                response = app(environ, lambda code, headers: status.append(int(code.split()[0])))
+                size = sum(len(chunk) for chunk in response)
+                response.close()
+                elapsed = time.perf_counter() - started
+            return label, status[0], elapsed, size, sample
+
+        def worker(requests):
+            try:
+                for request in requests:
+                    result = send(*request)
+                    with lock:
+                        results.append(result)
+            finally:
+                connections.close_all()
+
+        def phase(requests):
+            concurrency = max(options["concurrency"], 1)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(worker, [requests[i::concurrency] for i in range(concurrency)]))
+            return time.perf_counter() - started
+
+        phase(plan[: options["warmup"]])
+        results.clear()
+        elapsed = phase(plan[options["warmup"] :])
+        return results, elapsed
+
+    # ----------------------
+    # Report
+    # ----------------------
+    def summarize(self, results, elapsed, options):
+        by_label = defaultdict(list)
+        for result in results:
+            by_label[result[0]].append(result)
+
+        scenarios = {}
+        for label, rows in sorted(by_label.items()):
+            latencies = sorted(row[2] for row in rows)
+            samples = [row[4] for row in rows]
+            scenarios[label] = {
+                "count": len(rows),
+                "errors": sum(row[1] >= 400 for row in rows),
+                "server_errors": sum(row[1] >= 500 for row in rows),
+                **{f"p{int(q * 100)}_ms": percentile(latencies, q) * 1000 for q in QUANTILES},
+                "queries": sum(s.queries for s in samples) / len(rows),
+                "db_ms": sum(s.times["db"] for s in samples) / len(rows) * 1000,
+                "serializer_ms": sum(s.times["serializer"] for s in samples) / len(rows) * 1000,
+                "bytes": sum(row[3] for row in rows) / len(rows),
+            }
+        return {
+            "settings": {key: options[key] for key in ("products", "categories", "concurrency", "cache", "replay")},
+            "requests": len(results),
+            "throughput": len(results) / elapsed if elapsed else 0,
+            "scenarios": scenarios,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests at {report['settings']['concurrency']} concurrency: "
+            f"{report['throughput']:,.0f} req/s\n"
+            f"  {'scenario':<16}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'db ms':>8}{'ser ms':>8}{'errors':>8}"
+        )
+        for label, row in report["scenarios"].items():
+            self.stdout.write(
+                f"  {label:<16}{row['count']:>6}{row['p50_ms']:9.2f}{row['p95_ms']:9.2f}{row['p99_ms']:9.2f}"
+                f"{row['queries']:9.1f}{row['db_ms']:8.2f}{row['serializer_ms']:8.2f}{row['errors']:>8}"
+            )
+        if any(row["server_errors"] for row in report["scenarios"].values()):
+            raise CommandError("Some requests failed with 5xx.")
+
+    def compare(self, report, baseline, tolerance):
+        problems = []
+        if baseline["settings"] != report["settings"]:
+            self.stdout.write(self.style.WARNING(f"Baseline was recorded with {baseline['settings']}."))
+        if report["throughput"] < baseline["throughput"] * (1 - tolerance):
+            problems.append(f"throughput {baseline['throughput']:,.0f} -> {report['throughput']:,.0f} req/s")
+        for label, old in baseline["scenarios"].items():
+            new = report["scenarios"].get(label)
+            if new is None:
+                continue
+            # Query counts are deterministic: any increase is a regression
+            if new["queries"] > old["queries"] + 0.5:
+                problems.append(f"{label}: queries/request {old['queries']:.1f} -> {new['queries']:.1f}")
+            if new["p95_ms"] > old["p95_ms"] * (1 + tolerance) and new["p95_ms"] - old["p95_ms"] > 1:
+                problems.append(f"{label}: p95 {old['p95_ms']:.2f} -> {new['p95_ms']:.2f} ms")
+            if new["errors"] > old["errors"]:
+                problems.append(f"{label}: errors {old['errors']} -> {new['errors']}")
+        if problems:
+            raise CommandError("Performance regressions vs baseline:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from store.async_views import async_viewset_view
+from store.views import CategoryViewSet, ProductViewSet
+
+from ._sample import delete_catalog, seed_catalog
+
+PREFIX = "bench-asgi"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent catalog reads: the sync viewsets on a thread pool "
+        "(WSGI workers) vs store.async_views on one event loop (ASGI). "
+        "Views only, no middleware; fails if the two paths answer differently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=500, help="Rows to seed.")
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per run.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Threads / in-flight requests.")
+        parser.add_argument("--cache", action="store_true", help="Keep the response cache on.")
+
+    def handle(self, *args, **options):
+        categories, products = seed_catalog(PREFIX, options["products"])
+        try:
+            paths = self.request_mix(categories, products)
+            views = self.views()
+            with override_settings(
+                STORE_RESPONSE_CACHE={"ENABLED": options["cache"]},
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],  # the request factories' host
+            ):
+                wsgi = self.run_wsgi(views, paths, options)
+                asgi = asyncio.run(self.run_asgi(views, paths, options))
+        finally:
+            delete_catalog(PREFIX)
+
+        for label, _ in paths:
+            if self.comparable(wsgi["bodies"][label]) != self.comparable(asgi["bodies"][label]):
+                raise CommandError(f"{label}: async response differs from the sync one.")
+
+        total = options["requests"]
+        self.stdout.write(
+            f"{total} requests, {options['concurrency']} concurrent, {len(products)} products\n"
+            f"  {'path':<8}{'seconds':>9}{'req/s':>10}"
+        )
+        for label, run in (("WSGI", wsgi), ("ASGI", asgi)):
+            self.stdout.write(f"  {label:<8}{run['elapsed']:9.2f}{total / run['elapsed']:10,.0f}")
+        self.stdout.write(self.style.SUCCESS("Sync and async responses are identical."))
+
+    # ----------------------
+    # Fixtures
+    # ----------------------
+    def request_mix(self, categories, products):
+        return [
+            ("list", "/api/products/"),
+            ("page", "/api/products/?page=3&ordering=price"),
+            ("filter", f"/api/products/?category={categories[0].pk}"),
+            ("search", "/api/products/?search=lorem&page_size=20"),
+            ("cursor", "/api/products/?cursor=&page_size=20"),
+            ("detail", f"/api/products/{products[len(products) // 2].pk}/"),
+            ("cats", "/api/categories/"),
+        ]
+
+    def views(self):
+        views = {}
+        for prefix, viewset_class, basename in (
+            ("products", ProductViewSet, "product"),
+            ("categories", CategoryViewSet, "category"),
+        ):
+            for detail, actions in ((False, {"get": "list"}), (True, {"get": "retrieve"})):
+                initkwargs = {"basename": basename, "detail": detail}
+                views[prefix, detail] = (
+                    viewset_class.as_view(actions, **initkwargs),
+                    async_viewset_view(viewset_class, actions, **initkwargs),
+                )
+        return views
+
+    def comparable(self, body):
+        data = json.loads(body)
+        if isinstance(data, dict):
+            # Keyset cursors are signed with a timestamp, so links differ run to run
+            data.pop("next", None)
+            data.pop("previous", None)
+        return data
+
+    def route(self, views, path):
+        parts = path.split("?")[0].strip("/").split("/")  # api/<prefix>[/<pk>]
+        kwargs = {"pk": parts[2]} if len(parts) > 2 else {}
+        return views[parts[1], bool(kwargs)], kwargs
+
+    # ----------------------
+    # Runs
+    # ----------------------
+    def run_wsgi(self, views, paths, options):
+        factory = RequestFactory()
+        bodies = {}
+
+        def handle(number):
+            label, path = paths[number % len(paths)]
+            (view, _), kwargs = self.route(views, path)
+            try:
+                response = view(factory.get(path), **kwargs)
+                response.render()
+            finally:
+                close_old_connections()
+            bodies[label] = response.content
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(handle, range(options["requests"])))
+        elapsed = time.perf_counter() - started
+        connections.close_all()
+        return {"elapsed": elapsed, "bodies": bodies}
+
+    async def run_asgi(self, views, paths, options):
+        factory = AsyncRequestFactory()
+        slots = asyncio.Semaphore(options["concurrency"])
+        bodies = {}
+
+        async def handle(number):
+            label, path = paths[number % len(paths)]
+            (_, view), kwargs = self.route(views, path)
+            async with slots:
+                response = await view(factory.get(path), **kwargs)
+            bodies[label] = response.content
+
+        started = time.perf_counter()
+        await asyncio.gather(*(handle(number) for number in range(options["requests"])))
+        elapsed = time.perf_counter() - started
+        await sync_to_async(connections.close_all)()
+        return {"elapsed": elapsed, "bodies": bodies}
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from store.instrumentation import QUANTILES, percentile
+from store.models import Product
+
+MODES = ("per-request", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request connection cost: reconnecting every request (the "
+        "old local default), persistent per-thread connections and the "
+        "psycopg pool (PostgreSQL with psycopg 3). Each simulated request "
+        "runs the request_started/finished connection handling around one "
+        "small catalog query. Read-only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per mode.")
+        parser.add_argument("--threads", type=int, default=4, help="Threads sharing the worker's connections.")
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+        parser.add_argument("--database", default="default", help="Alias to copy connection settings from.")
+        parser.add_argument("--pool-size", type=int, help="Pool max_size (default: DB_POOL).")
+
+    def handle(self, *args, **options):
+        base = connections[options["database"]]
+        results = {}
+        for mode in options["modes"]:
+            overrides = self.mode_settings(mode, base, options)
+            if overrides is None:
+                self.stdout.write(self.style.WARNING(f"Skipping {mode}: needs PostgreSQL with psycopg 3 + psycopg_pool."))
+                continue
+            results[mode] = self.run(mode, {**base.settings_dict, **overrides}, options)
+        if not results:
+            raise CommandError("Nothing to run.")
+        self.print_report(results, options)
+
+    def mode_settings(self, mode, base, options):
+        if mode == "per-request":
+            return {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": self.without_pool(base)}
+        if mode == "persistent":
+            return {"CONN_MAX_AGE": None, "CONN_HEALTH_CHECKS": True, "OPTIONS": self.without_pool(base)}
+        if base.vendor != "postgresql" or find_spec("psycopg_pool") is None:
+            return None
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        if not is_psycopg3:
+            return None
+        pool = {**getattr(settings, "DB_POOL", {})}
+        if options["pool_size"]:
+            pool.update(max_size=options["pool_size"], min_size=min(pool.get("min_size", 1), options["pool_size"]))
+        return {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": True, "OPTIONS": {**self.without_pool(base), "pool": pool}}
+
+    def without_pool(self, base):
+        return {key: value for key, value in base.settings_dict["OPTIONS"].items() if key != "pool"}
+
+    # ----------------------
+    # Run
+    # ----------------------
+    def run(self, mode, settings_dict, options):
+        alias = f"bench-db-{mode}"
+        connections.settings[alias] = settings_dict
+        latencies = []
+        connects = [0]
+        lock = threading.Lock()
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    connects[0] += 1
+
+        def request():
+            connection = connections[alias]
+            started = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()  # request_started
+            list(Product.objects.using(alias).filter(is_active=True).order_by("-created_at").values_list("pk")[:20])
+            connection.close_if_unusable_or_obsolete()  # request_finished
+            return time.perf_counter() - started
+
+        def worker(number):
+            try:
+                timings = [request() for _ in range(number)]
+            finally:
+                connections[alias].close()
+            with lock:
+                latencies.extend(timings)
+
+        threads = max(options["threads"], 1)
+        share, extra = divmod(max(options["requests"], 1), threads)
+        connection_created.connect(count, weak=False)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(worker, [share + (i < extra) for i in range(threads)]))
+            elapsed = time.perf_counter() - started
+            pool = getattr(connections[alias], "pool", None)
+            stats = pool.get_stats() if pool is not None else {}
+        finally:
+            connection_created.disconnect(count)
+            if getattr(connections[alias], "pool", None) is not None:
+                connections[alias].close_pool()
+            del connections[alias]
+            del connections.settings[alias]
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "throughput": len(latencies) / elapsed if elapsed else 0,
+            "mean_ms": sum(latencies) / len(latencies) * 1000,
+            **{f"p{int(q * 100)}_ms": percentile(latencies, q) * 1000 for q in QUANTILES},
+            "connects": connects[0],
+            "pool": stats,
+        }
+
+    # ----------------------
+    # Report
+    # ----------------------
+    def print_report(self, results, options):
+        self.stdout.write(
+            f"{options['requests']} requests per mode on {options['threads']} threads\n"
+            f"  {'mode':<14}{'req/s':>9}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'connects':>10}"
+        )
+        for mode, row in results.items():
+            self.stdout.write(
+                f"  {mode:<14}{row['throughput']:9,.0f}{row['mean_ms']:9.3f}{row['p50_ms']:9.3f}"
+                f"{row['p95_ms']:9.3f}{row['p99_ms']:9.3f}{row['connects']:>10,}"
+            )
+        stats = results.get("pool", {}).get("pool")
+        if stats:
+            self.stdout.write(
+                f"  pool: {stats.get('connections_num', 0)} connections opened, max {stats.get('pool_max', 0)}; "
+                f"{stats.get('requests_queued', 0)} of {stats.get('requests_num', 0)} checkouts waited "
+                f"({stats.get('requests_wait_ms', 0)} ms total), {stats.get('requests_errors', 0)} timed out"
+            )
+        if "per-request" in results and len(results) > 1:
+            best_mode = min((mode for mode in results if mode != "per-request"), key=lambda m: results[m]["mean_ms"])
+            saved = results["per-request"]["mean_ms"] - results[best_mode]["mean_ms"]
+            self.stdout.write(self.style.SUCCESS(f"Connection overhead removed per request by {best_mode}: {saved:.3f} ms"))
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+
+from store import inventory
+from store.models import Product, Reservation
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress-test inventory reservations: many threads race for one SKU. "
+        "Fails if stock is oversold or lost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--attempts", type=int, default=2000, help="Total reserve calls.")
+        parser.add_argument("--stock", type=int, default=500)
+        parser.add_argument("--quantity", type=int, default=1, help="Units per reservation.")
+        parser.add_argument("--shards", type=int, default=0, help="Shard the SKU over N counters.")
+        parser.add_argument("--release-every", type=int, default=0, help="Release every Nth hold.")
+
+    def handle(self, *args, **options):
+        product = Product.objects.create(
+            title="Benchmark flash-sale SKU", price=1, inventory=options["stock"]
+        )
+        if options["shards"]:
+            inventory.shard_inventory(product, options["shards"])
+
+        counts = {"reserved": 0, "released": 0, "rejected": 0, "retried": 0}
+        lock = threading.Lock()
+        release_every = options["release_every"]
+
+        def attempt(number):
+            try:
+                while True:
+                    try:
+                        reservation = inventory.reserve(
+                            [(product.pk, options["quantity"])], ttl=600
+                        )
+                        break
+                    except OperationalError:
+                        # SQLite "database is locked": retry, other backends don't hit this
+                        with lock:
+                            counts["retried"] += 1
+                        time.sleep(0.001)
+                outcome = "reserved"
+                if release_every and number % release_every == 0:
+                    inventory.release(reservation.pk)
+                    outcome = "released"
+            except inventory.InsufficientInventory:
+                outcome = "rejected"
+            finally:
+                close_old_connections()
+                connection.close()
+            with lock:
+                counts[outcome] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            list(pool.map(attempt, range(1, options["attempts"] + 1)))
+        elapsed = time.perf_counter() - started
+
+        inventory.sync_sharded_totals()
+        product.refresh_from_db()
+        held = sum(
+            item.quantity
+            for reservation in Reservation.objects.filter(items__product=product, status=Reservation.HELD).distinct()
+            for item in reservation.items.all()
+        )
+
+        self.stdout.write(
+            f"{options['attempts']} attempts on {options['threads']} threads in {elapsed:.2f}s "
+            f"({options['attempts'] / elapsed:,.0f} ops/s)\n"
+            f"  reserved={counts['reserved']} released={counts['released']} "
+            f"rejected={counts['rejected']} lock-retries={counts['retried']}\n"
+            f"  held={held} remaining={product.inventory} stock={options['stock']}"
+        )
+
+        # Cleanup before asserting so a failed run leaves no benchmark rows
+        Reservation.objects.filter(items__product=product).delete()
+        Product.objects.filter(pk=product.pk).delete()
+
+        if held + product.inventory != options["stock"]:
+            raise CommandError("Inventory leaked: held + remaining != initial stock.")
+        if product.inventory < 0 or held > options["stock"]:
+            raise CommandError("Oversold.")
+        self.stdout.write(self.style.SUCCESS("No oversell, no lost stock."))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from store import compression
+from store.fast_serializers import product_serializer
+from store.renderers import FastJSONRenderer, MessagePackRenderer, msgpack, orjson
+
+from ._sample import sample_products
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare encode time and bytes on the wire for a product page: DRF's "
+        "JSONRenderer vs FastJSONRenderer / MessagePack, then each compression codec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Products per page.")
+        parser.add_argument("--repeat", type=int, default=200, help="Encodes per timing.")
+
+    def handle(self, *args, **options):
+        context = {"request": RequestFactory().get("/api/products/", HTTP_HOST="localhost")}
+        data = {
+            "count": options["rows"],
+            "next": None,
+            "previous": None,
+            "results": product_serializer.serialize(sample_products(options["rows"]), context, many=True),
+        }
+        repeat = options["repeat"]
+
+        def timed(encode):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                body = encode()
+            return body, (time.perf_counter() - started) / repeat
+
+        baseline, drf_time = timed(lambda: JSONRenderer().render(data))
+        self.stdout.write(f"{options['rows']} products, {repeat} encodes each\n")
+        self.stdout.write(f"  {'renderer':<22}{'ms':>9}{'bytes':>10}")
+        self.stdout.write(f"  {'JSONRenderer':<22}{drf_time * 1000:9.3f}{len(baseline):10,}")
+
+        body, fast_time = timed(lambda: FastJSONRenderer().render(data))
+        label = "FastJSON (orjson)" if orjson else "FastJSON (stdlib)"
+        self.stdout.write(f"  {label:<22}{fast_time * 1000:9.3f}{len(body):10,}")
+        if body != baseline:
+            raise CommandError("FastJSONRenderer output differs from JSONRenderer.")
+
+        if msgpack is not None:
+            packed, pack_time = timed(lambda: MessagePackRenderer().render(data))
+            self.stdout.write(f"  {'MessagePack':<22}{pack_time * 1000:9.3f}{len(packed):10,}")
+
+        self.stdout.write(f"\n  {'encoding':<22}{'ms':>9}{'bytes':>10}{'ratio':>8}")
+        for name in compression.available_encodings():
+            encoder = compression.get_encoder(name)
+            compressed, elapsed = timed(lambda: encoder.compress(baseline))
+            ratio = len(baseline) / len(compressed)
+            self.stdout.write(f"  {name:<22}{elapsed * 1000:9.3f}{len(compressed):10,}{ratio:7.1f}x")
+
+        self.stdout.write(self.style.SUCCESS("JSON output is byte-identical."))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from store.fast_serializers import product_serializer
+from store.serializers import ProductSerializer
+
+from ._sample import sample_products
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark ProductSerializer against the compiled read path on "
+        "in-memory products (no database). Fails if the JSON differs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Products per page.")
+        parser.add_argument("--categories", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=200, help="Pages serialized per timing.")
+
+    def handle(self, *args, **options):
+        products = sample_products(options["rows"], options["categories"])
+        context = {"request": RequestFactory().get("/api/products/", HTTP_HOST="localhost")}
+        render = JSONRenderer().render
+
+        expected = render(ProductSerializer(products, many=True, context=context).data)
+        actual = render(product_serializer.serialize(products, context, many=True))
+        if actual != expected:
+            raise CommandError("Compiled output differs from ProductSerializer.")
+
+        def timed(serialize):
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                serialize()
+            return (time.perf_counter() - started) / options["repeat"]
+
+        drf = timed(lambda: ProductSerializer(products, many=True, context=context).data)
+        compiled = timed(lambda: product_serializer.serialize(products, context, many=True))
+
+        self.stdout.write(
+            f"{options['rows']} products x {options['repeat']} pages\n"
+            f"  ProductSerializer:  {drf * 1000:8.3f} ms/page\n"
+            f"  compiled:           {compiled * 1000:8.3f} ms/page\n"
+            f"  speedup:            {drf / compiled:8.1f}x"
+        )
+        self.stdout.write(self.style.SUCCESS("Output is byte-identical."))
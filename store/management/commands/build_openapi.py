@@ -0,0 +1,50 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.docs import MANIFEST, SCHEMA_DIR, render_schema
+
+try:
+    import brotli
+except ImportError:  # optional, as in store/compression.py
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema into STATIC_ROOT/openapi/ as a content-hashed "
+        "JSON file plus .gz (and .br with brotli installed) for WhiteNoise to serve. "
+        "Run at build time, after collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Directory to write to (default: STATIC_ROOT/openapi).")
+
+    def handle(self, *args, **options):
+        if options["output"]:
+            output = Path(options["output"])
+        elif settings.STATIC_ROOT:
+            output = Path(settings.STATIC_ROOT) / SCHEMA_DIR
+        else:
+            raise CommandError("Set STATIC_ROOT or pass --output.")
+
+        body = render_schema()
+        name = f"openapi.{hashlib.sha256(body).hexdigest()[:12]}.json"
+        output.mkdir(parents=True, exist_ok=True)
+        for stale in output.glob("openapi.*.json*"):
+            if not stale.name.startswith(name):
+                stale.unlink()
+
+        files = {name: body, f"{name}.gz": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            files[f"{name}.br"] = brotli.compress(body, quality=11)
+        for filename, content in files.items():
+            (output / filename).write_bytes(content)
+        (output / MANIFEST).write_text(json.dumps({"schema": f"{SCHEMA_DIR}/{name}"}) + "\n")
+
+        sizes = ", ".join(f"{filename.rsplit('.', 1)[-1]} {len(content):,} B" for filename, content in files.items())
+        self.stdout.write(self.style.SUCCESS(f"Wrote {output / name} ({sizes})."))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.inventory import release_expired, sync_sharded_totals
+
+
+class Command(BaseCommand):
+    help = "Return stock held by expired reservations and refresh sharded SKU totals."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep sweeping every --interval seconds (run as a worker process).",
+        )
+        parser.add_argument("--interval", type=float, default=15.0)
+
+    def handle(self, *args, **options):
+        while True:
+            expired = 0
+            while True:
+                swept = release_expired(batch_size=options["batch_size"])
+                expired += swept
+                if swept < options["batch_size"]:
+                    break
+            synced = sync_sharded_totals()
+            self.stdout.write(f"Expired {expired} reservations, synced {synced} sharded products.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
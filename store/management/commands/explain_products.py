@@ -0,0 +1,131 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from store.models import Category, Product, ProductListing
+from store.views import ProductViewSet
+
+from ._sample import delete_catalog, seed_catalog
+
+PREFIX = "explain-products"
+
+# label -> list URL; one per filter/ordering/pagination combination the API serves
+LIST_VARIANTS = {
+    "default": "/api/products/",
+    "deep-page": "/api/products/?page=20",
+    "price": "/api/products/?ordering=price",
+    "price-desc": "/api/products/?ordering=-price",
+    "updated": "/api/products/?ordering=-updated_at",
+    "category": "/api/products/?category={category}",
+    "category-price": "/api/products/?category={category}&ordering=price",
+    "cursor": "/api/products/?cursor=&page_size=20",
+    "cursor-price": "/api/products/?cursor=&ordering=price&page_size=20",
+    "category-cursor": "/api/products/?category={category}&cursor=&page_size=20",
+    "search": "/api/products/?search=lorem",
+}
+
+# Lists read the projection (store/listings.py); search still reads store_product
+TABLES = (Product._meta.db_table, ProductListing._meta.db_table)
+
+INDEX_USAGE_SQL = """
+    SELECT indexrelname, idx_scan, idx_tup_read, pg_relation_size(indexrelid)
+    FROM pg_stat_user_indexes WHERE relname = ANY(%s) ORDER BY idx_scan, indexrelname
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Run each product list variant through ProductViewSet, EXPLAIN every "
+        "query it sends and report which index serves it. On PostgreSQL, also "
+        "list scans and size per store_product / store_productlisting index "
+        "from pg_stat_user_indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed this many synthetic products (removed afterwards) so plans reflect a real table size.",
+        )
+        parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (PostgreSQL; runs the queries).")
+
+    def handle(self, *args, **options):
+        try:
+            if options["seed"]:
+                seed_catalog(PREFIX, options["seed"], categories=10)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {', '.join(TABLES)}" if connection.vendor == "postgresql" else "ANALYZE")
+            category = Category.objects.filter(products__is_active=True).values_list("pk", flat=True).first() or 0
+            with connection.cursor() as cursor:
+                constraints = {}
+                for table in TABLES:
+                    constraints.update(connection.introspection.get_constraints(cursor, table))
+            indexes = sorted(name for name, info in constraints.items() if info["index"] or info["unique"])
+            used = {}
+            for label, path in LIST_VARIANTS.items():
+                used[label] = self.explain_variant(label, path.format(category=category), indexes, options)
+        finally:
+            if options["seed"]:
+                delete_catalog(PREFIX)
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nIndexes per variant"))
+        for label, names in used.items():
+            self.stdout.write(f"  {label:<18}{', '.join(names) or 'no index (table scan)'}")
+        if connection.vendor == "postgresql":
+            self.index_usage()
+
+    # ----------------------
+    # EXPLAIN
+    # ----------------------
+    def explain_variant(self, label, path, indexes, options):
+        statements = []
+
+        def collect(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        view = ProductViewSet.as_view({"get": "list"})
+        with override_settings(
+            STORE_RESPONSE_CACHE={"ENABLED": False},
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],  # RequestFactory's host
+        ), connection.execute_wrapper(collect):
+            response = view(RequestFactory().get(path))
+            response.render()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label}: GET {path} -> {response.status_code}"))
+        explain_options = {"analyze": True, "buffers": True} if options["analyze"] and connection.vendor == "postgresql" else {}
+        prefix = connection.ops.explain_query_prefix(**explain_options)
+        used = []
+        for sql, params in statements:
+            if not sql.lstrip().upper().startswith("SELECT") or Product._meta.db_table not in sql:
+                continue
+            self.stdout.write(f"  {sql if options['verbosity'] > 1 else self.shorten(sql)}")
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                plan = [str(row[-1]) for row in cursor.fetchall()]  # PostgreSQL: one line per row; SQLite: detail
+            for line in plan:
+                self.stdout.write(f"    {line}")
+            text = "\n".join(plan)
+            used += [name for name in indexes if re.search(rf"\b{re.escape(name)}\b", text) and name not in used]
+        return used
+
+    def shorten(self, sql, width=150):
+        sql = " ".join(sql.split())
+        return sql if len(sql) <= width else f"{sql[:width]}..."
+
+    # ----------------------
+    # Usage
+    # ----------------------
+    def index_usage(self):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{' / '.join(TABLES)} index usage since the last stats reset"))
+        self.stdout.write(f"  {'index':<40}{'scans':>10}{'tuples read':>14}{'size':>12}")
+        with connection.cursor() as cursor:
+            cursor.execute(INDEX_USAGE_SQL, [list(TABLES)])
+            for name, scans, tuples, size in cursor.fetchall():
+                style = self.style.WARNING if scans == 0 else str
+                self.stdout.write(style(f"  {name:<40}{scans:>10,}{tuples:>14,}{size / 1024:>10,.0f}kB"))
+        self.stdout.write("  Indexes with 0 scans cost every write and serve no reads.")
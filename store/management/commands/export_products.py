@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from store.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_lines
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Stream the product catalog (joined with categories) as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", "-o", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Also export soft-deleted products.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Product.objects.all()
+        if not options["include_inactive"]:
+            queryset = queryset.filter(is_active=True)
+
+        lines = export_lines(queryset, options["format"], chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as handle:
+                handle.writelines(lines)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            sys.stdout.writelines(lines)
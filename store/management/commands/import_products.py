@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.bulk import DEFAULT_CHUNK_SIZE, ProductImporter, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    help = "Upsert products from an NDJSON or CSV feed (keyed on slug)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Feed file, or '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "csv"],
+            help="Feed format (default: guessed from the file extension, else ndjson).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate and classify rows without writing.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        feed_format = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        reader = read_csv if feed_format == "csv" else read_ndjson
+
+        try:
+            handle = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        importer = ProductImporter(chunk_size=options["chunk_size"], dry_run=options["dry_run"])
+        with handle:
+            report = importer.run(reader(handle))
+
+        for error in report.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report.rows} rows in {report.seconds:.2f}s "
+                f"({report.rows_per_second:,.0f} rows/s): "
+                f"{report.created} created, {report.updated} updated, "
+                f"{report.merged} merged, {report.rejected} rejected"
+            )
+        )
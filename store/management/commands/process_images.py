@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store.images import image_settings, is_processed, process_stored, run_job
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the image pipeline over products whose image was saved without it "
+        "(admin uploads the worker pool lost, rows from before the pipeline): "
+        "strip metadata, store under content hashes and build the variants. "
+        "Also clears image_pending left by uploads whose job was lost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=0, help="Stop after this many products (0: all).")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=image_settings()["PENDING_TIMEOUT"])
+        abandoned = Product.objects.exclude(image_pending="").filter(updated_at__lt=cutoff).update(image_pending="")
+        if abandoned:
+            self.stdout.write(f"Cleared {abandoned} abandoned pending uploads.")
+
+        queryset = Product.objects.exclude(image="").exclude(image__isnull=True).order_by("pk")
+        processed = 0
+        for pk, name in queryset.values_list("pk", "image").iterator():
+            if is_processed(name):
+                continue
+            run_job(process_stored, pk, name)  # in this process, no pool
+            processed += 1
+            if processed == options["limit"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} product images."))
@@ -0,0 +1,100 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: what a gunicorn worker does before its first request
+BOOT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from config.wsgi import application
+app = time.perf_counter()
+print(json.dumps({
+    "setup": setup - start,
+    "wsgi": app - setup,
+    "total": app - start,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+# Only needed to serve /swagger/ and /redoc/; should not load while booting.
+# The bare drf_yasg package is fine: it is in INSTALLED_APPS for its templates.
+DOCS_ONLY = "drf_yasg."
+
+# Third-party imports we know are slow but can't avoid (they sit on the request path)
+KNOWN = {
+    "django.test": "via rest_framework_simplejwt.settings (django.test.signals)",
+    "rest_framework.compat": "DRF probes optional yaml/coreapi/pygments/markdown",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Boot the WSGI app (settings, apps, URLconf) in fresh interpreters and "
+        "report wall time plus `python -X importtime` self time per package, "
+        "the slowest imports and any docs-only dependency loaded at boot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh boots to time (default 5).")
+        parser.add_argument("--top", type=int, default=15, help="Packages / imports to list (default 15).")
+
+    def handle(self, *args, **options):
+        runs = [self.boot()[0] for _ in range(max(options["runs"], 1))]
+        boot, importtime = self.boot("-X", "importtime")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Worker boot ({len(runs)} runs, median)"))
+        for key in ("setup", "wsgi", "total"):
+            self.stdout.write(f"  {key:<8}{statistics.median(run[key] for run in runs) * 1000:>8.1f} ms")
+
+        rows = self.parse_importtime(importtime)
+        packages = defaultdict(int)
+        for self_us, _, name in rows:
+            packages[name.split(".")[0]] += self_us
+        total_us = sum(packages.values()) or 1
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nImport self time by package"))
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[: options["top"]]:
+            self.stdout.write(f"  {package:<28}{self_us / 1000:>8.1f} ms{self_us / total_us:>7.1%}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("\nSlowest imports (cumulative)"))
+        for _, cumulative_us, name in sorted(rows, key=lambda row: -row[1])[: options["top"]]:
+            note = KNOWN.get(name, "")
+            self.stdout.write(f"  {name:<48}{cumulative_us / 1000:>8.1f} ms  {note}".rstrip())
+
+        loaded = [name for name in boot["modules"] if name.startswith(DOCS_ONLY)]
+        if loaded:
+            self.stdout.write(self.style.WARNING(f"\nDocs-only modules imported at boot: {', '.join(loaded)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nNo docs-only modules imported at boot."))
+
+    def boot(self, *flags):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")}
+        result = subprocess.run(
+            [sys.executable, *flags, "-c", BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"Boot failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout), result.stderr
+
+    def parse_importtime(self, output):
+        # "import time: self [us] | cumulative | imported package"
+        rows = []
+        for line in output.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((int(self_us), int(cumulative_us), name.strip()))
+        return rows
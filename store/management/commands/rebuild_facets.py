@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.facets import rebuild_summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the FacetCount summary behind /api/products/facets/."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-dirty",
+            action="store_true",
+            help="Skip the rebuild unless a bulk write flagged the summary (cheap to run often).",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep checking every --interval seconds (run as a worker process).",
+        )
+        parser.add_argument("--interval", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        while True:
+            rows = rebuild_summary(if_dirty=options["if_dirty"])
+            if rows is not None:
+                self.stdout.write(self.style.SUCCESS(f"Rebuilt facet summary ({rows} rows)."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.listings import rebuild_listings, stale_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ProductListing projection behind the product list endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing", action="store_true", help="Only project products that have no row yet (cheap, for deploys)."
+        )
+        parser.add_argument(
+            "--check", action="store_true", help="Compare rows with a fresh projection; fail on drift, write nothing."
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            missing, stale, orphaned = stale_listings()
+            if missing or stale or orphaned:
+                raise CommandError(
+                    f"Listing drift: {len(missing)} missing, {len(stale)} stale, {len(orphaned)} orphaned "
+                    f"(first ids: {(missing + stale + orphaned)[:10]}). Run rebuild_listings."
+                )
+            self.stdout.write(self.style.SUCCESS("Listings match their products."))
+            return
+
+        count = rebuild_listings(missing_only=options["missing"])
+        self.stdout.write(self.style.SUCCESS(f"Projected {count} products into ProductListing."))
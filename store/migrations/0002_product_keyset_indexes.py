@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_baseline_model_drift'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='store_produ_price_2d55a6_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='store_produ_created_0fbdf8_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='store_produ_price_aba1d8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='store_produ_created_68f480_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'id'], name='store_produ_updated_b46f77_idx'),
+        ),
+    ]
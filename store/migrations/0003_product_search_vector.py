@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:59
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+BACKFILL_SQL = """
+UPDATE store_product p SET search_vector =
+    setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(
+        (SELECT c.name FROM store_category c WHERE c.id = p.category_id), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # GIN indexes and tsvector only exist on PostgreSQL; SQLite uses the
+    # in-process search backend instead.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX store_product_search_gin ON store_product USING gin (search_vector)"
+    )
+    schema_editor.execute(BACKFILL_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS store_product_search_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:07
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+
+PRICE_EDGES = [Decimal(edge) for edge in ("0", "10", "25", "50", "100", "250", "500", "1000")]
+
+
+def populate_facet_counts(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    FacetCount = apps.get_model("store", "FacetCount")
+    db_alias = schema_editor.connection.alias
+    bucket = models.Case(
+        *[models.When(price__lt=edge, then=models.Value(i)) for i, edge in enumerate(PRICE_EDGES[1:])],
+        default=models.Value(len(PRICE_EDGES) - 1),
+        output_field=models.IntegerField(),
+    )
+    in_stock = models.Case(
+        models.When(inventory__gt=0, then=models.Value(True)), default=models.Value(False)
+    )
+    rows = (
+        Product.objects.using(db_alias)
+        .filter(is_active=True)
+        .annotate(bucket=bucket, in_stock=in_stock)
+        .values("category_id", "bucket", "in_stock")
+        .annotate(count=models.Count("pk"))
+    )
+    FacetCount.objects.using(db_alias).bulk_create(FacetCount(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0005_inventory_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('in_stock', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('category', 'bucket', 'in_stock'), name='store_facetcount_key'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('bucket', 'in_stock'), name='store_facetcount_uncategorized_key')],
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
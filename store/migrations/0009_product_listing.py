@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_product_active_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('category_name', models.CharField(blank=True, max_length=200)),
+                ('category_slug', models.SlugField(blank=True, max_length=200)),
+                ('title', models.CharField(max_length=255)),
+                ('slug', models.SlugField(max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('stock_status', models.CharField(max_length=20)),
+                ('is_active', models.BooleanField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('document', models.JSONField()),
+                ('category', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='store.category')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='listing_active_created_idx'), models.Index(condition=models.Q(('is_active', True)), fields=['price', 'id'], name='listing_active_price_idx'), models.Index(condition=models.Q(('is_active', True)), fields=['updated_at', 'id'], name='listing_active_updated_idx'), models.Index(condition=models.Q(('is_active', True)), fields=['category', '-created_at', '-id'], name='listing_active_cat_created_idx'), models.Index(condition=models.Q(('is_active', True)), fields=['category', 'price', 'id'], name='listing_active_cat_price_idx')],
+            },
+        ),
+    ]
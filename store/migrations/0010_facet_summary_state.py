@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:21
+
+from django.db import migrations, models
+
+
+def flag_summary_dirty(apps, schema_editor):
+    # The flag used to live in the cache: rebuild once rather than lose it
+    FacetSummaryState = apps.get_model("store", "FacetSummaryState")
+    FacetSummaryState.objects.using(schema_editor.connection.alias).create(pk=1, dirty=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_product_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetSummaryState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dirty', models.BooleanField(default=False)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(flag_summary_dirty, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,34 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
-from django.utils.text import slugify
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.postgres.search import SearchVectorField
+
+from .slugs import allocate_slugs
+
+
+# ======================
+# 🟩 LOADED VALUES
+# ======================
+class LoadedValuesMixin:
+    """
+    Keep the column values a row was loaded with on ``_loaded_values``, so
+    save() receivers can tell what changed without querying the old row
+    (store/facets.py, store/search.py). Refreshed instances drop them.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop("_loaded_values", None)
 
 
 # ======================
@@ -32,7 +58,7 @@ class User(AbstractUser):
 # ======================
 # 🟩 CATEGORY MODEL
 # ======================
-class Category(models.Model):
+class Category(LoadedValuesMixin, models.Model):
     name = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     description = models.TextField(blank=True)
@@ -48,32 +74,63 @@ def product_image_upload_path(instance, filename):
     return f"products/{instance.slug}/{filename}"
 
 
-class Product(models.Model):
+class Product(LoadedValuesMixin, models.Model):
     title = models.CharField(max_length=255)
-    slug = models.SlugField(max_length=255, unique=True, blank=True, db_index=True)
+    slug = models.SlugField(max_length=255, unique=True, blank=True)
     description = models.TextField(blank=True)
-    price = models.DecimalField(max_digits=10, decimal_places=2, db_index=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
 
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,  # keep products if category deleted
         null=True,
-        related_name="products",
-        db_index=True
+        related_name="products",  # FK index kept: SET NULL on delete covers inactive rows
     )
     image = models.ImageField(upload_to=product_image_upload_path, null=True, blank=True)
+    # Filled in by the image pipeline (store/images.py): SHA-256 of the upload
+    # behind `image`, the upload still being processed, and the resized
+    # variants as {name: {"width", "height", "webp", "jpeg"}} storage names.
+    image_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+    image_pending = models.CharField(max_length=64, blank=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     inventory = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)  # soft delete
 
-    created_at = models.DateTimeField(auto_now_add=True,db_index=True)
-    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Weighted title/category/description tsvector, maintained in store/search.py.
+    # Only populated on PostgreSQL; the GIN index is created by migration 0003.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
+        # The API only lists active products, so its filter/order combinations
+        # get partial indexes; (field, id) pairs serve keyset pagination (see
+        # store/pagination.py). The change feed reads inactive rows too.
+        # `manage.py explain_products` shows which index each list query uses.
         indexes = [
-            models.Index(fields=["price"]),
-            models.Index(fields=["category"]),
-            models.Index(fields=["-created_at"]),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="product_active_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(is_active=True),
+                name="product_active_price_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="product_active_cat_created_idx",
+            ),
+            models.Index(
+                fields=["category", "price", "id"],
+                condition=models.Q(is_active=True),
+                name="product_active_cat_price_idx",
+            ),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     @property
@@ -84,16 +141,201 @@ class Product(models.Model):
         return self.title
 
 
+# ======================
+# 🟩 INVENTORY RESERVATIONS
+# ======================
+class Reservation(models.Model):
+    # Stock is taken from Product.inventory (or its shards) when the
+    # reservation is created; release/expiry puts it back. See store/inventory.py.
+    HELD = "held"
+    COMMITTED = "committed"
+    RELEASED = "released"
+    EXPIRED = "expired"
+    STATUS_CHOICES = [
+        (HELD, "Held"),
+        (COMMITTED, "Committed"),
+        (RELEASED, "Released"),
+        (EXPIRED, "Expired"),
+    ]
+
+    token = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="reservations",
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=HELD)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),  # TTL sweeper
+        ]
+
+    def __str__(self):
+        return f"{self.token} ({self.status})"
+
+
+class ReservationItem(models.Model):
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="reservation_items")
+    quantity = models.PositiveIntegerField()
+    shard = models.PositiveSmallIntegerField(null=True, blank=True)  # set for sharded SKUs
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id}"
+
+
+class InventoryShard(models.Model):
+    # Hot SKUs split their stock over N rows so concurrent buyers update
+    # different rows; Product.inventory is refreshed from the shard sum.
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="inventory_shards")
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["product", "index"], name="store_inventoryshard_product_index"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}#{self.index}: {self.quantity}"
+
+
+# ======================
+# 🟩 FACET SUMMARY
+# ======================
+class FacetCount(models.Model):
+    # Active products per (category, price bucket, in stock), kept up to date
+    # on Product save/delete so the unfiltered sidebar needs no GROUP BY.
+    # See store/facets.py.
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, related_name="+")
+    bucket = models.PositiveSmallIntegerField()
+    in_stock = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "bucket", "in_stock"],
+                condition=models.Q(category__isnull=False),
+                name="store_facetcount_key",
+            ),
+            models.UniqueConstraint(
+                fields=["bucket", "in_stock"],
+                condition=models.Q(category__isnull=True),
+                name="store_facetcount_uncategorized_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id}/{self.bucket}/{self.in_stock}: {self.count}"
+
+
+class FacetSummaryState(models.Model):
+    # Single row: whether FacetCount needs a rebuild after bulk writes that
+    # skip signals. Rebuilds lock it, so one worker recomputes at a time.
+    dirty = models.BooleanField(default=False)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return "dirty" if self.dirty else f"rebuilt {self.rebuilt_at}"
+
+
+# ======================
+# 🟩 LISTING PROJECTION
+# ======================
+class ProductListing(models.Model):
+    # One flattened row per product, written in the same transaction as the
+    # product (or its category) and read by the product list endpoint:
+    # category name/slug and stock status are copied in, `document` is the
+    # product's API JSON without request-specific (absolute) URLs.
+    # Rebuilt by `manage.py rebuild_listings`, see store/listings.py.
+    id = models.BigIntegerField(primary_key=True)  # Product.id
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,  # re-projected by a post_delete receiver
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    category_name = models.CharField(max_length=200, blank=True)
+    category_slug = models.SlugField(max_length=200, blank=True)
+    title = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    stock_status = models.CharField(max_length=20)
+    is_active = models.BooleanField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    document = models.JSONField()
+
+    class Meta:
+        # Same list filter/order combinations as Product's partial indexes
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="listing_active_created_idx",
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(is_active=True),
+                name="listing_active_price_idx",
+            ),
+            models.Index(
+                fields=["updated_at", "id"],
+                condition=models.Q(is_active=True),
+                name="listing_active_updated_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="listing_active_cat_created_idx",
+            ),
+            models.Index(
+                fields=["category", "price", "id"],
+                condition=models.Q(is_active=True),
+                name="listing_active_cat_price_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+# ======================
+# 🟩 SLUG SEQUENCES
+# ======================
+class SlugSequence(models.Model):
+    # Last suffix handed out per slug base ("blue-shirt" -> blue-shirt-7).
+    # Rows are locked while reserving, see store/slugs.py.
+    scope = models.CharField(max_length=100)  # model label, e.g. "store.product"
+    base = models.CharField(max_length=255)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "base"], name="store_slugsequence_scope_base"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.base}#{self.last_value}"
+
+
 # ======================
 # 🟦 AUTO GENERATE SLUGS
 # ======================
 @receiver(pre_save, sender=Product)
-def generate_product_slug(sender, instance, **kwargs):
+def generate_product_slug(sender, instance, using, **kwargs):
     if not instance.slug:
-        instance.slug = slugify(instance.title)
+        instance.slug = allocate_slugs(Product, [instance.title], fallback="product", using=using)[0]
 
 
 @receiver(pre_save, sender=Category)
-def generate_category_slug(sender, instance, **kwargs):
+def generate_category_slug(sender, instance, using, **kwargs):
     if not instance.slug:
-        instance.slug = slugify(instance.name)
+        instance.slug = allocate_slugs(Category, [instance.name], fallback="category", using=using)[0]
@@ -0,0 +1,337 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# ======================
+# 🟩 Page number pagination
+# ======================
+class StandardResultsSetPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views: COUNT and the page via the async ORM."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()  # primes the cached_property
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+
+# ======================
+# 🟩 Planner row estimates
+# ======================
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` without running COUNT(*).
+
+    Only PostgreSQL exposes cheap statistics; other backends return ``None``.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+# ======================
+# 🟩 Keyset (cursor) pagination
+# ======================
+class KeysetPagination(BasePagination):
+    """
+    Constant-cost pagination over ``(ordering field, id)``.
+
+    Each page is fetched with a ``WHERE (field, id) < (last_field, last_id)``
+    style predicate instead of ``OFFSET``, so page 5000 costs the same as page 1
+    and no ``COUNT(*)`` is issued. Cursors are signed, so clients can't forge
+    positions or swap the ordering underneath a cursor.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    cursor_query_param = "cursor"
+    estimate_query_param = "estimate"
+
+    # Only non-null columns backed by a composite (field, id) index
+    ordering_fields = ["created_at", "price", "updated_at"]
+    default_ordering = "-created_at"
+    tie_breaker = "id"
+
+    signing_salt = "store.pagination.keyset"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_query = self.prepare(queryset, request)
+        results = list(page_query)
+        estimated_count = estimate_count(queryset) if self.wants_estimate(request) else None
+        return self.finish(results, estimated_count)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_query = self.prepare(queryset, request)
+        results = [obj async for obj in page_query]
+        estimated_count = None
+        if self.wants_estimate(request):
+            estimated_count = await sync_to_async(estimate_count)(queryset)
+        return self.finish(results, estimated_count)
+
+    def prepare(self, queryset, request):
+        """Read the cursor and return the (unevaluated) page query."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.cursor = cursor
+        self.reverse = cursor is not None and cursor["d"] == "prev"
+
+        order_by = self.ordering if not self.reverse else [_flip(f) for f in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if cursor is not None:
+            queryset = queryset.filter(self.keyset_filter(order_by, cursor["v"]))
+
+        # Fetch one extra row to learn whether another page exists
+        return queryset[: self.page_size + 1]
+
+    def finish(self, results, estimated_count):
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.estimated_count = estimated_count
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.estimated_count is not None:
+            payload["estimated_count"] = self.estimated_count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "estimated_count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque keyset cursor. Send an empty value for the first page.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.estimate_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include an approximate total from planner statistics.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    # ----------------------
+    # Ordering
+    # ----------------------
+    def get_ordering(self, queryset):
+        """
+        Reuse the ordering chosen by ``OrderingFilter`` and append the id
+        tie-breaker in the same direction as the leading field, so a single
+        ``(field, id)`` index scan serves the page.
+        """
+        requested = [f for f in queryset.query.order_by if isinstance(f, str)]
+        fields = [f for f in requested if f.lstrip("-") in self.ordering_fields]
+        if not fields:
+            fields = [self.default_ordering]
+
+        descending = fields[0].startswith("-")
+        tie_breaker = f"-{self.tie_breaker}" if descending else self.tie_breaker
+        return fields + [tie_breaker]
+
+    def keyset_filter(self, order_by, values):
+        """
+        Build ``(f1, f2, ...) > (v1, v2, ...)`` honouring per-field direction.
+
+        The redundant leading ``f1 >= v1`` bound lets the planner use the
+        composite index as a range scan rather than a filter.
+        """
+        if len(values) != len(order_by):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(order_by, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+
+        leading = order_by[0]
+        bound = "lte" if leading.startswith("-") else "gte"
+        return Q(**{f"{leading.lstrip('-')}__{bound}": values[0]}) & condition
+
+    # ----------------------
+    # Cursors
+    # ----------------------
+    def encode_cursor(self, instance, direction):
+        values = [_jsonable(getattr(instance, f.lstrip("-"))) for f in self.ordering]
+        payload = {"o": self.ordering, "v": values, "d": direction}
+        return signing.dumps(payload, salt=self.signing_salt, compress=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = signing.loads(encoded, salt=self.signing_salt)
+        except signing.BadSignature:
+            raise NotFound(self.invalid_cursor_message)
+        if payload.get("o") != self.ordering or payload.get("d") not in ("next", "prev"):
+            raise NotFound(self.invalid_cursor_message)
+        return payload
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = self.encode_cursor(self.page[-1], "next")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        cursor = self.encode_cursor(self.page[0], "prev")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    # ----------------------
+    # Query params
+    # ----------------------
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def wants_estimate(self, request):
+        value = request.query_params.get(self.estimate_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+
+# ======================
+# 🟩 Product pagination
+# ======================
+class ProductPagination(StandardResultsSetPagination):
+    """
+    Page numbers stay the default for existing clients; sending ``?cursor=``
+    (empty for the first page) switches the request to keyset pagination.
+    """
+
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.search_matches = getattr(request, "search_matches", None)  # see ProductSearchFilter
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.search_matches = getattr(request, "search_matches", None)
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            response = self.keyset.get_paginated_response(data)
+        else:
+            response = super().get_paginated_response(data)
+        if self.search_matches is not None:
+            # The search only listed its best matches; this many matched in all
+            response.data["search_matches"] = self.search_matches
+        return response
+
+    def get_schema_operation_parameters(self, view):
+        params = super().get_schema_operation_parameters(view)
+        names = {p["name"] for p in params}
+        extra = self.keyset_class().get_schema_operation_parameters(view)
+        return params + [p for p in extra if p["name"] not in names]
+
+
+def _flip(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
@@ -0,0 +1,92 @@
+import datetime
+import decimal
+
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional, see requirements
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, see requirements
+    msgpack = None
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    # Everything orjson doesn't know natively (Decimal, lazy strings,
+    # querysets, timedelta...) is encoded exactly like DRF does
+    return _drf_encoder.default(obj)
+
+
+# ======================
+# 🟩 JSON
+# ======================
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    ``JSONRenderer`` backed by orjson when it's installed.
+
+    orjson encodes dicts, lists, datetimes (``Z`` for UTC, like DRF) and UUIDs
+    in C and returns bytes directly; anything else goes through DRF's encoder.
+    Indented output (``Accept: application/json; indent=4``, the browsable
+    API) and non-default JSON settings keep the stdlib path.
+    """
+
+    if orjson is not None:
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_default, option=self.options)
+        # Same strict-javascript-subset escaping as DRF
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+# ======================
+# 🟩 MessagePack
+# ======================
+def _msgpack_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)  # keep exact prices, unlike JSON's float
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        return representation[:-6] + "Z" if representation.endswith("+00:00") else representation
+    return _drf_encoder.default(obj)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """Binary format for internal services: ``Accept: application/msgpack``."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            raise ParseError("Empty request body.")
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except Exception as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
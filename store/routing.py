@@ -0,0 +1,261 @@
+import contextvars
+import itertools
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULTS = {
+    "REPLICAS": [],  # database aliases serving catalog reads
+    "STRATEGY": "round_robin",  # or "least_loaded" (fewest requests in flight)
+    "PIN_SECONDS": 5,  # a writer's reads stay on the primary this long
+    "PIN_CACHE_ALIAS": "catalog",  # must be seen by every worker, see CACHES
+    "MAX_LAG": 5,  # seconds; replicas further behind are skipped
+    "LAG_CHECK_INTERVAL": 10,  # seconds between lag probes per replica
+}
+
+PRIMARY = "default"
+
+
+def routing_settings():
+    return {**DEFAULTS, **getattr(settings, "STORE_DB_ROUTING", {})}
+
+
+# ======================
+# 🟩 Per-request state
+# ======================
+class RoutingState:
+    """What the current request may read from; set up by ``ReplicaRoutingMiddleware``."""
+
+    def __init__(self):
+        self.replica_reads = False  # opted in by ReplicaReadMixin
+        self.replica = None  # picked on the first routed read
+        self.wrote = False  # any write sends the rest of the request to the primary
+
+
+_state = contextvars.ContextVar("store_routing_state", default=None)
+
+
+def current_state():
+    return _state.get()
+
+
+def replica_window():
+    """Seconds of writes a replica read may be missing (0 on the primary)."""
+    state = current_state()
+    if state is None or state.replica is None or state.replica == PRIMARY:
+        return 0
+    return routing_settings()["MAX_LAG"]
+
+
+# ======================
+# 🟩 Replica pool
+# ======================
+# Lag probe per vendor; replicas on other backends count as current
+LAG_SQL = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+    """,
+}
+
+
+class ReplicaPool:
+    """
+    Replica selection: round-robin or least-loaded over the replicas that are
+    reachable and within ``MAX_LAG``. Lag is probed at most every
+    ``LAG_CHECK_INTERVAL`` seconds per replica; with none healthy, reads
+    fall back to the primary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cycle = None
+        self._aliases = ()
+        self._in_flight = {}
+        self._lag = {}  # alias -> (checked_at, lag seconds or None if unreachable)
+
+    def replicas(self):
+        aliases = tuple(alias for alias in routing_settings()["REPLICAS"] if alias in settings.DATABASES)
+        if aliases != self._aliases:
+            with self._lock:
+                self._aliases = aliases
+                self._cycle = itertools.cycle(aliases)
+        return aliases
+
+    def healthy(self, alias, config):
+        checked_at, lag = self._lag.get(alias, (None, None))
+        now = time.monotonic()
+        if checked_at is None or now - checked_at > config["LAG_CHECK_INTERVAL"]:
+            lag = self.measure_lag(alias)
+            self._lag[alias] = (now, lag)
+        return lag is not None and lag <= config["MAX_LAG"]
+
+    def measure_lag(self, alias):
+        connection = connections[alias]
+        sql = LAG_SQL.get(connection.vendor)
+        if sql is None:
+            return 0
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                return float(cursor.fetchone()[0] or 0)
+        except DatabaseError:
+            return None  # unreachable: skipped until the next probe
+
+    def acquire(self):
+        config = routing_settings()
+        aliases = self.replicas()
+        if not aliases:
+            return PRIMARY
+        if config["STRATEGY"] == "least_loaded":
+            candidates = sorted(aliases, key=lambda alias: self._in_flight.get(alias, 0))
+        else:
+            with self._lock:
+                candidates = [next(self._cycle) for _ in aliases]
+        for alias in candidates:
+            if self.healthy(alias, config):
+                with self._lock:
+                    self._in_flight[alias] = self._in_flight.get(alias, 0) + 1
+                return alias
+        return PRIMARY
+
+    def release(self, alias):
+        if alias in (None, PRIMARY):
+            return
+        with self._lock:
+            self._in_flight[alias] = max(self._in_flight.get(alias, 0) - 1, 0)
+
+    def reset(self):
+        with self._lock:
+            self._in_flight.clear()
+            self._lag.clear()
+            self._aliases = ()
+
+
+replica_pool = ReplicaPool()
+
+
+# ======================
+# 🟩 Read-your-writes pins
+# ======================
+def _pin_key(user_id):
+    return f"store:db-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    config = routing_settings()
+    if config["PIN_SECONDS"] > 0:
+        caches[config["PIN_CACHE_ALIAS"]].set(_pin_key(user_id), 1, timeout=config["PIN_SECONDS"])
+
+
+def is_pinned(user_id):
+    return caches[routing_settings()["PIN_CACHE_ALIAS"]].get(_pin_key(user_id)) is not None
+
+
+# ======================
+# 🟩 Router
+# ======================
+class ReplicaRouter:
+    """
+    Send reads to a replica only for requests that opted in (catalog GETs
+    via ``ReplicaReadMixin``), and only until the request writes. Everything
+    else, including all writes, uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_state()
+        if state is None or not state.replica_reads or state.wrote:
+            return None
+        if state.replica is None:
+            state.replica = replica_pool.acquire()
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current_state()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+
+# ======================
+# 🟩 Middleware
+# ======================
+class ReplicaRoutingMiddleware:
+    """
+    Give each request a ``RoutingState``, then pin the user to the primary
+    for ``PIN_SECONDS`` if the request wrote anything.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+            replica_pool.release(state.replica)
+        self.pin_writer(request, state)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+            replica_pool.release(state.replica)
+        if state.wrote:
+            await sync_to_async(self.pin_writer)(request, state)  # request.user may be lazy
+        return response
+
+    def pin_writer(self, request, state):
+        if not state.wrote:
+            return
+        # DRF copies the authenticated (JWT) user onto the Django request
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_to_primary(user.pk)
+
+
+# ======================
+# 🟩 ViewSet mixin
+# ======================
+class ReplicaReadMixin:
+    """
+    Safe-method requests read from a replica unless the user wrote within
+    ``PIN_SECONDS``. Actions in ``primary_actions`` always read the primary.
+    """
+
+    primary_actions = ()  # e.g. feeds whose consumers must never see rows out of order
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        state = current_state()
+        if state is None or request.method not in SAFE_METHODS or self.action in self.primary_actions:
+            return
+        user = request.user
+        if user.is_authenticated and is_pinned(user.pk):
+            return
+        state.replica_reads = True
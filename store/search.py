@@ -0,0 +1,351 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework import filters
+
+from .models import Category, Product
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Field weights, highest first: title beats category name beats description
+SEARCH_WEIGHTS = {"title": "A", "category": "B", "description": "C"}
+MEMORY_WEIGHTS = {"A": 3, "B": 2, "C": 1}
+
+SEARCH_CONFIG = "english"
+
+# Set-based refresh for bulk writes, equivalent to search_vector_for()
+REINDEX_SQL = """
+UPDATE store_product p SET search_vector =
+    setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(
+        (SELECT c.name FROM store_category c WHERE c.id = p.category_id), '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(p.description, '')), 'C')
+WHERE p.id IN ({subquery})
+"""
+
+
+def tokenize(text):
+    return [t.lower() for t in TOKEN_RE.findall(text or "")]
+
+
+def product_search_document(product):
+    """Return ``{weight: text}`` for the fields that feed the search index."""
+    category = product.category.name if product.category_id else ""
+    return {
+        SEARCH_WEIGHTS["title"]: product.title,
+        SEARCH_WEIGHTS["category"]: category,
+        SEARCH_WEIGHTS["description"]: product.description,
+    }
+
+
+def search_vector_for(product):
+    """
+    Build a ``tsvector`` expression from the product's in-memory values, so it
+    can be assigned before ``save()`` without joining ``store_category``.
+    """
+    vector = None
+    for weight, text in product_search_document(product).items():
+        part = SearchVector(Value(text or ""), config=SEARCH_CONFIG, weight=weight)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+# ======================
+# 🟩 PostgreSQL backend
+# ======================
+class PostgresSearchBackend:
+    """
+    Ranked search against the maintained ``Product.search_vector`` column.
+
+    Every query token becomes a prefix term (``shi:*``), so partially typed
+    words still match and the GIN index serves the lookup.
+    """
+
+    def build_query(self, terms):
+        tokens = [t for term in terms for t in tokenize(term)]
+        if not tokens:
+            return None
+        raw = " & ".join(f"{token}:*" for token in tokens)
+        return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+    def search(self, queryset, terms):
+        query = self.build_query(terms)
+        if query is None:
+            return queryset
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "-id")
+        )
+
+    def reindex(self, queryset):
+        # One UPDATE for the whole set instead of a round trip per product
+        subquery, params = queryset.order_by().values("pk").query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(REINDEX_SQL.format(subquery=subquery), params)
+            return cursor.rowcount
+
+    def rebuild(self):
+        return self.reindex(Product.objects.all())
+
+
+# ======================
+# 🟩 In-process backend
+# ======================
+class InMemorySearchBackend:
+    """
+    Inverted index held in the worker's memory.
+
+    Terms are kept in a sorted list so a prefix is a ``bisect`` range; postings
+    map product id to a weighted term frequency. It is built lazily from the
+    database and then maintained from model signals, which makes it suitable
+    for SQLite and tests. Each worker process holds its own copy.
+
+    Results are capped at the ``max_results`` best matches, since every id
+    becomes a parameter of the ranking query; list responses carry
+    ``search_matches`` when more matched (see ``ProductSearchFilter``).
+    """
+
+    max_results = 1000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = None
+        self._terms = []
+        self._documents = {}
+
+    @property
+    def loaded(self):
+        return self._postings is not None
+
+    def rebuild(self):
+        with self._lock:
+            self._postings = defaultdict(dict)
+            self._documents = {}
+            self._terms = []
+            for product in Product.objects.select_related("category").iterator(chunk_size=2000):
+                self._add(product, keep_sorted=False)
+            self._terms = sorted(self._postings)
+            return len(self._documents)
+
+    def reindex(self, queryset):
+        with self._lock:
+            if not self.loaded:
+                return 0
+            count = 0
+            for product in queryset.select_related("category").iterator(chunk_size=2000):
+                self._remove(product.pk)
+                self._add(product)
+                count += 1
+            return count
+
+    def index_product(self, product):
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(product.pk)
+            self._add(product)
+
+    def remove_product(self, pk):
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(pk)
+
+    def _add(self, product, keep_sorted=True):
+        weights = defaultdict(int)
+        for weight, text in product_search_document(product).items():
+            for token in tokenize(text):
+                weights[token] += MEMORY_WEIGHTS[weight]
+        for token, score in weights.items():
+            if keep_sorted and token not in self._postings:
+                insort(self._terms, token)
+            self._postings[token][product.pk] = score
+        self._documents[product.pk] = list(weights)
+
+    def _remove(self, pk):
+        for token in self._documents.pop(pk, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[token]
+                del self._terms[bisect_left(self._terms, token)]
+
+    def _prefix_scores(self, prefix):
+        scores = defaultdict(int)
+        start = bisect_left(self._terms, prefix)
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            for pk, score in self._postings[term].items():
+                scores[pk] += score
+        return scores
+
+    def ranked_ids(self, terms):
+        """Every matching id, best first; ``None`` when there is nothing to search for."""
+        tokens = [t for term in terms for t in tokenize(term)]
+        if not tokens:
+            return None
+        with self._lock:
+            if not self.loaded:
+                self.rebuild()
+            totals = None
+            for token in tokens:
+                scores = self._prefix_scores(token)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {pk: totals[pk] + s for pk, s in scores.items() if pk in totals}
+                if not totals:
+                    return []
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], -item[0]))
+        return [pk for pk, _ in ranked]
+
+    def search(self, queryset, terms):
+        return self.filter_ranked(queryset, self.ranked_ids(terms))
+
+    def filter_ranked(self, queryset, ids):
+        """``queryset`` narrowed to the first ``max_results`` of ``ids``, in that order."""
+        if ids is None:
+            return queryset
+        if not ids:
+            return queryset.none()
+        ids = ids[: self.max_results]
+        rank = Case(
+            *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).annotate(search_position=rank).order_by("search_position")
+
+
+# ======================
+# 🟩 Backend selection
+# ======================
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_search_backend():
+    """
+    Return the configured backend. ``STORE_SEARCH_BACKEND`` may be a dotted
+    path; when empty the backend is chosen from the default database vendor.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, "STORE_SEARCH_BACKEND", "")
+                if path:
+                    backend_class = import_string(path)
+                elif connections["default"].vendor == "postgresql":
+                    backend_class = PostgresSearchBackend
+                else:
+                    backend_class = InMemorySearchBackend
+                _backend = backend_class()
+    return _backend
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for ``SearchFilter`` on products: same ``?search=``
+    parameter, but served by the search backend instead of ``ILIKE`` chains.
+
+    Results are ranked by relevance unless the client asked for an explicit
+    ``?ordering=``, so this filter must run after ``OrderingFilter``. When
+    the in-process backend drops matches past its ``max_results``, their
+    total is left on ``request.search_matches`` for the paginator.
+    """
+
+    ordering_param = "ordering"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        ordering = queryset.query.order_by
+        backend = get_search_backend()
+        if isinstance(backend, InMemorySearchBackend):
+            ids = backend.ranked_ids(terms)
+            if ids is not None and len(ids) > backend.max_results:
+                request.search_matches = len(ids)
+            queryset = backend.filter_ranked(queryset, ids)
+        else:
+            queryset = backend.search(queryset, terms)
+        if request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+
+# ======================
+# 🟦 KEEP INDEX IN SYNC
+# ======================
+SEARCH_SOURCE_FIELDS = {"title", "description", "category", "category_id", "search_vector"}
+
+
+@receiver(pre_save, sender=Product)
+def update_product_search_vector(sender, instance, using, update_fields=None, **kwargs):
+    if connections[using].vendor != "postgresql":
+        return
+    if update_fields is not None and not SEARCH_SOURCE_FIELDS & set(update_fields):
+        return
+    instance.search_vector = search_vector_for(instance)
+
+
+@receiver(post_save, sender=Product)
+def save_partial_search_vector(sender, instance, using, update_fields=None, **kwargs):
+    # save(update_fields=["title"]) doesn't write the vector assigned in pre_save
+    if update_fields is None or "search_vector" in update_fields or not SEARCH_SOURCE_FIELDS & set(update_fields):
+        return
+    if connections[using].vendor == "postgresql":
+        Product.objects.using(using).filter(pk=instance.pk).update(search_vector=instance.search_vector)
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_SOURCE_FIELDS & set(update_fields):
+        return
+    backend = get_search_backend()
+    if isinstance(backend, InMemorySearchBackend):
+        backend.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, **kwargs):
+    backend = get_search_backend()
+    if isinstance(backend, InMemorySearchBackend):
+        backend.remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, update_fields=None, **kwargs):
+    # A renamed category changes the search text of all its products
+    loaded = getattr(instance, "_loaded_values", {})
+    renamed = "name" not in loaded or loaded["name"] != instance.name  # unknown counts as renamed
+    instance._loaded_values = {**loaded, "name": instance.name}
+    if created or not renamed or (update_fields is not None and "name" not in update_fields):
+        return
+    get_search_backend().reindex(Product.objects.filter(category=instance))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_products(sender, instance, **kwargs):
+    # SET_NULL empties the column without product signals: find them first
+    instance._product_ids = list(Product.objects.filter(category=instance).values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def reindex_uncategorized_products(sender, instance, **kwargs):
+    ids = getattr(instance, "_product_ids", None)
+    if ids:
+        get_search_backend().reindex(Product.objects.filter(pk__in=ids))
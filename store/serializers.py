@@ -1,7 +1,11 @@
 from rest_framework import serializers
-from .models import Product, Category
+from .models import Product, Category, Reservation, ReservationItem
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .authentication import UserClaimsRefreshToken
+from .hashing import make_password
+from .images import ImageVariantsField, ProcessedImageField, accept_upload, process_upload, schedule
 
 User = get_user_model()
 
@@ -17,6 +21,10 @@ class ProductSerializer(serializers.ModelSerializer):
         queryset=Category.objects.all(),
         source='category'
     )
+    # Null until the upload's metadata has been stripped
+    image = ProcessedImageField(required=False, allow_null=True)
+    # Resized WebP/JPEG URLs: list pages should use "thumb", not the original `image`
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Product
@@ -28,13 +36,41 @@ class ProductSerializer(serializers.ModelSerializer):
         'category',
         'category_id',
         'image',
+        'image_variants',
         'inventory',
         "stock_status",
             "is_active",
             "created_at",
             "updated_at",]
-read_only_fields = ["slug", "stock_status", "created_at", "updated_at"]
 
+    # Uploads go to the image pipeline (store/images.py) instead of storage
+    def create(self, validated_data):
+        job = self._accept_image(validated_data)
+        product = super().create(validated_data)
+        if job is not None:
+            schedule(process_upload, product.pk, *job)
+        return product
+
+    def update(self, instance, validated_data):
+        job = self._accept_image(validated_data)
+        product = super().update(instance, validated_data)
+        if job is not None:
+            schedule(process_upload, product.pk, *job)
+        return product
+
+    def _accept_image(self, validated_data):
+        if "image" not in validated_data:
+            return None
+        upload = validated_data.pop("image")
+        if not upload:
+            validated_data.update(image=None, image_pending="")  # cleared
+            return None
+        fields, job = accept_upload(upload)
+        validated_data.update(fields)
+        return job
+
+
+read_only_fields = ["slug", "stock_status", "created_at", "updated_at"]
 
 
 
@@ -53,9 +89,24 @@ class UserRegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop("password2")
-        user = User.objects.create_user(**validated_data)
+        # Hash in a host-wide slot (503 when all are taken), then what create_user does
+        password = make_password(validated_data.pop("password"))
+        user = User(
+            username=User.normalize_username(validated_data["username"]),
+            email=User.objects.normalize_email(validated_data.get("email", "")),
+            password=password,
+        )
+        user.save()
         return user
 
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    # Signed user fields on the access token let CachedJWTAuthentication skip the user query
+    token_class = UserClaimsRefreshToken
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    # New access tokens get the user's current fields, not the ones from login
+    token_class = UserClaimsRefreshToken
+
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -71,4 +122,35 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
 class AdminUserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ["id", "username", "email", "first_name", "last_name", "is_staff", "is_active"]
\ No newline at end of file
+        fields = ["id", "username", "email", "first_name", "last_name", "is_staff", "is_active"]
+
+
+class ReservationItemInputSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class ReservationCreateSerializer(serializers.Serializer):
+    items = ReservationItemInputSerializer(many=True, allow_empty=False)
+    ttl_seconds = serializers.IntegerField(min_value=1, max_value=3600, required=False)
+
+    def validate_items(self, items):
+        max_items = self.context.get("max_items")
+        if max_items and len(items) > max_items:
+            raise serializers.ValidationError(f"At most {max_items} items per reservation.")
+        return items
+
+
+class ReservationItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReservationItem
+        fields = ["product", "quantity", "shard"]
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    items = ReservationItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Reservation
+        fields = ["token", "status", "expires_at", "created_at", "items"]
+        read_only_fields = fields
@@ -0,0 +1,91 @@
+import re
+from collections import Counter
+
+from django.apps import apps
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Room left for "-<n>" suffixes when trimming long titles
+SUFFIX_ROOM = 8
+
+
+def base_slug(text, max_length, fallback="item"):
+    slug = slugify(text or "")[: max_length - SUFFIX_ROOM].strip("-")
+    return slug or fallback
+
+
+def _suffix_of(slug, base):
+    """1 for the bare base, n for ``base-n``, otherwise ``None``."""
+    if slug == base:
+        return 1
+    match = re.fullmatch(rf"{re.escape(base)}-(\d+)", slug)
+    return int(match.group(1)) if match else None
+
+
+def allocate_slugs(model, texts, field="slug", fallback="item", using=None, exclude=()):
+    """
+    Reserve one unique slug per entry in ``texts``, in order.
+
+    Suffixes come from a per-base ``SlugSequence`` row that is locked
+    (``SELECT ... FOR UPDATE``) and advanced once per batch, so concurrent
+    workers never hand out the same ``base-n``. Existing slugs are fetched
+    with a single ``slug LIKE 'base%'`` query (served by the unique index):
+    it seeds new sequences and lets us skip slugs that were set by hand.
+
+    ``exclude`` holds slugs that are spoken for but not saved yet, e.g.
+    explicit slugs of rows written in the same statement.
+
+    Queries per batch are constant: prefix lookup, seed insert, locked
+    select and one bulk update, whatever the batch size.
+    """
+    SlugSequence = apps.get_model("store", "SlugSequence")
+    using = using or router.db_for_write(model)
+    scope = model._meta.label_lower
+    max_length = model._meta.get_field(field).max_length
+
+    bases = [base_slug(text, max_length, fallback) for text in texts]
+    if not bases:
+        return []
+    wanted = Counter(bases)
+
+    prefixes = Q()
+    for base in wanted:
+        prefixes |= Q(**{f"{field}__startswith": base})
+    taken = set(
+        model._default_manager.using(using).filter(prefixes).values_list(field, flat=True)
+    )
+    taken.update(exclude)
+
+    seeds = []
+    for base in wanted:
+        # Start from the bare base while it's free, else after the highest suffix
+        used = [_suffix_of(slug, base) for slug in taken if slug.startswith(base)]
+        last_value = max(filter(None, used), default=0) if base in taken else 0
+        seeds.append(SlugSequence(scope=scope, base=base, last_value=last_value))
+
+    with transaction.atomic(using=using):
+        SlugSequence.objects.using(using).bulk_create(seeds, ignore_conflicts=True)
+        sequences = (
+            SlugSequence.objects.using(using)
+            .select_for_update()
+            .filter(scope=scope, base__in=list(wanted))
+            .order_by("base")  # fixed lock order, no deadlocks between batches
+        )
+        sequences = list(sequences)
+        reserved = {}
+        for sequence in sequences:
+            slugs = []
+            while len(slugs) < wanted[sequence.base]:
+                sequence.last_value += 1
+                candidate = (
+                    sequence.base
+                    if sequence.last_value == 1
+                    else f"{sequence.base}-{sequence.last_value}"
+                )
+                if candidate not in taken:
+                    slugs.append(candidate)
+            reserved[sequence.base] = iter(slugs)
+        SlugSequence.objects.using(using).bulk_update(sequences, ["last_value"])
+
+    return [next(reserved[base]) for base in bases]
@@ -1,3 +1,1377 @@
-from django.test import TestCase
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from config import docs
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import facets, listings, renderers
+from .async_views import async_viewset_view
+from .authentication import CachedJWTAuthentication, user_cache
+from .autocomplete import AutocompleteIndex
+from .bulk import ProductImporter
+from .cache import LRUCache, ResponseCache, response_cache
+from .changes import ChangeFeed
+from .checks import check_shared_caches
+from .coalescing import single_flight
+from .compression import negotiate
+from .fast_serializers import product_serializer
+from .hashing import PasswordHashingBusy, hashing_slots
+from .images import is_processed
+from .instrumentation import InstrumentationMiddleware, metrics, query_shape
+from .inventory import InsufficientInventory, commit, release, reserve, shard_inventory
+from .listings import rebuild_listings, stale_listings
+from .management.commands.bench_api import Command as BenchApiCommand
+from .models import Category, InventoryShard, Product, ProductListing, User
+from .renderers import FastJSONRenderer, MessagePackRenderer
+from .routing import replica_pool
+from .search import InMemorySearchBackend, get_search_backend
+from .serializers import ProductSerializer
+from .slugs import allocate_slugs
+from .views import CategoryViewSet, ProductViewSet
+
+
+# ======================
+# 🟩 AUTHENTICATION
+# ======================
+class TokenClaimsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", "admin@example.com", "pass1234", is_staff=True)
+        self.client = APIClient()
+        caches["catalog"].clear()
+
+    def obtain(self):
+        response = self.client.post("/api/token/", {"username": "admin", "password": "pass1234"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def refresh(self, refresh):
+        response = self.client.post("/api/token/refresh/", {"refresh": refresh})
+        self.assertEqual(response.status_code, 200)
+        return response.data["access"]
+
+    def get_users(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return self.client.get("/api/users/")
+
+    def test_refresh_token_carries_no_user_claims(self):
+        tokens = self.obtain()
+        refresh = RefreshToken(tokens["refresh"])
+        for claim in ("username", "email", "is_staff", "is_superuser", "is_active"):
+            self.assertNotIn(claim, refresh)
+        access = AccessToken(tokens["access"])
+        self.assertEqual(access["username"], "admin")
+        self.assertNotIn("is_staff", access)
+
+    def test_demoted_admin_loses_access_with_existing_token(self):
+        access = self.obtain()["access"]
+        self.assertEqual(self.get_users(access).status_code, 200)
+
+        User.objects.filter(pk=self.admin.pk).update(is_staff=False)  # no signal
+        user_cache.invalidate(self.admin.pk)
+        self.assertEqual(self.get_users(access).status_code, 403)
+
+    def test_refresh_mints_access_token_from_current_user(self):
+        tokens = self.obtain()
+        self.admin.is_staff = False
+        self.admin.email = "demoted@example.com"
+        self.admin.save()
+
+        access = self.refresh(tokens["refresh"])
+        self.assertEqual(self.get_users(access).status_code, 403)
+        self.assertEqual(AccessToken(access)["email"], "demoted@example.com")
+
+    def test_deactivated_user_is_rejected(self):
+        access = self.obtain()["access"]
+        User.objects.filter(pk=self.admin.pk).update(is_active=False)
+        user_cache.invalidate(self.admin.pk)
+        self.assertEqual(self.get_users(access).status_code, 401)
+
+    def test_flags_come_from_the_shared_cache_until_the_user_is_saved(self):
+        token = AccessToken(self.obtain()["access"])
+        authentication = CachedJWTAuthentication()
+        with CaptureQueriesContext(connection) as queries:
+            authentication.get_user(token)
+        self.assertEqual(len(queries), 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(authentication.get_user(token).is_staff)
+        self.assertEqual(len(queries), 0)
+
+        self.admin.is_staff = False
+        self.admin.save()  # any worker: the entry lives in the shared cache
+        self.assertFalse(authentication.get_user(AccessToken(self.obtain()["access"])).is_staff)
+
+
+class PasswordHashingTests(TestCase):
+    def setUp(self):
+        self.lock_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.lock_dir.cleanup)
+        User.objects.create_user("admin", "admin@example.com", "pass1234", is_staff=True, is_superuser=True)
+        self.client = APIClient()
+        self.credentials = {"username": "admin", "password": "pass1234"}
+
+    def limited(self, slots, wait):
+        return override_settings(
+            STORE_PASSWORD_HASHING={"MAX_CONCURRENT": slots, "WAIT_TIMEOUT": wait, "LOCK_DIR": self.lock_dir.name}
+        )
+
+    def test_busy_slots_answer_503_with_retry_after(self):
+        with self.limited(slots=1, wait=0.01):
+            with hashing_slots.slot():  # another worker is hashing
+                token = self.client.post("/api/token/", self.credentials)
+                admin = self.client.post("/admin/login/", self.credentials)
+            self.assertEqual(self.client.post("/api/token/", self.credentials).status_code, 200)
+        for response in (token, admin):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response["Retry-After"], "1")
+
+    def test_slots_bound_concurrent_hashes(self):
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def hash_password(_):
+            def work(raw):
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.02)
+                with lock:
+                    running[0] -= 1
+                return raw
+
+            try:
+                return hashing_slots.run(work, "pass1234")
+            except PasswordHashingBusy:
+                return None
+
+        with self.limited(slots=2, wait=0.005):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(hash_password, range(8)))
+        self.assertEqual(peak[0], 2)
+        self.assertIn(None, results)  # overflow refused rather than queued
+
+
+# ======================
+# 🟩 CATALOG
+# ======================
+class CatalogTestCase(TestCase):
+    """Products in two categories, with the response cache emptied."""
+
+    def setUp(self):
+        caches["catalog"].clear()
+        response_cache.reset()
+        self.client = APIClient()
+        self.hats = Category.objects.create(name="Hats")
+        self.shoes = Category.objects.create(name="Shoes")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products = [
+                Product.objects.create(
+                    title=f"Product {i}",
+                    price=10 + i,
+                    category=self.hats if i % 2 else self.shoes,
+                    inventory=i,
+                )
+                for i in range(15)
+            ]
+
+
+class ResponseCacheTests(CatalogTestCase):
+    def test_local_entries_expire(self):
+        lru = LRUCache(10, timeout=0.05)
+        lru.set("key", "value")
+        self.assertEqual(lru.get("key"), "value")
+        time.sleep(0.06)
+        self.assertIsNone(lru.get("key"))
+
+    def test_write_in_another_worker_invalidates_local_hits(self):
+        url = f"/api/products/{self.products[0].pk}/"
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        other_worker = ResponseCache()  # own local tier, same shared cache
+        other_worker.bump(Product)
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    def test_per_process_alias_with_several_workers_disables_the_cache(self):
+        url = f"/api/products/{self.products[0].pk}/"
+        with override_settings(STORE_RESPONSE_CACHE={"ALIAS": "default"}), mock.patch("store.cache.WORKERS", 4):
+            self.assertFalse(response_cache.enabled)
+            self.assertEqual([m.id for m in check_shared_caches(None)], ["store.W001"])
+            self.client.get(url)
+            self.assertNotIn("X-Cache", self.client.get(url))
+        self.assertEqual(check_shared_caches(None), [])
+
+    def setUp(self):
+        super().setUp()
+        # Ties on price: pages must break them on id
+        with self.captureOnCommitCallbacks(execute=True):
+            for product in self.products[5:10]:
+                product.price = 30
+                product.save()
+            self.products[12].is_active = False
+            self.products[12].save()
+        self.active = [p for p in self.products if p.is_active]
+
+    def walk(self, url):
+        pages = []
+        while url:
+            data = self.client.get(url).data
+            self.assertNotIn("count", data)
+            pages.append([item["id"] for item in data["results"]])
+            url = data["next"]
+        return pages
+
+    def test_pages_cover_every_row_once(self):
+        pages = self.walk("/api/products/?cursor=&ordering=price&page_size=4")
+        expected = [p.pk for p in sorted(self.active, key=lambda p: (p.price, p.pk))]
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertTrue(all(len(page) == 4 for page in pages[:-1]))
+
+    def test_default_ordering_is_newest_first(self):
+        pages = self.walk("/api/products/?cursor=&page_size=5")
+        expected = [p.pk for p in sorted(self.active, key=lambda p: (p.created_at, p.pk), reverse=True)]
+        self.assertEqual([pk for page in pages for pk in page], expected)
+
+    def test_previous_links_walk_back(self):
+        url, forward = "/api/products/?cursor=&ordering=-price&page_size=3", []
+        while True:
+            data = self.client.get(url).data
+            forward.append([item["id"] for item in data["results"]])
+            if not data["next"]:
+                break
+            url = data["next"]
+
+        backward = []
+        while data["previous"]:
+            data = self.client.get(data["previous"]).data
+            backward.append([item["id"] for item in data["results"]])
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_filters_apply_to_keyset_pages(self):
+        pages = self.walk(f"/api/products/?cursor=&category={self.hats.pk}&ordering=price&page_size=2")
+        expected = [p.pk for p in sorted(self.active, key=lambda p: (p.price, p.pk)) if p.category_id == self.hats.pk]
+        self.assertEqual([pk for page in pages for pk in page], expected)
+
+    def test_invalid_cursors_are_404(self):
+        self.assertEqual(self.client.get("/api/products/?cursor=bogus").status_code, 404)
+        next_url = self.client.get("/api/products/?cursor=&ordering=price&page_size=2").data["next"]
+        other_ordering = next_url.replace("ordering=price", "ordering=-created_at")
+        self.assertEqual(self.client.get(other_ordering).status_code, 404)
+
+    def test_page_numbers_stay_the_default(self):
+        data = self.client.get("/api/products/?page=2").data
+        self.assertEqual(data["count"], len(self.active))
+        self.assertEqual(len(data["results"]), len(self.active) - 10)
+
+
+class ConditionalGetTests(CatalogTestCase):
+    def test_malformed_pk_is_404(self):
+        self.assertEqual(self.client.get("/api/products/abc/").status_code, 404)
+        self.assertEqual(self.client.get("/api/products/999999/").status_code, 404)
+
+    def test_detail_not_modified(self):
+        product = self.products[0]
+        etag = self.client.get(f"/api/products/{product.pk}/")["ETag"]
+        response = self.client.get(f"/api/products/{product.pk}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_list_etag_changes_on_write(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        self.assertEqual(self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[3].title = "Renamed"
+            self.products[3].save()
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_validators_follow_the_filtered_rows(self):
+        url = f"/api/products/?category={self.hats.pk}"
+        etag = self.client.get(url)["ETag"]
+        # Writes that skip signals and the cache generations still change it
+        Product.objects.filter(pk=self.products[1].pk).update(inventory=0, updated_at=timezone.now())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(url)["ETag"]
+        Product.objects.filter(pk=self.products[0].pk).update(updated_at=timezone.now())  # a shoe
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_keyset_validators_skip_the_count(self):
+        etag = self.client.get("/api/products/?cursor=")["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/?cursor=", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT(", queries[0]["sql"].upper())
+
+    def test_keyset_page_runs_no_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/products/?cursor=")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q["sql"] for q in queries if "COUNT(" in q["sql"].upper()])
+
+    def test_async_twins(self):
+        retrieve = async_viewset_view(ProductViewSet, {"get": "retrieve"})
+        factory = RequestFactory()
+        response = async_to_sync(retrieve)(factory.get("/api/products/abc/"), pk="abc")
+        self.assertEqual(response.status_code, 404)
+
+        listing = async_viewset_view(ProductViewSet, {"get": "list"})
+        etag = async_to_sync(listing)(factory.get("/api/products/"))["ETag"]
+        response = async_to_sync(listing)(factory.get("/api/products/", HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+
+
+class ChangeFeedTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.settled = timezone.now() - timedelta(hours=1)
+        # Three rows share each updated_at: pages must split ties by id
+        for i, product in enumerate(self.products):
+            Product.objects.filter(pk=product.pk).update(updated_at=self.settled + timedelta(seconds=i // 3))
+        Product.objects.filter(pk=self.products[4].pk).update(is_active=False)
+        self.unsettled = Product.objects.create(title="Just saved", price=1)  # inside the settle window
+
+    def test_pages_return_each_settled_change_once_in_order(self):
+        seen, params = [], {"limit": 4}
+        while True:
+            response = self.client.get("/api/products/changes/", params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            seen += [row["id"] for row in page["results"]]
+            params["since"] = page["next_watermark"]
+            if not page["has_more"]:
+                break
+        self.assertEqual(seen, [product.pk for product in self.products])  # soft-deleted one included
+        self.assertEqual(ChangeFeed().read(since=params["since"]), ([], params["since"], False))
+
+    def test_later_changes_follow_the_watermark(self):
+        rows, watermark, has_more = ChangeFeed().read(limit=100)
+        self.assertEqual((len(rows), has_more), (15, False))
+
+        Product.objects.filter(pk=self.products[0].pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        Product.objects.filter(pk=self.unsettled.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        rows, _, _ = ChangeFeed().read(since=watermark)
+        self.assertEqual({row.pk for row in rows}, {self.products[0].pk, self.unsettled.pk})
+
+    def test_timestamps_and_bad_watermarks(self):
+        rows, _, _ = ChangeFeed().read(since=self.settled.isoformat())
+        self.assertEqual(len(rows), 12)  # strictly after the first tie group
+        response = self.client.get("/api/products/changes/", {"since": "forged"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        Product.objects.filter(pk=self.products[1].pk).update(is_active=False)
+
+    def stream(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_follows_the_list_filters(self):
+        response, body = self.stream(f"/api/products/export/?category={self.hats.pk}")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["id"] for row in rows], [p.pk for p in self.products[3::2]])  # active hats
+        self.assertEqual(rows[0]["category_name"], "Hats")
+        self.assertEqual(rows[0]["price"], "13.00")
+        self.assertEqual(rows[0]["stock_status"], "In Stock")
+
+    def test_csv_has_a_header_and_one_line_per_row(self):
+        response, body = self.stream("/api/products/export/?format=csv")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="products.csv"')
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual(len(rows), 14)
+        self.assertEqual(rows[0]["slug"], self.products[0].slug)
+
+    def test_command_can_include_inactive_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "products.ndjson")
+            call_command("export_products", output=path, include_inactive=True, chunk_size=4, stderr=StringIO())
+            with open(path, encoding="utf-8") as handle:
+                rows = [json.loads(line) for line in handle]
+        self.assertEqual([row["id"] for row in rows], [p.pk for p in self.products])
+        self.assertFalse(rows[1]["is_active"])
+
+
+class AsyncReadTests(CatalogTestCase):
+    """The async twins answer exactly what the sync viewset does."""
+
+    paths = [
+        "/api/products/",
+        "/api/products/?category={hats}&ordering=-price&page_size=3&page=2",
+        "/api/products/?search=product&ordering=price",
+        "/api/products/?cursor=&page_size=4",
+        "/api/products/{product}/",
+        "/api/products/missing/",
+    ]
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def both(self, viewset_class, actions, path, **kwargs):
+        sync_response = viewset_class.as_view(actions)(self.factory.get(path), **kwargs)
+        sync_response.render()
+        async_response = async_to_sync(async_viewset_view(viewset_class, actions))(self.factory.get(path), **kwargs)
+        return sync_response, async_response
+
+    @override_settings(STORE_RESPONSE_CACHE={"ENABLED": False})
+    def test_reads_match_the_sync_path(self):
+        product = self.products[3]
+        for template in self.paths:
+            path = template.format(hats=self.hats.pk, product=product.pk)
+            with self.subTest(path=path):
+                if path.count("/") > 3:
+                    kwargs, actions = {"pk": path.split("/")[3]}, {"get": "retrieve"}
+                else:
+                    kwargs, actions = {}, {"get": "list"}
+                sync_response, async_response = self.both(ProductViewSet, actions, path, **kwargs)
+                self.assertEqual(sync_response.status_code, 404 if "missing" in path else 200)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(async_response.content, sync_response.content)
+        sync_response, async_response = self.both(CategoryViewSet, {"get": "list"}, "/api/categories/")
+        self.assertEqual(async_response.content, sync_response.content)
+
+    def test_cached_and_head_responses(self):
+        view = async_to_sync(async_viewset_view(ProductViewSet, {"get": "list"}))
+        self.assertEqual(view(self.factory.get("/api/products/"))["X-Cache"], "MISS")
+        self.assertEqual(view(self.factory.get("/api/products/"))["X-Cache"], "HIT")
+        response = view(self.factory.head("/api/products/"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_go_through_the_sync_view(self):
+        admin = User.objects.create_user("admin", "admin@example.com", "pass1234", is_staff=True)
+        token = AccessToken.for_user(admin)
+        view = async_to_sync(async_viewset_view(ProductViewSet, {"get": "list", "post": "create"}))
+        request = self.factory.post(
+            "/api/products/",
+            {"title": "Async hat", "price": "5.00", "category_id": self.hats.pk},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(view(request).status_code, 201)
+        self.assertTrue(Product.objects.filter(title="Async hat").exists())
+
+
+class CompiledSerializerTests(TestCase):
+    def setUp(self):
+        hats = Category.objects.create(name="Hats", description="Warm")
+        hat = Product.objects.create(title="Felt hat", price=Decimal("19.90"), category=hats, inventory=3)
+        Product.objects.filter(pk=hat.pk).update(
+            image="products/3f/0123456789abcdef01.jpg",
+            image_variants={
+                "thumb": {"width": 200, "height": 150, "webp": "products/felt-hat/thumb.webp", "jpeg": "products/felt-hat/thumb.jpg"}
+            },
+            created_at=datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        )
+        Product.objects.create(title="Loose thread", price=Decimal("0.05"))  # no category, image or stock
+        self.products = list(Product.objects.select_related("category").order_by("pk"))
+        self.context = {"request": RequestFactory().get("/api/products/")}
+
+    def render(self, data):
+        return FastJSONRenderer().render(data)
+
+    def test_compiled_output_is_byte_identical(self):
+        rows = Product.objects.order_by("pk").values(*product_serializer.value_paths())
+        for zone in ("UTC", "America/New_York"):
+            with timezone.override(zone):
+                expected = self.render(ProductSerializer(self.products, many=True, context=self.context).data)
+                self.assertEqual(self.render(product_serializer.serialize(self.products, self.context, many=True)), expected)
+                self.assertEqual(self.render(product_serializer.serialize_rows(rows, self.context)), expected)
+        self.assertIn(b'"category":null', expected)
+        self.assertIn(b'"price":"19.90"', expected)
+        self.assertIn(b'"image":"http://testserver/media/products/3f/0123456789abcdef01.jpg"', expected)
+
+
+class ListingTests(CatalogTestCase):
+    def test_lists_read_products_until_projection_is_filled(self):
+        # As after migrating a catalog that predates ProductListing
+        ProductListing.objects.all().delete()
+        listings._filled = False
+        self.products[0].save()  # one product projected, fourteen still missing
+
+        response = self.client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 15)
+        self.assertFalse(listings.listings_filled())
+
+        rebuild_listings(missing_only=True)
+        self.assertTrue(listings.listings_filled())
+        caches["catalog"].clear()
+        self.assertEqual(self.client.get("/api/products/").data["results"], response.data["results"])
+
+    def test_projection_matches_products(self):
+        self.assertEqual(stale_listings(), ([], [], []))
+
+
+class FacetSummaryTests(CatalogTestCase):
+    def facets(self):
+        return self.client.get("/api/products/facets/").data
+
+    def test_dirty_summary_is_bypassed_until_rebuilt(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.products[1].pk).update(inventory=0)
+            facets.mark_dirty()
+        caches["catalog"].clear()
+
+        data = self.facets()
+        self.assertEqual(data["source"], "query")  # GETs never rebuild
+        self.assertEqual(data["stock"], {"in_stock": 13, "out_of_stock": 2})
+        self.assertTrue(facets.is_dirty())
+
+        call_command("rebuild_facets", "--if-dirty", stdout=StringIO())
+        self.assertFalse(facets.is_dirty())
+        caches["catalog"].clear()
+        data = self.facets()
+        self.assertEqual(data["source"], "summary")
+        self.assertEqual(data["stock"], {"in_stock": 13, "out_of_stock": 2})
+
+    def test_saving_a_loaded_product_runs_no_extra_query(self):
+        product = Product.objects.get(pk=self.products[3].pk)
+        product.inventory = 0
+        with CaptureQueriesContext(connection) as queries:
+            product.save()
+        self.assertFalse(any("store_product" in query["sql"] and query["sql"].startswith("SELECT") for query in queries))
+        facets.mark_dirty()  # compare the maintained counts with a rebuild
+        summary = facets.build_facets(facets.summary_rows())
+        facets.rebuild_summary()
+        self.assertEqual(facets.build_facets(facets.summary_rows()), summary)
+
+    def test_clean_summary_is_not_rebuilt(self):
+        facets.rebuild_summary()
+        self.assertIsNone(facets.rebuild_summary(if_dirty=True))
+        self.assertEqual(self.facets()["total"], 15)
+
+
+# ======================
+# 🟩 RENDERING
+# ======================
+class RendererTests(TestCase):
+    data = {
+        "price": Decimal("19.90"),
+        "at": datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        "title": "line\u2028break",
+        "label": gettext_lazy("Hats"),
+        "rows": [{"id": 1, "tags": ("a", "b")}],
+    }
+
+    def test_json_matches_drf_byte_for_byte(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        indented = "application/json; indent=2"
+        self.assertEqual(FastJSONRenderer().render(self.data, indented), JSONRenderer().render(self.data, indented))
+
+    @skipUnless(renderers.msgpack, "msgpack is not installed")
+    def test_msgpack_keeps_prices_exact(self):
+        packed = MessagePackRenderer().render(self.data)
+        unpacked = renderers.msgpack.unpackb(packed, raw=False)
+        self.assertEqual(unpacked["price"], "19.90")
+        self.assertEqual(unpacked["at"], "2024-03-01T12:30:15.123456Z")
+
+
+class CompressionTests(CatalogTestCase):
+    def test_negotiation(self):
+        available = ["zstd", "br", "gzip"]
+        self.assertEqual(negotiate("gzip, br", available), "br")  # tie: server order
+        self.assertEqual(negotiate("gzip;q=1, br;q=0.5", available), "gzip")
+        self.assertEqual(negotiate("*;q=0.1, zstd;q=0", available), "br")
+        self.assertIsNone(negotiate("identity", available))
+        self.assertIsNone(negotiate("gzip;q=0", ["gzip"]))
+        self.assertIsNone(negotiate("", available))
+
+    @override_settings(STORE_COMPRESSION={"ENCODINGS": ["gzip"]})
+    def test_large_bodies_are_compressed_with_a_weak_etag(self):
+        identity = self.client.get("/api/products/?page_size=15")
+        response = self.client.get("/api/products/?page_size=15", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+        self.assertEqual(response["ETag"], "W/" + identity["ETag"])
+
+    @override_settings(STORE_COMPRESSION={"ENCODINGS": ["gzip"], "MIN_SIZE": 10**6})
+    def test_small_bodies_are_sent_as_is(self):
+        response = self.client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    @override_settings(STORE_COMPRESSION={"ENCODINGS": ["gzip"]})
+    def test_streamed_exports_are_compressed_chunk_by_chunk(self):
+        identity = b"".join(self.client.get("/api/products/export/").streaming_content)
+        response = self.client.get("/api/products/export/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), identity)
+
+
+# ======================
+# 🟩 METRICS
+# ======================
+@override_settings(STORE_METRICS={"SAMPLE_RATE": 1.0, "SERVER_TIMING": True})
+class InstrumentationTests(CatalogTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def test_query_shapes_collapse_parameter_lists(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s,%s) AND x = %s"),
+            "SELECT * FROM t WHERE id IN (%s, ...) AND x = %s",
+        )
+
+    def test_sampled_requests_are_recorded_per_route(self):
+        response = self.client.get("/api/products/")
+        self.assertIn("db;dur=", response["Server-Timing"])
+        snapshot = metrics.snapshot()
+        count, sums, _, n_plus_one = snapshot[("GET", "product-list")]
+        self.assertEqual((count, n_plus_one), (1, 0))
+        self.assertGreater(sums["queries"], 0)
+        self.assertEqual(sums["response"], len(response.content))
+        self.assertIn('store_request_duration_seconds_count{method="GET",route="product-list"} 1', metrics.render())
+
+    @override_settings(STORE_METRICS={"SAMPLE_RATE": 0.0})
+    def test_unsampled_requests_are_not_recorded(self):
+        response = self.client.get("/api/products/")
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_repeated_query_shapes_are_flagged(self):
+        def get_response(request):
+            for product in self.products[:6]:
+                Category.objects.filter(pk=product.category_id).first()  # one lookup per row
+            return HttpResponse("ok")
+
+        with self.assertLogs("store.instrumentation", "WARNING") as logs:
+            InstrumentationMiddleware(get_response)(RequestFactory().get("/"))
+        self.assertIn("Possible N+1 on GET unmatched: 6 x", logs.output[0])
+        self.assertEqual(metrics.snapshot()[("GET", "unmatched")][3], 1)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 401)
+        admin = User.objects.create_user("admin", "admin@example.com", "pass1234", is_staff=True)
+        self.client.force_authenticate(admin)
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"store_db_connects_total", response.content)
+
+
+# ======================
+# 🟩 SEARCH
+# ======================
+class SearchIndexTests(TestCase):
+    def search(self, text):
+        return list(get_search_backend().search(Product.objects.all(), [text]).values_list("title", flat=True))
+
+    def test_partial_save_reindexes_title(self):
+        product = Product.objects.create(title="Plain mug", price=4)
+        self.assertEqual(self.search("mug"), ["Plain mug"])
+        product.title = "Striped teapot"
+        product.save(update_fields=["title"])
+        self.assertEqual(self.search("teapot"), ["Striped teapot"])
+        self.assertEqual(self.search("mug"), [])
+
+    def test_only_a_rename_reindexes_the_category(self):
+        category = Category.objects.create(name="Kitchen")
+        Product.objects.create(title="Plain mug", price=4, category=category)
+        category = Category.objects.get(pk=category.pk)
+        with mock.patch.object(type(get_search_backend()), "reindex") as reindex:
+            category.description = "Pots and pans"
+            category.save()
+            reindex.assert_not_called()
+            category.name = "Cookware"
+            category.save()
+            reindex.assert_called_once()
+
+    def test_deleted_category_leaves_product_search_text(self):
+        category = Category.objects.create(name="Kitchen")
+        Product.objects.create(title="Plain mug", price=4, category=category)
+        self.assertEqual(self.search("kitchen"), ["Plain mug"])
+        category.delete()
+        self.assertEqual(self.search("kitchen"), [])
+        self.assertEqual(self.search("mug"), ["Plain mug"])
+
+    @skipUnless(connection.vendor != "postgresql", "results are capped by the in-process backend")
+    @override_settings(STORE_RESPONSE_CACHE={"ENABLED": False})
+    def test_capped_results_report_every_match(self):
+        for i in range(3):
+            Product.objects.create(title=f"Mug {i}", price=4)
+        with mock.patch.object(InMemorySearchBackend, "max_results", 2):
+            data = APIClient().get("/api/products/?search=mug").data
+        self.assertEqual((data["count"], data["search_matches"]), (2, 3))
+        self.assertNotIn("search_matches", APIClient().get("/api/products/?search=mug").data)
+
+    @skipUnless(connection.vendor == "postgresql", "search_vector is maintained on PostgreSQL only")
+    def test_partial_save_writes_search_vector(self):
+        product = Product.objects.create(title="Plain mug", price=4)
+        product.title = "Striped teapot"
+        product.save(update_fields=["title"])
+        self.assertTrue(Product.objects.filter(pk=product.pk, search_vector="teapot").exists())
+
+
+# ======================
+# 🟩 AUTOCOMPLETE
+# ======================
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex()
+        for target in ("store.autocomplete.autocomplete_index", "store.views.autocomplete_index"):
+            patcher = mock.patch(target, self.index)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        running = Category.objects.create(name="Running")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.shoes = Product.objects.create(title="Running Shoes", price=80, category=running, inventory=20)
+            self.socks = Product.objects.create(title="Running Socks", price=8, category=running, inventory=20)
+            self.trail = Product.objects.create(title="Trail Runner", price=90, inventory=20)
+            Product.objects.create(title="Crème Brûlée Torch", price=25, inventory=20)
+        self.sell(self.shoes, 3)
+        self.sell(self.trail, 2)
+
+    def sell(self, product, units):
+        with self.captureOnCommitCallbacks(execute=True):
+            commit(reserve([(product.pk, units)]).pk)
+
+    def suggest(self, query, **params):
+        response = self.client.get("/api/autocomplete/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(row["type"], row["text"]) for row in response.json()["results"]]
+
+    def test_most_popular_first_matching_any_word(self):
+        self.assertEqual(
+            self.suggest("RUN"),
+            [
+                ("category", "Running"),  # 3 units, and beats the product it ties with
+                ("product", "Running Shoes"),
+                ("product", "Trail Runner"),
+                ("product", "Running Socks"),
+            ],
+        )
+        self.assertEqual(self.suggest("sho"), [("product", "Running Shoes")])
+        self.assertEqual(self.suggest("creme bru"), [("product", "Crème Brûlée Torch")])
+        self.assertEqual(self.suggest("run", limit=2), [("category", "Running"), ("product", "Running Shoes")])
+
+    def test_lookups_do_not_query_after_the_first_load(self):
+        self.suggest("run")
+        with CaptureQueriesContext(connection) as queries:
+            self.suggest("runn")
+        self.assertEqual(len(queries), 0)
+
+    def test_writes_and_sales_update_the_loaded_index(self):
+        self.suggest("run")  # loads
+        self.sell(self.socks, 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trail.is_active = False
+            self.trail.save()
+            self.shoes.title = "Road Shoes"
+            self.shoes.save()
+            Product.objects.create(title="Runway Lights", price=5)
+            Product.objects.get(title__startswith="Crème").delete()
+        self.assertEqual(
+            self.suggest("run"),
+            [("category", "Running"), ("product", "Running Socks"), ("product", "Runway Lights")],
+        )
+        self.assertEqual(self.suggest("road"), [("product", "Road Shoes")])
+        self.assertEqual(self.suggest("torch"), [])
+
+    def test_memoized_prefixes_follow_removals(self):
+        self.index.memo_min_range = 0  # memoize every prefix
+        self.assertEqual(self.index.suggest("r", limit=1)[0]["text"], "Running")
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.filter(name="Running").get().delete()
+        self.assertEqual(self.index.suggest("r", limit=1)[0]["text"], "Running Shoes")
+
+
+# ======================
+# 🟩 INVENTORY
+# ======================
+class ReservationTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(title="Hot item", price=5, inventory=1)
+
+    def listed_stock(self):
+        return ProductListing.objects.get(pk=self.product.pk).stock_status
+
+    def product_generation(self):
+        return response_cache.generations([Product])
+
+    def test_cache_is_bumped_only_when_stock_status_flips(self):
+        self.product.inventory = 3
+        self.product.save()
+        before = self.product_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            first = reserve([(self.product.pk, 1)])
+        self.assertEqual(self.product_generation(), before)  # 3 -> 2, still in stock
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve([(self.product.pk, 2)])
+        sold_out = self.product_generation()
+        self.assertNotEqual(sold_out, before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release(first.pk)
+        self.assertNotEqual(self.product_generation(), sold_out)  # back in stock
+
+    def test_listing_is_refreshed_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            reserve([(self.product.pk, 1)])
+            self.assertEqual(self.listed_stock(), "In Stock")  # not rendered under the row lock
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.listed_stock(), "Out of Stock")
+        self.assertEqual(stale_listings(), ([], [], []))
+
+
+class ShardedInventoryTests(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(title="Hot item", price=5, inventory=10)
+
+    def shard_total(self):
+        return sum(InventoryShard.objects.filter(product=self.product).values_list("quantity", flat=True))
+
+    def test_sharding_stamps_and_invalidates_the_product(self):
+        updated_at = self.product.updated_at
+        generation = response_cache.generations([Product])
+        with self.captureOnCommitCallbacks(execute=True):
+            shard_inventory(self.product, 4)
+        self.product.refresh_from_db()
+        self.assertGreater(self.product.updated_at, updated_at)
+        self.assertNotEqual(response_cache.generations([Product]), generation)
+
+    def test_resharding_keeps_the_total(self):
+        shard_inventory(self.product, 4)
+        shard_inventory(self.product, 3)
+        self.assertEqual(self.shard_total(), 10)
+        self.assertEqual(InventoryShard.objects.filter(product=self.product).count(), 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.inventory, 10)
+
+    def test_reserve_across_shards(self):
+        shard_inventory(self.product, 4)
+        reserve([(self.product.pk, 7)])
+        self.assertEqual(self.shard_total(), 3)
+        with self.assertRaises(InsufficientInventory):
+            reserve([(self.product.pk, 4)])
+
+    def test_inactive_sharded_product_cant_be_reserved(self):
+        shard_inventory(self.product, 2)
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        with self.assertRaises(InsufficientInventory):
+            reserve([(self.product.pk, 1)])
+        self.assertEqual(self.shard_total(), 10)
+
+
+# ======================
+# 🟩 IMAGES
+# ======================
+@override_settings(STORE_IMAGES={"ASYNC": False, "VARIANTS": {"thumb": 32}})
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.product = Product.objects.create(title="Felt hat", price=10)
+
+    def upload(self):
+        exif = Image.Exif()
+        exif[0x010F] = "SpyCam"  # Make
+        buffer = BytesIO()
+        Image.new("RGB", (64, 48), "red").save(buffer, "JPEG", exif=exif)
+        upload = SimpleUploadedFile("hat.jpg", buffer.getvalue(), content_type="image/jpeg")
+        serializer = ProductSerializer(self.product, data={"image": upload}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+        self.product.refresh_from_db()
+
+    def test_upload_is_stored_stripped_with_variants(self):
+        self.upload()
+        self.assertTrue(is_processed(self.product.image.name))
+        self.assertEqual(self.product.image_pending, "")
+        self.assertEqual(
+            {key: self.product.image_variants["thumb"][key] for key in ("width", "height")}, {"width": 32, "height": 24}
+        )
+        with self.product.image.open("rb") as handle:
+            data = handle.read()
+        self.assertNotIn(b"SpyCam", data)
+        self.assertEqual(dict(Image.open(BytesIO(data)).getexif()), {})
+
+    def test_failed_job_clears_pending_and_keeps_previous_image(self):
+        with mock.patch("store.images.render_variants", side_effect=OSError("truncated")):
+            with self.assertLogs("store.images", "ERROR"):
+                self.upload()
+        self.assertEqual(self.product.image_pending, "")
+        self.assertFalse(self.product.image)
+
+    def test_unprocessed_file_is_not_exposed(self):
+        Product.objects.filter(pk=self.product.pk).update(image="products/felt-hat/raw.jpg")
+        self.product.refresh_from_db()
+        context = {"request": RequestFactory().get("/api/products/")}
+        self.assertIsNone(ProductSerializer(self.product, context=context).data["image"])
+        self.assertIsNone(product_serializer.serialize(self.product, context)["image"])
+        row = Product.objects.filter(pk=self.product.pk).values(*product_serializer.value_paths()).get()
+        self.assertIsNone(product_serializer.serialize_rows([row], context)[0]["image"])
+
+
+# ======================
+# 🟩 SLUGS
+# ======================
+class SlugAllocationTests(TestCase):
+    def test_suffixes_skip_hand_set_and_existing_slugs(self):
+        Product.objects.create(title="Imported", slug="red-hat", price=1)
+        Product.objects.create(title="Imported", slug="red-hat-7", price=1)  # sequence seeds past it
+        Product.objects.create(title="Hand set", slug="blue-shirt-2", price=1)
+        titles = ("Red Hat", "Blue Shirt", "Blue shirt!")
+        slugs = [Product.objects.create(title=title, price=1).slug for title in titles]
+        self.assertEqual(slugs, ["red-hat-8", "blue-shirt", "blue-shirt-3"])
+
+    def test_reserved_slugs_are_never_handed_out_twice(self):
+        # Two workers that haven't inserted their rows yet
+        first = allocate_slugs(Product, ["Hat", "Hat", "Scarf"])
+        second = allocate_slugs(Product, ["Hat", "Scarf"])
+        self.assertEqual(first, ["hat", "hat-2", "scarf"])
+        self.assertEqual(second, ["hat-3", "scarf-2"])
+
+    def test_batch_queries_do_not_grow_with_its_size(self):
+        with CaptureQueriesContext(connection) as small:
+            allocate_slugs(Product, ["Sock"] * 2)
+        with CaptureQueriesContext(connection) as large:
+            allocate_slugs(Product, [f"Sock {i % 50}" for i in range(500)], exclude={"sock-3"})
+        self.assertEqual(len(large), len(small))
+
+    def test_long_and_empty_titles(self):
+        long_slug, empty_slug = allocate_slugs(Product, ["x" * 300, "!!!"], fallback="product")
+        self.assertEqual(len(long_slug), 255 - 8)
+        self.assertEqual(empty_slug, "product")
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    @skipUnless(connection.vendor == "postgresql", "SQLite locks whole tables instead of sequence rows")
+    def test_parallel_creates_get_distinct_slugs(self):
+        barrier = threading.Barrier(6)
+
+        def create(_):
+            try:
+                barrier.wait()
+                return Product.objects.create(title="Race hat", price=1).slug
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            slugs = list(pool.map(create, range(6)))
+        self.assertEqual(sorted(slugs), sorted(["race-hat", *(f"race-hat-{n}" for n in range(2, 7))]))
+
+
+# ======================
+# 🟩 BULK IMPORT
+# ======================
+class ProductImporterTests(TestCase):
+    def test_generated_slug_avoids_explicit_slug_in_chunk(self):
+        rows = [
+            {"slug": "red-hat", "title": "Explicit", "price": "5"},
+            {"title": "Red Hat", "price": "6"},
+        ]
+        report = ProductImporter().run(rows)
+        self.assertEqual((report.created, report.updated), (2, 0))
+        self.assertEqual(
+            sorted(Product.objects.values_list("slug", "title")),
+            [("red-hat", "Explicit"), ("red-hat-2", "Red Hat")],
+        )
+
+    def test_existing_slugs_are_updated(self):
+        Product.objects.create(title="Old", slug="old", price=1)
+        report = ProductImporter().run([{"slug": "old", "price": "2"}, {"slug": "new", "title": "New", "price": "3"}])
+        self.assertEqual((report.created, report.updated), (1, 1))
+        self.assertEqual(Product.objects.get(slug="old").price, 2)
+
+    def test_repeated_slug_merges_in_file_order_on_both_paths(self):
+        Product.objects.create(title="Old", slug="old", price=1, inventory=1)
+        rows = [
+            {"slug": "old", "price": "2"},
+            {"slug": "new", "title": "First", "price": "3"},
+            {"slug": "old", "price": "4", "inventory": "9"},
+            {"slug": "new", "title": "Second"},
+        ]
+        report = ProductImporter().run(rows)
+        self.assertEqual((report.created, report.updated, report.merged), (1, 1, 2))
+        self.assertEqual(
+            Product.objects.filter(slug="old").values("price", "inventory").get(),
+            {"price": 4, "inventory": 9},
+        )
+        self.assertEqual(
+            Product.objects.filter(slug="new").values("title", "price").get(), {"title": "Second", "price": 3}
+        )
+
+    def test_category_names_are_not_read_as_ids(self):
+        first = Category.objects.create(name="First")
+        numeric = Category.objects.create(name=str(first.pk))
+        ProductImporter().run(
+            [
+                {"slug": "by-name", "title": "By name", "price": "1", "category": str(first.pk)},
+                {"slug": "by-id", "title": "By id", "price": "1", "category_id": str(first.pk)},
+            ]
+        )
+        self.assertEqual(Product.objects.get(slug="by-name").category_id, numeric.pk)
+        self.assertEqual(Product.objects.get(slug="by-id").category_id, first.pk)
+
+
+# ======================
+# 🟩 REQUEST COALESCING
+# ======================
+class SingleFlightHerdTests(TransactionTestCase):
+    """
+    A herd of identical product GETs sent through the WSGI app at once,
+    with every query slowed down so the requests overlap.
+    """
+
+    herd_size = 8
+    delay = 0.05  # seconds added to every query
+
+    def setUp(self):
+        caches["catalog"].clear()
+        response_cache.reset()
+        single_flight.reset()
+        category = Category.objects.create(name="Herd")
+        self.product = Product.objects.create(title="Herd hat", price=10, category=category, inventory=3)
+        for i in range(12):
+            Product.objects.create(title=f"Herd item {i}", price=20 + i, category=category)
+
+    def herd(self, path, size, **coalescing):
+        app = WSGIHandler()
+        factory = RequestFactory(HTTP_HOST="localhost")
+        barrier = threading.Barrier(size)
+
+        def slow(execute, sql, params, many, context):
+            time.sleep(self.delay)
+            return execute(sql, params, many, context)
+
+        def send(_):
+            environ = factory.get(path).environ
+            statuses = []
+            try:
+                with CaptureQueriesContext(connection) as queries, connection.execute_wrapper(slow):
+                    barrier.wait()
+                    response = app(environ, lambda status, headers: statuses.append(status))
+                    body = b"".join(response)
+                    response.close()
+                return statuses[0], len(queries), body
+            finally:
+                connection.close()
+
+        with override_settings(
+            STORE_RESPONSE_CACHE={"ENABLED": False},  # measure coalescing, not the cache
+            STORE_METRICS={"ENABLED": False},
+            STORE_COALESCING={"ENABLED": True, **coalescing},
+        ):
+            with ThreadPoolExecutor(max_workers=size) as pool:
+                results = list(pool.map(send, range(size)))
+        self.assertEqual({status for status, _, _ in results}, {"200 OK"})
+        self.assertEqual(len({body for _, _, body in results}), 1)
+        return sum(count for _, count, _ in results)
+
+    def assert_coalesced(self, path):
+        self.herd(path, 1)  # warm per-process state, e.g. listings_filled()
+        solo = self.herd(path, 1)
+        self.assertGreater(solo, 0)
+        self.assertEqual(self.herd(path, self.herd_size), solo)
+        self.assertEqual(self.herd(path, self.herd_size, ENABLED=False), solo * self.herd_size)
+
+    def test_detail_herd_runs_one_request(self):
+        self.assert_coalesced(f"/api/products/{self.product.pk}/")
+
+    def test_first_page_herd_runs_one_request(self):
+        self.assert_coalesced("/api/products/?ordering=-created_at")
+
+    def test_stale_herd_reuses_previous_result(self):
+        path = f"/api/products/{self.product.pk}/"
+        self.herd(path, self.herd_size, STALE_SECONDS=5)
+        before = single_flight.stats()
+        self.herd(path, self.herd_size, STALE_SECONDS=5)
+        self.assertGreater(single_flight.stats()["stale"], before["stale"])
+
+
+# ======================
+# 🟩 READ REPLICAS
+# ======================
+REPLICA = "replica_test"
+
+
+@override_settings(
+    STORE_DB_ROUTING={"REPLICAS": [REPLICA], "PIN_SECONDS": 60},
+    STORE_RESPONSE_CACHE={"ENABLED": False},  # compare databases, not cached bodies
+)
+class ReplicaRoutingTests(TestCase):
+    """
+    A second SQLite file stands in for the replica; rows written to each
+    differ. The runner only knows "default", so the replica alias joins
+    ``databases`` once it exists.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        replica = {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(cls.replica_dir.name, "replica.sqlite3")}
+        settings.DATABASES[REPLICA] = connections.configure_settings({DEFAULT_DB_ALIAS: {}, REPLICA: replica})[REPLICA]
+        call_command("migrate", database=REPLICA, verbosity=0)
+        cls.databases = {DEFAULT_DB_ALIAS, REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.databases = {DEFAULT_DB_ALIAS}
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del settings.DATABASES[REPLICA]
+        cls.replica_dir.cleanup()
+
+    def setUp(self):
+        caches["catalog"].clear()
+        replica_pool.reset()
+        self.client = APIClient()
+        self.writer = User.objects.create_user("writer", "writer@example.com", "pass1234")
+        Category.objects.create(name="Hats")
+        Category.objects.using(REPLICA).create(name="Replica hats")
+
+    def category_names(self, client=None):
+        response = (client or self.client).get("/api/categories/")
+        self.assertEqual(response.status_code, 200)
+        return [category["name"] for category in response.json()["results"]]
+
+    def test_catalog_reads_use_the_replica(self):
+        self.assertEqual(self.category_names(), ["Replica hats"])
+
+    def test_writer_reads_the_primary_until_the_pin_expires(self):
+        self.client.force_authenticate(self.writer)
+        self.assertEqual(self.client.post("/api/categories/", {"name": "Caps"}).status_code, 201)
+        self.assertEqual(self.category_names(), ["Caps", "Hats"])
+        self.assertEqual(self.category_names(APIClient()), ["Replica hats"])
+
+        caches["catalog"].clear()  # the pin lapsed
+        self.assertEqual(self.category_names(), ["Replica hats"])
+
+    def test_lagging_replica_is_skipped(self):
+        with mock.patch.dict("store.routing.LAG_SQL", {"sqlite": "SELECT 30"}):
+            self.assertEqual(self.category_names(), ["Hats"])
+
+    def test_unreachable_replica_falls_back_to_the_primary(self):
+        with mock.patch.dict("store.routing.LAG_SQL", {"sqlite": "SELECT lag FROM missing_table"}):
+            self.assertEqual(self.category_names(), ["Hats"])
+
+    def test_change_feed_reads_the_primary(self):
+        product = Product.objects.create(title="Primary only", price=5)
+        Product.objects.filter(pk=product.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        response = self.client.get("/api/products/changes/")
+        self.assertEqual([row["title"] for row in response.json()["results"]], ["Primary only"])
+
+    def test_check_warns_about_a_per_process_pin_cache(self):
+        with mock.patch("store.checks.WORKERS", 4), mock.patch("store.cache.WORKERS", 4):
+            self.assertEqual([message.id for message in check_shared_caches(None)], [])
+            with override_settings(STORE_DB_ROUTING={"REPLICAS": [REPLICA], "PIN_CACHE_ALIAS": "default"}):
+                self.assertEqual([message.id for message in check_shared_caches(None)], ["store.W002"])
+
+
+# ======================
+# 🟩 BENCHMARKS
+# ======================
+class BenchApiTests(TransactionTestCase):
+    run_options = {"products": 30, "categories": 3, "requests": 40, "warmup": 5}
+
+    def setUp(self):
+        caches["catalog"].clear()
+        response_cache.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def bench(self, **options):
+        out = StringIO()
+        call_command("bench_api", **self.run_options, **options, stdout=out)
+        return out.getvalue()
+
+    def test_run_reports_every_scenario_and_cleans_up(self):
+        baseline = os.path.join(self.directory.name, "baseline.json")
+        output = self.bench(save_baseline=baseline)
+        self.assertIn("40 requests at 1 concurrency", output)
+        with open(baseline) as handle:
+            report = json.load(handle)
+        self.assertEqual(sum(row["count"] for row in report["scenarios"].values()), 40)
+        self.assertEqual(sum(row["server_errors"] for row in report["scenarios"].values()), 0)
+        self.assertFalse(Product.objects.filter(slug__startswith="bench-api").exists())
+        self.assertFalse(User.objects.filter(username="bench-api-user").exists())
+
+    def test_replayed_requests_fill_in_catalog_ids(self):
+        replay = os.path.join(self.directory.name, "traffic.ndjson")
+        with open(replay, "w") as handle:
+            handle.write(json.dumps({"path": "/api/products/{product_id}/", "label": "detail"}) + "\n")
+            handle.write(json.dumps({"path": "/api/products/?category={category_id}"}) + "\n")
+        output = self.bench(replay=replay)
+        self.assertIn("detail", output)
+        self.assertIn("GET /api/products/", output)
+
+    def test_baseline_comparison_flags_regressions(self):
+        scenario = {"count": 10, "errors": 0, "server_errors": 0, "p50_ms": 2, "p95_ms": 4, "p99_ms": 5, "queries": 2}
+        baseline = {"settings": {}, "throughput": 1000, "scenarios": {"list": scenario}}
+        command = BenchApiCommand(stdout=StringIO())
+        command.compare({**baseline, "throughput": 900}, baseline, tolerance=0.25)  # within tolerance
+
+        slower = {**baseline, "throughput": 500, "scenarios": {"list": {**scenario, "queries": 3, "p95_ms": 20}}}
+        with self.assertRaisesMessage(CommandError, "list: queries/request 2.0 -> 3.0") as raised:
+            command.compare(slower, baseline, tolerance=0.25)
+        self.assertIn("throughput 1,000 -> 500 req/s", str(raised.exception))
+        self.assertIn("list: p95 4.00 -> 20.00 ms", str(raised.exception))
+
+
+# ======================
+# 🟩 INDEXES
+# ======================
+@skipUnless(connection.vendor == "sqlite", "PostgreSQL plans small test tables as sequential scans")
+class ActiveIndexTests(TestCase):
+    def test_partial_indexes_serve_the_active_list_orderings(self):
+        category = Category.objects.create(name="Hats")
+        active = Product.objects.filter(is_active=True)
+        plans = {
+            "product_active_created_idx": active.order_by("-created_at", "-id"),
+            "product_active_price_idx": active.order_by("price", "id"),
+            "product_active_cat_created_idx": active.filter(category=category).order_by("-created_at", "-id"),
+            "product_active_cat_price_idx": active.filter(category=category).order_by("price", "id"),
+        }
+        for name, queryset in plans.items():
+            with self.subTest(index=name):
+                self.assertIn(name, queryset[:20].explain())
+        # Inactive rows aren't in the partial indexes
+        self.assertNotIn("product_active", Product.objects.order_by("-created_at", "-id")[:20].explain())
+
+    def test_explain_command_reports_an_index_per_variant(self):
+        out = StringIO()
+        call_command("explain_products", seed=40, stdout=out)
+        report = out.getvalue().split("Indexes per variant")[1]
+        self.assertIn("product_active_cat_price_idx", report)
+        self.assertFalse(Product.objects.filter(slug__startswith="explain-products").exists())
+
+
+# ======================
+# 🟩 API DOCS
+# ======================
+class ApiDocsTests(TestCase):
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.static_root = static_root.name
+        overridden = override_settings(STATIC_ROOT=self.static_root)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        for cached in (docs.built_schema, docs.live_schema):
+            cached.cache_clear()
+            self.addCleanup(cached.cache_clear)
+
+    def test_worker_boot_does_not_load_drf_yasg(self):
+        script = "import sys, config.wsgi; print(sorted(m for m in sys.modules if m.startswith('drf_yasg.')))"
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_pages_fall_back_to_a_live_schema_without_a_build(self):
+        response = self.client.get("/openapi.json")
+        self.assertEqual(response.status_code, 200)
+        schema = json.loads(response.content)
+        self.assertEqual(schema["basePath"], "/api")
+        self.assertIn("/products/", schema["paths"])
+        for page in ("/swagger/", "/redoc/"):
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "/openapi.json")
+
+    def test_pages_point_at_the_prebuilt_schema(self):
+        call_command("build_openapi", stdout=StringIO())
+        with open(os.path.join(self.static_root, "openapi", "manifest.json")) as handle:
+            built = json.load(handle)["schema"]
+        with open(os.path.join(self.static_root, built), "rb") as handle:
+            body = handle.read()
+        with gzip.open(os.path.join(self.static_root, f"{built}.gz")) as handle:
+            self.assertEqual(handle.read(), body)
+
+        response = self.client.get("/openapi.json")
+        self.assertRedirects(response, f"/static/{built}", fetch_redirect_response=False)
+        self.assertContains(self.client.get("/swagger/"), f"/static/{built}")
+
+
+# ======================
+# 🟩 CONNECTIONS
+# ======================
+class ConnectionPoolingTests(TestCase):
+    def load_settings(self, pooling, **environ):
+        # A fresh copy of config/settings.py, with or without psycopg 3 + psycopg_pool
+        def find_spec(name, *args):
+            return object() if pooling else real_find_spec(name, *args)
+
+        real_find_spec = importlib.util.find_spec
+        with mock.patch.dict(os.environ, environ), mock.patch("importlib.util.find_spec", find_spec):
+            return runpy.run_path(str(settings.BASE_DIR / "config" / "settings.py"))
+
+    def test_every_alias_gets_a_pool_when_available(self):
+        replicas = "postgres://u:p@replica:5432/shop"
+        loaded = self.load_settings(True, DATABASE_REPLICA_URLS=replicas, DB_POOL_MAX_SIZE="4")
+        self.assertEqual(set(loaded["DATABASES"]), {"default", "replica1"})
+        for alias, database in loaded["DATABASES"].items():
+            with self.subTest(alias=alias):
+                self.assertEqual(database["OPTIONS"]["pool"]["max_size"], 4)
+                self.assertEqual(database["CONN_MAX_AGE"], 0)
+                self.assertTrue(database["CONN_HEALTH_CHECKS"])
+
+    def test_persistent_connections_without_a_pool(self):
+        loaded = self.load_settings(True, DB_POOL="false", DB_CONN_MAX_AGE="120")
+        database = loaded["DATABASES"]["default"]
+        self.assertNotIn("pool", database.get("OPTIONS", {}))
+        self.assertEqual((database["CONN_MAX_AGE"], database["CONN_HEALTH_CHECKS"]), (120, True))
+
+    def test_bench_reuses_connections_across_requests(self):
+        out = StringIO()
+        # The command registers a temporary alias per mode
+        aliases = {DEFAULT_DB_ALIAS, "bench-db-per-request", "bench-db-persistent"}
+        with mock.patch.object(type(self), "databases", aliases):
+            call_command("bench_db", requests=20, threads=2, modes=["per-request", "persistent"], stdout=out)
+        connects = {
+            line.split()[0]: int(line.split()[-1]) for line in out.getvalue().splitlines() if line.startswith("  p")
+        }
+        self.assertEqual(connects["persistent"], 2)  # one per thread
+        # SQLite never closes an in-memory test database, so only a real server reconnects
+        if connection.vendor != "sqlite" or not connection.is_in_memory_db():
+            self.assertEqual(connects["per-request"], 20)
+        self.assertNotIn("bench-db-persistent", connections)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import( ProductViewSet, 
@@ -5,16 +6,29 @@ from .views import( ProductViewSet,
                    UserRegisterView,
                    UserProfileView,
                    UserProfileUpdateView,
-                   AdminUserViewSet
+                   AdminUserViewSet,
+                   ReservationViewSet,
+                   MetricsView,
+                   AutocompleteView,
 )
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r"users", AdminUserViewSet, basename="users") # admin-only
+router.register(r"inventory/reservations", ReservationViewSet, basename="reservation")
 
-urlpatterns = [
+urlpatterns = []
+if settings.STORE_ASYNC_CATALOG:
+    # ⚡ native async list/retrieve under ASGI, ahead of the router's routes
+    from .async_views import catalog_urlpatterns
+
+    urlpatterns += catalog_urlpatterns()
+
+urlpatterns += [
     path('', include(router.urls)),
     path("register/", UserRegisterView.as_view(), name="register"),
     path("profile/", UserProfileView.as_view(), name="profile"),
     path("profile/update", UserProfileUpdateView.as_view(), name="profile-update"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),  # admin-only, Prometheus text
+    path("autocomplete/", AutocompleteView.as_view(), name="autocomplete"),  # public, in-memory
 ]
@@ -1,13 +1,34 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, filters, status, mixins
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework import generics, permissions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import JSONParser
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from .models import Category, Product
+from .models import Category, Product, Reservation
+from .pagination import StandardResultsSetPagination, ProductPagination
+from .search import ProductSearchFilter
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .coalescing import SingleFlightMixin
+from .routing import ReplicaReadMixin
+from .instrumentation import InstrumentedViewMixin, metrics, render_connections
+from .fast_serializers import CompiledReadMixin, category_serializer, product_serializer
+from .listings import AtomicWritesMixin, ListingReadMixin
+from .changes import ChangeFeed
+from .export import EXPORT_CONTENT_TYPES, CSVRenderer, NDJSONRenderer, export_lines
+from .bulk import CSVParser, NDJSONParser, ProductImporter
+from .facets import DEFAULT_PRICE_EDGES, build_facets, grouped_rows, is_dirty, parse_price_edges, summary_rows
 from .serializers import CategorySerializer, ProductSerializer,UserRegisterSerializer,UserProfileSerializer,UserProfileUpdateSerializer, AdminUserSerializer
+from .serializers import ReservationCreateSerializer, ReservationSerializer
+from .autocomplete import autocomplete_index, autocomplete_settings
+from . import inventory
 
 User = get_user_model()
 
@@ -34,25 +55,22 @@ class UserProfileUpdateView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]  # 🔐 must be logged in
 
     def get_object(self):
-        # Always return the currently authenticated user
-        return self.request.user
-
-# ======================
-# 🟩 Pagination
-# ======================
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = "page_size"
-
+        # Always the currently authenticated user, re-read for the write:
+        # request.user may be built from token claims (CachedJWTAuthentication)
+        return User.objects.get(pk=self.request.user.pk)
 
 # ======================
 # 🟩 Category ViewSet
 # ======================
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(InstrumentedViewMixin, ReplicaReadMixin, AtomicWritesMixin, CachedResponseMixin, CompiledReadMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    compiled_serializer = category_serializer  # ⚡ list/retrieve skip per-field DRF overhead
     pagination_class = StandardResultsSetPagination
     permission_classes = [IsAuthenticatedOrReadOnly]  # 🔐 protect
+    cache_models = (Category,)  # ⚡ cached GETs, invalidated on writes
+    # GETs read from a replica (ReplicaReadMixin) unless the user just wrote
+    # Writes commit together with the product listing rows they re-project (AtomicWritesMixin)
 
     # Filters + Search + Sorting
     filter_backends = [
@@ -75,23 +93,31 @@ class CategoryViewSet(viewsets.ModelViewSet):
 # ======================
 # 🟩 Product ViewSet
 # ======================
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(InstrumentedViewMixin, ReplicaReadMixin, AtomicWritesMixin, SingleFlightMixin, ConditionalGetMixin, CachedResponseMixin, ListingReadMixin, CompiledReadMixin, viewsets.ModelViewSet):
     queryset = Product.objects.filter(is_active=True).select_related("category")
     serializer_class = ProductSerializer
-    pagination_class = StandardResultsSetPagination
+    compiled_serializer = product_serializer  # ⚡ same JSON as ProductSerializer, built faster
+    pagination_class = ProductPagination  # ?cursor= switches to keyset pages
     permission_classes = [IsAuthenticatedOrReadOnly]  # 🔐 protect
+    cache_models = (Product, Category)  # ⚡ nested category is part of the payload
+    # ETag / Last-Modified come from updated_at (ConditionalGetMixin), so polling clients get 304s
+    # GETs read from a replica (ReplicaReadMixin) unless the user just wrote
+    primary_actions = ("changes",)  # a lagging replica could let the feed skip rows behind a watermark
+    # Identical concurrent GETs share one computation (SingleFlightMixin, see STORE_COALESCING)
+    # Lists read prerendered rows from ProductListing (ListingReadMixin, see store/listings.py)
 
     # Filters + Search + Sorting
+    # ProductSearchFilter runs last so relevance ranking can replace the default ordering
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        ProductSearchFilter,
     ]
 
     # Filter by category or active status
     filterset_fields = ["category", "is_active"]
 
-    # Query search
+    # Query search (indexed: see store/search.py)
     search_fields = ["title", "description", "category__name"]
 
     # Sorting
@@ -99,6 +125,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     ordering = ["-created_at"]
 
     # Override destroy to implement soft delete
+    @transaction.atomic
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         instance.is_active = False
@@ -110,6 +137,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     # Custom action to reactivate a product
     @action(detail=True, methods=["post"])
+    @transaction.atomic
     def reactivate(self, request, pk=None, slug=None):
         instance = self.get_object()
         if instance.is_active:
@@ -124,3 +152,156 @@ class ProductViewSet(viewsets.ModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    # Incremental sync: everything changed after ?since=<watermark|ISO time>,
+    # including soft-deleted products
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        rows, watermark, has_more = ChangeFeed().read(
+            since=request.query_params.get("since"),
+            limit=request.query_params.get("limit"),
+        )
+        return Response(
+            {
+                "next_watermark": watermark,
+                "has_more": has_more,
+                "results": product_serializer.serialize(rows, self.get_serializer_context(), many=True),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    # Sidebar facets (category counts, price histogram, stock) for any list filters.
+    # The unfiltered catalog is answered from the FacetCount summary table, unless
+    # it awaits a rebuild (`manage.py rebuild_facets --if-dirty --loop`)
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        edges = parse_price_edges(request.query_params.get("price_buckets"))
+        filter_params = [*self.filterset_fields, ProductSearchFilter.search_param]
+        filtered = any(request.query_params.get(name) for name in filter_params)
+
+        if not filtered and edges == DEFAULT_PRICE_EDGES and not is_dirty():
+            rows, source = summary_rows(), "summary"
+        else:
+            rows, source = grouped_rows(self.filter_queryset(self.get_queryset()), edges), "query"
+
+        return Response({**build_facets(rows, edges), "source": source}, status=status.HTTP_200_OK)
+
+    # Streaming catalog export: ?format=ndjson (default) or ?format=csv,
+    # honouring the same filters as the list endpoint
+    @action(detail=False, methods=["get"], renderer_classes=[NDJSONRenderer, CSVRenderer, JSONRenderer])
+    def export(self, request, format=None):
+        export_format = "csv" if request.accepted_renderer.format == "csv" else "ndjson"
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            export_lines(queryset, export_format),
+            content_type=EXPORT_CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="products.{export_format}"'
+        return response
+
+    # Batch upsert keyed on slug: NDJSON, CSV or a JSON array of rows.
+    # 🔐 admin only; ?chunk_size= controls rows per transaction
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[permissions.IsAdminUser],
+        parser_classes=[NDJSONParser, CSVParser, JSONParser],
+    )
+    def batch(self, request):
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = [rows]
+        try:
+            chunk_size = max(1, int(request.query_params.get("chunk_size", 1000)))
+        except ValueError:
+            chunk_size = 1000
+        report = ProductImporter(chunk_size=chunk_size).run(rows)
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
+
+
+
+# ======================
+# 🟩 Inventory Reservations
+# ======================
+class ReservationViewSet(InstrumentedViewMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Hold stock for a checkout: POST reserves every item or none (409 with
+    the unavailable SKUs), then commit or release the returned token.
+    Unconfirmed holds are returned by `manage.py expire_reservations`.
+    """
+
+    serializer_class = ReservationSerializer
+    permission_classes = [permissions.IsAuthenticated]  # 🔐 must be logged in
+
+    def get_queryset(self):
+        queryset = Reservation.objects.prefetch_related("items")
+        if getattr(self, "swagger_fake_view", False):  # schema build, no real user
+            return queryset.none()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+    def create(self, request):
+        serializer = ReservationCreateSerializer(
+            data=request.data,
+            context={"max_items": inventory.inventory_settings()["MAX_ITEMS"]},
+        )
+        serializer.is_valid(raise_exception=True)
+        reservation = inventory.reserve(
+            [(item["product_id"], item["quantity"]) for item in serializer.validated_data["items"]],
+            user=request.user,
+            ttl=serializer.validated_data.get("ttl_seconds"),
+        )
+        return Response(
+            ReservationSerializer(self.get_queryset().get(pk=reservation.pk)).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(detail=True, methods=["post"])
+    def commit(self, request, pk=None):
+        reservation = inventory.commit(self.get_object().pk)
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"])
+    def release(self, request, pk=None):
+        reservation = inventory.release(self.get_object().pk)
+        return Response(ReservationSerializer(reservation).data, status=status.HTTP_200_OK)
+
+
+# ======================
+# 🟩 Autocomplete
+# ======================
+class AutocompleteView(APIView):
+    """
+    Search-box suggestions: ``?q=run&limit=5`` -> product titles and category
+    names with a word starting with ``q``, most popular first. Served from the
+    in-process prefix index (store/autocomplete.py), no database query.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []  # public; no token check on every keystroke
+
+    def get(self, request):
+        config = autocomplete_settings()
+        query = request.query_params.get("q", "")[: config["MAX_QUERY_LENGTH"]]
+        try:
+            limit = min(max(int(request.query_params.get("limit", config["LIMIT"])), 1), config["MAX_LIMIT"])
+        except ValueError:
+            limit = config["LIMIT"]
+        results = autocomplete_index.suggest(query, limit, max_age=config["MAX_AGE"])
+        response = Response({"query": query, "results": results})
+        if config["CACHE_SECONDS"]:
+            patch_cache_control(response, public=True, max_age=config["CACHE_SECONDS"])
+        return response
+
+
+# ======================
+# 🟩 Metrics
+# ======================
+class MetricsView(APIView):
+    """Sampled per-route request metrics and DB connection/pool usage in Prometheus text format."""
+
+    permission_classes = [permissions.IsAdminUser]  # 🔐 staff / scraper account only
+
+    def get(self, request):
+        body = metrics.render() + render_connections()
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")